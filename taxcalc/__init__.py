@@ -1,15 +1,20 @@
 """
 Specify what is available to import from the taxcalc package.
 """
+from taxcalc.batchrunner import *
+from taxcalc.calcprofiler import *
 from taxcalc.calculator import *
 from taxcalc.consumption import *
 from taxcalc.data import *
 from taxcalc.decorators import iterate_jit, JIT
 from taxcalc.growfactors import *
 from taxcalc.growdiff import *
+from taxcalc.groupingindex import *
 from taxcalc.parameters import *
 from taxcalc.policy import *
 from taxcalc.records import *
+from taxcalc.resultcache import *
+from taxcalc.tableaccumulator import *
 from taxcalc.taxcalcio import *
 from taxcalc.utils import *
 from taxcalc.cli import *
@@ -0,0 +1,571 @@
+"""
+Tax-Calculator BatchRunner class.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle batchrunner.py
+# pylint --disable=locally-disabled batchrunner.py
+
+import os
+import gc
+import sys
+import copy
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from taxcalc.policy import Policy
+from taxcalc.records import Records
+from taxcalc.consumption import Consumption
+from taxcalc.growdiff import GrowDiff
+from taxcalc.growfactors import GrowFactors
+from taxcalc.calculator import Calculator
+from taxcalc.utils import (DIST_VARIABLES, diagnostic_table_sums,
+                           diagnostic_table_from_sums)
+
+
+class BatchRunner():
+    """
+    Constructor for the BatchRunner class, which computes the taxes of the
+    same filing units in the same year under each of many policy reforms,
+    using a pool of worker processes that share one copy of the input data.
+
+    The input data are extrapolated to tax_year only once, in the process
+    that constructs the BatchRunner object.  The run method copies the
+    extrapolated variables into a block of shared memory, which each worker
+    process maps instead of reading, extrapolating or unpickling the data.
+
+    Parameters
+    ----------
+    records: Records class instance
+        filing units, which must be in their data year; when the records
+        are being extrapolated, this is done using the standard growth
+        factors modified by the growdiff_baseline assumptions in assump
+        (as is done by TaxCalcIO) rather than the records gfactors.
+
+    tax_year: integer
+        calendar year for which taxes are computed.
+
+    baseline: None or string
+        None implies baseline policy is current-law policy, or
+        string is a JSON reform file name or JSON reform text.
+
+    assump: None or string
+        None implies economic assumptions are standard assumptions,
+        or string is a JSON assumption file name or JSON assumption text.
+
+    num_workers: None or integer
+        maximum number of worker processes used by the run method;
+        None implies the number of CPUs available to this process.
+
+    Raises
+    ------
+    ValueError:
+        if records is not a Records instance in its data year.
+        if tax_year is not an integer in the Policy range of years or is
+        before the records data year when they are not being extrapolated.
+        if num_workers is not None or a positive integer.
+
+    Returns
+    -------
+    class instance: BatchRunner
+
+    Notes
+    -----
+    Typical usage is "runner.run(['a.json', 'b.json', {...}])", which
+    returns for each reform a DataFrame containing the OUTPUT_VARS.
+    Each reform is implemented on current-law policy (not the baseline),
+    as with the tc --reform option.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    # variables in the DataFrames returned by the run method
+    OUTPUT_VARS = ['RECID', 's006', 'expanded_income',
+                   'iitax', 'payrolltax', 'lumpsum_tax', 'combined']
+
+    # calculated variables returned by each worker process
+    CALCULATED_OUTPUT_VARS = OUTPUT_VARS[2:]
+
+    def __init__(self, records, tax_year, baseline=None, assump=None,
+                 num_workers=None):
+        # pylint: disable=too-many-arguments
+        if not isinstance(records, Records):
+            raise ValueError('records is not a Records instance')
+        if records.current_year != records.data_year:
+            raise ValueError('records are not in their data year')
+        if not isinstance(tax_year, int):
+            raise ValueError('tax_year is not an integer')
+        if (tax_year < Policy.JSON_START_YEAR or
+                tax_year > Policy.LAST_BUDGET_YEAR):
+            msg = 'tax_year {} is not in [{},{}] range'
+            raise ValueError(msg.format(tax_year, Policy.JSON_START_YEAR,
+                                        Policy.LAST_BUDGET_YEAR))
+        if records.gfactors is None and tax_year != records.data_year:
+            msg = 'tax_year {} differs from data year {} of unaged records'
+            raise ValueError(msg.format(tax_year, records.data_year))
+        if tax_year < records.data_year:
+            msg = 'tax_year {} less than records.data_year {}'
+            raise ValueError(msg.format(tax_year, records.data_year))
+        if num_workers is None:
+            num_workers = _available_cpus()
+        if not isinstance(num_workers, int) or num_workers < 1:
+            msg = 'num_workers {} is not a positive integer'
+            raise ValueError(msg.format(num_workers))
+        self.tax_year = tax_year
+        self.num_workers = num_workers
+        # read baseline policy and assumptions
+        basedict = Calculator.read_json_param_objects(baseline, None)
+        paramdict = Calculator.read_json_param_objects(None, assump)
+        # create GrowFactors objects like those used by TaxCalcIO
+        gdiff_baseline = GrowDiff()
+        gdiff_baseline.update_growdiff(paramdict['growdiff_baseline'])
+        gfactors_base = GrowFactors()
+        gdiff_baseline.apply_to(gfactors_base)
+        gdiff_response = GrowDiff()
+        gdiff_response.update_growdiff(paramdict['growdiff_response'])
+        self._gfactors_ref = GrowFactors()
+        gdiff_baseline.apply_to(self._gfactors_ref)
+        gdiff_response.apply_to(self._gfactors_ref)
+        self._consumption = Consumption()
+        self._consumption.update_consumption(paramdict['consumption'])
+        self._base = Policy(gfactors=gfactors_base)
+        self._base.implement_reform(basedict['policy'])
+        self._base.set_year(tax_year)
+        # extrapolate the filing units to tax_year once for baseline and,
+        # when there are growdiff_response assumptions, once for reforms
+        self._recs_base = BatchRunner._aged_records(records, tax_year,
+                                                    gfactors_base)
+        if gdiff_response.has_any_response():
+            self._recs_ref = BatchRunner._aged_records(records, tax_year,
+                                                       self._gfactors_ref)
+        else:
+            self._recs_ref = self._recs_base
+        self._baseline_output = None
+
+    def run(self, reforms):
+        """
+        Compute taxes under each of the specified reforms in a pool of
+        worker processes and return a list containing, for each reform,
+        a Pandas DataFrame containing the OUTPUT_VARS of each filing unit.
+
+        Each reform is either a string or a dictionary: a string is a JSON
+        reform file name or JSON reform text, where a compound reform can be
+        specified using two file names separated by a plus (+) character,
+        and a dictionary is suitable as input into the
+        Policy.implement_reform method.
+
+        Reform parameter errors raise a ValueError.
+
+        The baseline output is computed in this process before the worker
+        processes are started, so the tax-calculation functions are
+        compiled only once when the workers are forked from this process.
+        When there would be only one worker process, or when worker
+        processes cannot be forked on this platform, the reforms are
+        computed in this process instead.
+        """
+        policy_dicts = [BatchRunner._policy_dicts(reform)
+                        for reform in reforms]
+        if not policy_dicts:
+            return list()
+        self.baseline_output()
+        recs = self._recs_ref
+        num_workers = min(self.num_workers, len(policy_dicts))
+        if num_workers == 1 or not _fork_available():
+            results = [_reform_result(pdicts, recs, self._gfactors_ref,
+                                      self._consumption)
+                       for pdicts in policy_dicts]
+        else:
+            state = {'gfactors': self._gfactors_ref,
+                     'consumption': self._consumption}
+            with _worker_pool(recs, num_workers, state,
+                              keep_weights=False) as pool:
+                results = list(pool.map(_run_reform, policy_dicts))
+        return [BatchRunner._output_frame(recs, result) for result in results]
+
+    def baseline_output(self):
+        """
+        Return Pandas DataFrame containing the OUTPUT_VARS of each filing
+        unit under the baseline policy, which is computed in this process
+        the first time this method (or the run method) is called.
+        """
+        if self._baseline_output is None:
+            calc = Calculator(policy=self._base, records=self._recs_base,
+                              consumption=self._consumption,
+                              sync_years=False)
+            calc.calc_all()
+            self._baseline_output = BatchRunner._output_frame(
+                self._recs_base,
+                {var: calc.array(var)
+                 for var in BatchRunner.CALCULATED_OUTPUT_VARS}
+            )
+            del calc
+        return self._baseline_output
+
+    def table_data(self, output):
+        """
+        Return dictionary containing arrays of the variables used in the
+        TaxCalcIO tables for the reform output DataFrame returned by the
+        run method: the baseline weights and expanded_income, and the tax
+        variables under the reform and (with a _base suffix) under the
+        baseline.
+        """
+        base = self.baseline_output()
+        tdata = {'s006': base['s006'].values,
+                 'expanded_income': base['expanded_income'].values}
+        for var in BatchRunner.CALCULATED_OUTPUT_VARS[1:]:  # tax variables
+            tdata[var] = output[var].values
+            tdata[var + '_base'] = base[var].values
+        return tdata
+
+    # ----- begin private methods of BatchRunner class -----
+
+    @staticmethod
+    def _output_frame(recs, result):
+        """
+        Return DataFrame of OUTPUT_VARS containing the RECID and weight in
+        recs and the calculated variables in the result dictionary.
+        """
+        odict = {'RECID': recs.RECID, 's006': np.asarray(recs.s006)}
+        odict.update(result)
+        return pd.DataFrame(data=odict, columns=BatchRunner.OUTPUT_VARS)
+
+    @staticmethod
+    def _aged_records(records, tax_year, gfactors):
+        """
+        Return copy of records extrapolated to tax_year using gfactors,
+        or not extrapolated when records contain raw (unaged) data.
+        """
+        recs = copy.deepcopy(records)
+        if recs.gfactors is not None:
+            recs.gfactors = gfactors
+        while recs.current_year < tax_year:
+            recs.increment_year()
+        # the input variables are not changed after extrapolation, so they
+        # are made read-only, which lets every Calculator copy of recs share
+        # them rather than copy them (see the Data __deepcopy__ method)
+        for name in recs.USABLE_READ_VARS:
+            getattr(recs, name).flags.writeable = False
+        return recs
+
+    @staticmethod
+    def _policy_dicts(reform):
+        """
+        Return list of policy dictionaries for the specified reform.
+        """
+        if isinstance(reform, dict):
+            return [reform]
+        if isinstance(reform, str):
+            return [Calculator.read_json_param_objects(ref, None)['policy']
+                    for ref in reform.split('+')]
+        raise ValueError('reform is neither a string nor a dictionary')
+
+
+class MultiYearRunner():
+    """
+    Constructor for the MultiYearRunner class, which computes aggregate
+    statistics for the same filing units under the same policy in each
+    year of a budget window, using a pool of worker processes that share
+    one copy of the input data.
+
+    Each worker process extrapolates the input data directly to the year
+    it is computing, without calculating the taxes in the preceding years,
+    so a budget window takes roughly the elapsed time of two years when
+    there are at least as many CPUs as years.
+
+    Parameters
+    ----------
+    policy: Policy class instance
+
+    records: Records class instance
+        filing units, which must be in their data year.
+
+    consumption: None or Consumption class instance
+
+    num_workers: None or integer
+        maximum number of worker processes;
+        None implies the number of CPUs available to this process.
+
+    Raises
+    ------
+    ValueError:
+        if policy, records or consumption have the wrong type,
+        if records are not in their data year, or
+        if num_workers is not None or a positive integer.
+
+    Returns
+    -------
+    class instance: MultiYearRunner
+
+    Notes
+    -----
+    The first year is the current_year of a Calculator object constructed
+    from the same policy and records, which are not changed.
+    Typical usage is "MultiYearRunner(pol, recs).diagnostic_table(10)",
+    which returns the same table as "Calculator(pol, recs)" does.
+    """
+
+    # variables whose weighted totals are returned by default
+    TOTAL_VARS = ['iitax', 'payrolltax', 'combined']
+
+    def __init__(self, policy, records, consumption=None, num_workers=None):
+        if not isinstance(policy, Policy):
+            raise ValueError('policy is not a Policy instance')
+        if not isinstance(records, Records):
+            raise ValueError('records is not a Records instance')
+        if records.current_year != records.data_year:
+            raise ValueError('records are not in their data year')
+        if consumption is None:
+            consumption = Consumption()
+        if not isinstance(consumption, Consumption):
+            raise ValueError('consumption is not a Consumption instance')
+        if num_workers is None:
+            num_workers = _available_cpus()
+        if not isinstance(num_workers, int) or num_workers < 1:
+            msg = 'num_workers {} is not a positive integer'
+            raise ValueError(msg.format(num_workers))
+        self.start_year = max(policy.current_year, records.data_year)
+        self.num_workers = num_workers
+        self._policy = policy
+        self._records = records
+        self._consumption = consumption
+
+    def totals(self, num_years, variables=None):
+        """
+        Return Pandas DataFrame, indexed by year, containing the weighted
+        total of each of the specified variables in each of num_years years
+        beginning with start_year; None implies the TOTAL_VARS variables.
+        """
+        if variables is None:
+            variables = MultiYearRunner.TOTAL_VARS
+        results = self._year_results(num_years, variables)
+        return pd.DataFrame(
+            data=[totals for _, totals in results],
+            index=range(self.start_year, self.start_year + num_years),
+            columns=variables
+        )
+
+    def diagnostic_table(self, num_years):
+        """
+        Return multi-year diagnostic table, like the one returned by the
+        Calculator diagnostic_table method, for num_years years beginning
+        with start_year.
+        """
+        results = self._year_results(num_years, list())
+        return diagnostic_table_from_sums(
+            [sums for sums, _ in results],
+            list(range(self.start_year, self.start_year + num_years))
+        )
+
+    # ----- begin private methods of MultiYearRunner class -----
+
+    def _year_results(self, num_years, variables):
+        """
+        Return list containing for each year a tuple of the year's
+        diagnostic-table sums and the weighted totals of variables.
+        The first year is computed in this process before the worker
+        processes are forked and compute the other years, which are also
+        computed in this process when worker processes cannot be forked.
+        """
+        if not isinstance(num_years, int) or num_years < 1:
+            msg = 'num_years {} is not a positive integer'
+            raise ValueError(msg.format(num_years))
+        if self.start_year + num_years - 1 > self._policy.end_year:
+            msg = 'last year {} is greater than policy.end_year {}'
+            raise ValueError(msg.format(self.start_year + num_years - 1,
+                                        self._policy.end_year))
+        results = [_year_result(self._policy, self._records,
+                                self._consumption, self.start_year,
+                                variables)]
+        if num_years == 1:
+            return results
+        state = {'policy': self._policy, 'consumption': self._consumption,
+                 'variables': variables}
+        years = range(self.start_year + 1, self.start_year + num_years)
+        if not _fork_available():
+            results.extend(_year_result(self._policy, self._records,
+                                        self._consumption, year, variables)
+                           for year in years)
+            return results
+        with _worker_pool(self._records, min(self.num_workers, len(years)),
+                          state, keep_weights=True) as pool:
+            results.extend(pool.map(_run_year, years))
+        return results
+
+
+# ----- begin private functions of batchrunner module -----
+
+def _available_cpus():
+    """
+    Return number of CPUs on which this process is allowed to run.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _fork_available():
+    """
+    Return True if worker processes can be forked from this process, which
+    is not possible on Windows and is not safe on macOS, where forked
+    processes can crash when using system libraries.
+    """
+    return (sys.platform != 'darwin' and
+            'fork' in multiprocessing.get_all_start_methods())
+
+
+@contextlib.contextmanager
+def _worker_pool(recs, max_workers, state, keep_weights):
+    """
+    Context manager that yields a ProcessPoolExecutor of max_workers worker
+    processes, each of which has a copy of recs in which the variables are
+    mapped from one block of shared memory, along with the objects in the
+    state dictionary.  Worker processes are forked from this process, so
+    they inherit the state objects (which cannot all be pickled) and the
+    already compiled tax-calculation functions.  The recs sample weights
+    are copied into each worker only when keep_weights is True.
+    Callers must check the _fork_available function first, and should
+    not be running other threads, whose locks the workers would inherit.
+    """
+    names, template = _shared_layout(recs, keep_weights)
+    read_only = [name for name in recs.USABLE_READ_VARS | recs.CALCULATED_VARS
+                 if not getattr(recs, name).flags.writeable]
+    # gc.unfreeze is process-wide, so it would also undo any gc.freeze
+    # call by the caller, in which case objects are left as they are
+    freezing = gc.get_freeze_count() == 0
+    shm = shared_memory.SharedMemory(
+        create=True, size=max(1, sum(size for _, _, size in names))
+    )
+    try:
+        layout = list()
+        offset = 0
+        for name, dtype, size in names:
+            shared = np.ndarray(recs.array_length, dtype=dtype,
+                                buffer=shm.buf, offset=offset)
+            shared[:] = getattr(recs, name)
+            del shared
+            layout.append((name, dtype, offset))
+            offset += size
+        # keep garbage collection in the workers from touching (and so
+        # copying) all the objects inherited from this process
+        if freezing:
+            gc.freeze()
+        with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('fork'),
+                initializer=_init_worker,
+                initargs=(shm.name, layout, template, state, read_only)
+        ) as pool:
+            yield pool
+    finally:
+        if freezing:
+            gc.unfreeze()
+        shm.close()
+        shm.unlink()
+
+
+def _shared_layout(recs, keep_weights):
+    """
+    Return list of (name, dtype, size) tuples of the recs variables
+    placed in shared memory and a copy of recs containing no variables.
+    Variables that are zero for all filing units are not shared.
+    Sizes are rounded up to a multiple of eight bytes so that every
+    shared array is aligned.
+    """
+    allvars = sorted(recs.USABLE_READ_VARS | recs.CALCULATED_VARS)
+    names = list()
+    template = copy.copy(recs)
+    for name in allvars:
+        values = np.asarray(getattr(recs, name))
+        if np.any(values):
+            names.append((name, values.dtype.str,
+                          -(-values.nbytes // 8) * 8))
+        setattr(template, name, None)
+    if not keep_weights:
+        template.weights_matrix = None
+    return names, template
+
+
+# ----- begin private functions executed by worker processes -----
+
+_WORKER_STATE = dict()
+
+
+def _init_worker(shm_name, layout, template, state, read_only):
+    """
+    Initialize worker process by mapping the shared-memory variables into
+    the template Records object and zeroing the variables not shared.
+    The variables in the read_only list are read-only, as they are in the
+    Records object from which the template was made.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    recs = template
+    for name in recs.USABLE_READ_VARS | recs.CALCULATED_VARS:
+        if name in recs.INTEGER_VARS:
+            setattr(recs, name, np.zeros(recs.array_length, dtype=np.int32))
+        else:
+            setattr(recs, name, np.zeros(recs.array_length, dtype=np.float64))
+    for name, dtype, offset in layout:
+        setattr(recs, name, np.ndarray(recs.array_length, dtype=dtype,
+                                       buffer=shm.buf, offset=offset))
+    for name in read_only:
+        getattr(recs, name).flags.writeable = False
+    _WORKER_STATE['shm'] = shm
+    _WORKER_STATE['records'] = recs
+    _WORKER_STATE.update(state)
+
+
+def _run_reform(policy_dicts):
+    """
+    Return dictionary of CALCULATED_OUTPUT_VARS arrays computed under the
+    reform specified by the list of policy_dicts.
+    """
+    return _reform_result(policy_dicts, _WORKER_STATE['records'],
+                          _WORKER_STATE['gfactors'],
+                          _WORKER_STATE['consumption'])
+
+
+def _reform_result(policy_dicts, records, gfactors, consumption):
+    """
+    Return dictionary of CALCULATED_OUTPUT_VARS arrays computed for
+    records in their current year under the reform specified by the list
+    of policy_dicts.
+    """
+    pol = Policy(gfactors=gfactors)
+    for poldict in policy_dicts:
+        pol.implement_reform(poldict, print_warnings=False,
+                             raise_errors=False)
+        if pol.parameter_errors:
+            raise ValueError(pol.parameter_errors)
+    pol.set_year(records.current_year)
+    calc = Calculator(policy=pol, records=records,
+                      consumption=consumption, sync_years=False)
+    calc.calc_all()
+    return {var: calc.array(var)
+            for var in BatchRunner.CALCULATED_OUTPUT_VARS}
+
+
+def _run_year(year):
+    """
+    Return tuple of diagnostic-table sums and weighted totals for year.
+    """
+    return _year_result(_WORKER_STATE['policy'], _WORKER_STATE['records'],
+                        _WORKER_STATE['consumption'], year,
+                        _WORKER_STATE['variables'])
+
+
+def _year_result(policy, records, consumption, year, variables):
+    """
+    Return tuple of diagnostic-table sums and weighted totals of variables
+    computed after extrapolating records to year.
+    """
+    calc = Calculator(policy=policy, records=records,
+                      consumption=consumption)
+    calc.advance_to_year(year)
+    calc.calc_all()
+    sums = diagnostic_table_sums(
+        {name: calc.array(name) for name in DIST_VARIABLES}
+    )
+    weights = calc.array('s006')
+    totals = {var: (calc.array(var) * weights).sum() for var in variables}
+    return sums, totals
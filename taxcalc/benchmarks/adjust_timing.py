@@ -0,0 +1,82 @@
+"""
+Tax-Calculator benchmark script that compares the time needed to implement
+each reform in the taxcalc/reforms directory when indexed parameter values
+are re-extended incrementally and when all of them are re-extended.
+Each time is the smallest of several runs, which alternate between the
+two methods so that neither one gains from running after the other.
+
+USAGE: $ python adjust_timing.py [--reforms NAME ...] [--runs N]
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle adjust_timing.py
+# pylint --disable=locally-disabled adjust_timing.py
+
+import os
+import sys
+import glob
+import time
+import argparse
+from taxcalc import Policy
+
+
+REFORMS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           '..', 'reforms')
+
+
+def implement_time(revisions, incremental):
+    """
+    Return seconds needed to implement list of policy revisions in
+    a new current-law Policy object using specified indexing method.
+    """
+    pol = Policy()
+    pol.incremental_indexing = incremental
+    start = time.perf_counter()
+    for revision in revisions:
+        pol.implement_reform(revision, print_warnings=False,
+                             raise_errors=False)
+    return time.perf_counter() - start
+
+
+def main():
+    """
+    Contains high-level logic of the script.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python adjust_timing.py',
+        description=('Writes to stdout the seconds needed to implement '
+                     'each reform with full and incremental re-extension '
+                     'of indexed policy parameter values.')
+    )
+    parser.add_argument('--reforms', nargs='*', default=None,
+                        help=('names of reform files in taxcalc/reforms '
+                              'to time; default is all of them'))
+    parser.add_argument('--runs', type=int, default=3,
+                        help=('number of runs of each method whose '
+                              'smallest time is reported; default is 3'))
+    args = parser.parse_args()
+    if args.runs < 1:
+        sys.stderr.write('ERROR: --runs must be at least one\n')
+        return 1
+    if args.reforms:
+        paths = [os.path.join(REFORMS_DIR, name) for name in args.reforms]
+    else:
+        paths = sorted(glob.glob(os.path.join(REFORMS_DIR, '*.json')))
+    sys.stdout.write('{:<24}{:>10}{:>10}{:>8}\n'.format(
+        'reform', 'full', 'incr', 'ratio'))
+    for path in paths:
+        revision = Policy.read_json_reform(path)
+        times = {False: list(), True: list()}
+        for run in range(args.runs):
+            for incremental in [run % 2 == 1, run % 2 == 0]:
+                times[incremental].append(
+                    implement_time([revision], incremental)
+                )
+        full = min(times[False])
+        incr = min(times[True])
+        sys.stdout.write('{:<24}{:>10.2f}{:>10.2f}{:>8.2f}\n'.format(
+            os.path.basename(path), full, incr, full / max(incr, 1e-9)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
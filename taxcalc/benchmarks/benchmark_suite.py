@@ -0,0 +1,362 @@
+"""
+Tax-Calculator benchmark suite that times importing taxcalc, compiling the
+tax-calculation functions, reading the bundled cps.csv.gz data, and the
+main Calculator and TaxCalcIO operations on samples of the CPS data of
+several sizes, where samples larger than the CPS data are generated by
+the synthetic_data.py script in this directory.  Runs offline and saves
+the results of each run in a JSON history file, so that each run can be
+compared with earlier runs on the same host: a benchmark is reported as
+a regression when its time exceeds the median of its earlier times by
+more than the threshold ratio.
+
+USAGE: $ python benchmark_suite.py [--sizes SIZE ...] [--only NAME ...]
+                                   [--repeat N] [--threshold RATIO]
+                                   [--history FILE] [--no-save]
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle benchmark_suite.py
+# pylint --disable=locally-disabled benchmark_suite.py
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import pandas as pd
+from taxcalc import (Policy, Records, Calculator, GrowFactors, TaxCalcIO,
+                     __version__)
+from synthetic_data import synthetic_blocks  # pylint: disable=import-error
+
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_PATH = os.path.join(BENCHMARKS_DIR, 'benchmark_history.json')
+REFORM_PATH = os.path.join(BENCHMARKS_DIR, '..', 'reforms', '2017_law.json')
+TAX_YEAR = 2023
+SAMPLE_SEED = 123456789
+
+# code run in a new Python process to time importing taxcalc
+IMPORT_CODE = (
+    'import time\n'
+    'start = time.perf_counter()\n'
+    'import taxcalc\n'
+    'print(time.perf_counter() - start)\n'
+)
+
+# code run in a new Python process to time the first calc_all call,
+# which compiles the tax-calculation functions
+JIT_CODE = (
+    'import time\n'
+    'import pandas as pd\n'
+    'from taxcalc import Policy, Records, Calculator\n'
+    'data = pd.read_csv(Records.CODE_PATH + "/cps.csv.gz", nrows=100)\n'
+    'recs = Records(data=data, start_year=2014, gfactors=None,\n'
+    '               weights=None, adjust_ratios=None)\n'
+    'calc = Calculator(policy=Policy(), records=recs, verbose=False)\n'
+    'start = time.perf_counter()\n'
+    'calc.calc_all()\n'
+    'print(time.perf_counter() - start)\n'
+)
+
+
+def best_time(func, repeat, setup=None):
+    """
+    Return smallest number of seconds needed by repeat calls of func,
+    which is called with the value returned by setup when setup is not
+    None, so that the setup time is not included.
+    """
+    times = list()
+    for _ in range(repeat):
+        args = [] if setup is None else [setup()]
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def best_reported_time(func, repeat):
+    """
+    Return smallest number of seconds returned by repeat calls of func.
+    """
+    return min(func() for _ in range(repeat))
+
+
+def subprocess_time(code):
+    """
+    Return the number of seconds printed by code run in a new Python process.
+    """
+    out = subprocess.run([sys.executable, '-c', code], check=True,
+                         capture_output=True, text=True).stdout
+    return float(out.split()[-1])
+
+
+def cps_sample(cps, weights, size):
+    """
+    Return (data, weights) pair of DataFrames containing a random sample of
+    size filing units of the CPS data, where None implies all the data and
+    a size larger than the CPS data implies synthetic data of that size.
+    """
+    if size is None or size == len(cps.index):
+        return cps, weights
+    if size > len(cps.index):
+        blocks = list(synthetic_blocks(size, SAMPLE_SEED, (cps, weights)))
+        return (pd.concat([xdf for xdf, _ in blocks], ignore_index=True),
+                pd.concat([wdf for _, wdf in blocks], ignore_index=True))
+    rows = cps.sample(n=size, random_state=SAMPLE_SEED).index
+    return (cps.loc[rows].reset_index(drop=True),
+            weights.loc[rows].reset_index(drop=True))
+
+
+def sample_calculator(data, weights, policy):
+    """
+    Return Calculator object for the CPS sample data and weights under the
+    policy, which is advanced to TAX_YEAR.
+    """
+    recs = Records(data=data, start_year=Records.CPSCSV_YEAR,
+                   gfactors=GrowFactors(), weights=weights,
+                   adjust_ratios=Records.CPS_RATIOS_FILENAME)
+    calc = Calculator(policy=policy, records=recs, verbose=False)
+    calc.advance_to_year(TAX_YEAR)
+    return calc
+
+
+def tcio_time(input_path, outdir):
+    """
+    Return seconds needed to analyze input_path CSV file with TaxCalcIO
+    writing the same --dump output and --sqldb database as a tc run.
+    """
+    start = time.perf_counter()
+    tcio = TaxCalcIO(input_data=input_path, tax_year=TAX_YEAR,
+                     baseline=None, reform=REFORM_PATH, assump=None,
+                     outdir=outdir)
+    tcio.init(input_data=input_path, tax_year=TAX_YEAR, baseline=None,
+              reform=REFORM_PATH, assump=None,
+              aging_input_data=False, exact_calculations=False)
+    assert not tcio.errmsg, tcio.errmsg
+    tcio.analyze(writing_output_file=True, output_dump=True,
+                 output_sqldb=True)
+    return time.perf_counter() - start
+
+
+def sample_benchmarks(cps, weights, size, wanted, repeat):
+    """
+    Return dictionary of benchmark times for a CPS sample of the size.
+    """
+    # pylint: disable=too-many-locals
+    label = 'full' if size is None else str(size)
+    data, wghts = cps_sample(cps, weights, size)
+    reform = Policy()
+    reform.implement_reform(Policy.read_json_reform(REFORM_PATH))
+    calc1 = sample_calculator(data, wghts, Policy())
+    calc2 = sample_calculator(data, wghts, reform)
+    calc1.calc_all()
+    calc2.calc_all()
+    benchmarks = [
+        ('advance_to_year',
+         lambda: Calculator(policy=Policy(),
+                            records=Records(
+                                data=data, start_year=Records.CPSCSV_YEAR,
+                                gfactors=GrowFactors(), weights=wghts,
+                                adjust_ratios=Records.CPS_RATIOS_FILENAME),
+                            verbose=False),
+         lambda calc: calc.advance_to_year(TAX_YEAR)),
+        ('calc_all', None, calc1.calc_all),
+        ('distribution_tables', None,
+         lambda: calc1.distribution_tables(calc2, 'weighted_deciles')),
+        ('difference_table', None,
+         lambda: calc1.difference_table(calc2, 'weighted_deciles',
+                                        'combined')),
+        ('diagnostic_table', None, lambda: calc1.diagnostic_table(1)),
+    ]
+    benchmarks.extend([
+        ('mtr_' + var, None,
+         lambda var=var: calc1.mtr(variable_str=var,
+                                   calc_all_already_called=True))
+        for var in Calculator.MTR_VALID_VARIABLES
+    ])
+    results = dict()
+    for name, setup, func in benchmarks:
+        if selected(name, wanted):
+            results['{}[{}]'.format(name, label)] = best_time(func, repeat,
+                                                              setup)
+    if selected('tcio_dump_sqldb', wanted):
+        tempdir = tempfile.mkdtemp()
+        try:
+            input_path = os.path.join(tempdir, 'cps{}.csv'.format(label))
+            data.to_csv(input_path, index=False)
+            name = 'tcio_dump_sqldb[{}]'.format(label)
+            results[name] = best_reported_time(
+                lambda: tcio_time(input_path, tempdir), repeat
+            )
+        finally:
+            shutil.rmtree(tempdir, ignore_errors=True)
+    return results
+
+
+def selected(name, wanted):
+    """
+    Return True if benchmark name begins with one of the wanted prefixes,
+    where None implies all benchmarks are wanted.
+    """
+    return wanted is None or any(name.startswith(w) for w in wanted)
+
+
+def run_benchmarks(sizes, wanted, repeat):
+    """
+    Return dictionary of benchmark times in seconds.
+    """
+    results = dict()
+    if selected('import', wanted):
+        results['import'] = best_reported_time(
+            lambda: subprocess_time(IMPORT_CODE), repeat
+        )
+    if selected('jit_warmup', wanted):
+        results['jit_warmup'] = best_reported_time(
+            lambda: subprocess_time(JIT_CODE), repeat
+        )
+    if selected('cps_constructor', wanted):
+        results['cps_constructor'] = best_time(Records.cps_constructor,
+                                               repeat)
+    cps = pd.read_csv(os.path.join(Records.CODE_PATH, 'cps.csv.gz'))
+    weights = pd.read_csv(os.path.join(Records.CODE_PATH,
+                                       Records.CPS_WEIGHTS_FILENAME))
+    for size in sizes:
+        results.update(sample_benchmarks(cps, weights, size, wanted, repeat))
+    return results
+
+
+def host_id():
+    """
+    Return string identifying the host, whose earlier results are the only
+    ones compared with the results of this run.
+    """
+    return '{} {} {}'.format(platform.node(), platform.machine(),
+                             platform.python_version())
+
+
+def git_commit():
+    """
+    Return git commit of the source tree or None if it is unknown.
+    """
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                             cwd=BENCHMARKS_DIR, check=True,
+                             capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.strip() or None
+
+
+def read_history(path):
+    """
+    Return list of earlier runs saved in the JSON history file.
+    """
+    if not os.path.isfile(path):
+        return list()
+    with open(path, 'r') as hfile:
+        return json.load(hfile)
+
+
+def baseline_times(history, host, num_runs):
+    """
+    Return dictionary containing the median time of each benchmark in the
+    num_runs most recent runs on the host.
+    """
+    runs = [run for run in history if run['host'] == host][-num_runs:]
+    times = dict()
+    for run in runs:
+        for name, seconds in run['results'].items():
+            times.setdefault(name, list()).append(seconds)
+    return {name: statistics.median(values)
+            for name, values in times.items()}
+
+
+def sample_size(arg):
+    """
+    Return sample size specified by the arg string, where None implies
+    all the CPS data.
+    """
+    if arg == 'full':
+        return None
+    size = int(arg)
+    if size < 1:
+        raise argparse.ArgumentTypeError('sample size is not positive')
+    return size
+
+
+def main():
+    """
+    Contains high-level logic of the script.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python benchmark_suite.py',
+        description=('Writes to stdout the seconds needed by each '
+                     'Tax-Calculator benchmark and flags regressions '
+                     'relative to earlier runs on this host.')
+    )
+    parser.add_argument('--sizes', nargs='+', type=sample_size,
+                        default=[10000, 100000, None],
+                        help=('number of filing units in each CPS sample '
+                              'or full for all of them, where sizes larger '
+                              'than the CPS data imply synthetic data; '
+                              'default is 10000 100000 full'))
+    parser.add_argument('--only', nargs='+', default=None,
+                        help=('run only benchmarks whose names begin '
+                              'with one of these prefixes'))
+    parser.add_argument('--repeat', type=int, default=3,
+                        help=('number of times each benchmark is run, '
+                              'with the best time reported; default is 3'))
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help=('ratio to the median earlier time above '
+                              'which a time is a regression; default is '
+                              '1.25'))
+    parser.add_argument('--runs', type=int, default=5,
+                        help=('number of most recent earlier runs whose '
+                              'median time is compared; default is 5'))
+    parser.add_argument('--history', default=HISTORY_PATH,
+                        help=('JSON file containing results of earlier '
+                              'runs; default is benchmark_history.json '
+                              'in the benchmarks directory'))
+    parser.add_argument('--no-save', dest='save', action='store_false',
+                        help='do not add the results to the history file')
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error('--repeat is not positive')
+    history = read_history(args.history)
+    host = host_id()
+    baseline = baseline_times(history, host, args.runs)
+    results = run_benchmarks(args.sizes, args.only, args.repeat)
+    sys.stdout.write('{:<32}{:>10}{:>10}{:>8}\n'.format(
+        'benchmark', 'seconds', 'median', 'ratio'))
+    regressions = list()
+    for name, seconds in results.items():
+        if name in baseline:
+            ratio = seconds / max(baseline[name], 1e-9)
+            flag = ''
+            if ratio > args.threshold:
+                regressions.append(name)
+                flag = '  REGRESSION'
+            sys.stdout.write('{:<32}{:>10.3f}{:>10.3f}{:>8.2f}{}\n'.format(
+                name, seconds, baseline[name], ratio, flag))
+        else:
+            sys.stdout.write('{:<32}{:>10.3f}\n'.format(name, seconds))
+    if args.save:
+        history.append({'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                        'host': host, 'version': __version__,
+                        'commit': git_commit(), 'repeat': args.repeat,
+                        'results': results})
+        with open(args.history, 'w') as hfile:
+            json.dump(history, hfile, indent=1)
+    if regressions:
+        sys.stdout.write('{} REGRESSION(S): {}\n'.format(
+            len(regressions), ' '.join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
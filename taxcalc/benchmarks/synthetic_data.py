@@ -0,0 +1,163 @@
+"""
+Tax-Calculator script that generates a synthetic input file of any size,
+along with a matching weights file, for scaling tests and benchmarks.
+The filing units are drawn with replacement from the bundled cps.csv.gz
+file, their amounts are randomized in the same way as by the
+randomize_data function in the validation/puf_fuzz.py script, and they
+are then constrained as required by the Records class.  The weights are
+scaled so that weighted totals are about the same as for cps.csv.gz.
+The generated files depend only on the SIZE and SEED.
+
+The files can be analyzed with the same arguments as cps.csv.gz, except
+for the data and weights, using the Records.read_chunks method when they
+are larger than memory; for example:
+    Records.read_chunks(1000000, data='synth.csv.gz',
+                        start_year=Records.CPSCSV_YEAR,
+                        weights='synth_weights.csv.gz',
+                        adjust_ratios=Records.CPS_RATIOS_FILENAME)
+
+USAGE: $ python synthetic_data.py SIZE SEED [--data FILE] [--weights FILE]
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle synthetic_data.py
+# pylint --disable=locally-disabled synthetic_data.py
+
+import os
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from taxcalc import Records
+
+
+# number of filing units generated from each random-number stream, which
+# is fixed so that the generated data do not depend on how they are used
+BLOCK_SIZE = 100000
+
+NORM_STD_DEV = 0.25  # same randomization as validation/puf_fuzz.py
+
+# variables that are not randomized: integer codes, counts, ages and
+# identifiers, and the weights, which are scaled instead
+SKIP_VARS = Records(data=None).INTEGER_READ_VARS | set(['s006'])
+
+# (total, taxpayer, spouse) variables whose total is the sum of the parts
+SPLIT_VARS = [('e00200', 'e00200p', 'e00200s'),
+              ('e00900', 'e00900p', 'e00900s'),
+              ('e02100', 'e02100p', 'e02100s')]
+
+
+def read_cps():
+    """
+    Return (data, weights) pair of DataFrames read from the bundled CPS
+    data and weights files.
+    """
+    data = Records.read_cps_data()
+    weights = pd.read_csv(os.path.join(Records.CODE_PATH,
+                                       Records.CPS_WEIGHTS_FILENAME))
+    return data, weights
+
+
+def synthetic_blocks(size, seed, cps=None):
+    """
+    Generator that yields (data, weights) pairs of DataFrames containing
+    the next BLOCK_SIZE (or fewer) of the size synthetic filing units
+    generated using the seed, where cps is the (data, weights) pair
+    returned by the read_cps function (None implies it is called).
+    """
+    if not isinstance(size, int) or size < 1:
+        raise ValueError('size is not a positive integer')
+    if not isinstance(seed, int) or seed < 0:
+        raise ValueError('seed is not a nonnegative integer')
+    cps_data, cps_weights = read_cps() if cps is None else cps
+    # scale weights so that weighted totals do not depend on size
+    wscale = len(cps_data.index) / size
+    for block, first in enumerate(range(0, size, BLOCK_SIZE)):
+        num = min(BLOCK_SIZE, size - first)
+        rng = np.random.default_rng([seed, block])
+        rows = rng.integers(0, len(cps_data.index), size=num)
+        xdf = cps_data.iloc[rows].reset_index(drop=True)
+        wdf = cps_weights.iloc[rows].reset_index(drop=True)
+        randomize_data(xdf, rng)
+        constrain_data(xdf)
+        xdf['RECID'] = np.arange(first + 1, first + num + 1)
+        xdf['s006'] = (xdf['s006'] * wscale).round(2)
+        wdf = (wdf * wscale).round().astype(np.int64)
+        yield xdf, wdf
+
+
+def randomize_data(xdf, rng):
+    """
+    Multiply each nonzero amount in xdf by a normally distributed random
+    factor drawn using the rng numpy random Generator, rounding the new
+    amounts to whole dollars and keeping nonnegative variables
+    nonnegative.
+    """
+    num = len(xdf.index)
+    for varname in xdf.columns:
+        if varname in SKIP_VARS:
+            continue
+        old = xdf[varname].values
+        rfactor = rng.normal(loc=1.0, scale=NORM_STD_DEV, size=num)
+        new = np.round(old * rfactor)
+        if old.min() >= 0:
+            new = np.maximum(new, 0.)
+        xdf[varname] = new
+
+
+def constrain_data(xdf):
+    """
+    Constrain randomized xdf variable values as required by Records class.
+    Spouse amounts need no constraint because zero amounts stay zero.
+    """
+    for total, taxpayer, spouse in SPLIT_VARS:
+        xdf[total] = xdf[taxpayer] + xdf[spouse]
+    xdf['e00600'] = np.maximum(xdf['e00600'], xdf['e00650'])
+    xdf['e01500'] = np.maximum(xdf['e01500'], xdf['e01700'])
+
+
+def write_synthetic_files(size, seed, data_path, weights_path):
+    """
+    Write size synthetic filing units generated using the seed to the
+    data_path CSV file and their weights to the weights_path CSV file,
+    one block at a time so that memory use does not depend on size.
+    Files whose names end in .gz are compressed.
+    """
+    cps = read_cps()
+    for idx, (xdf, wdf) in enumerate(synthetic_blocks(size, seed, cps)):
+        mode = 'w' if idx == 0 else 'a'
+        xdf.to_csv(data_path, mode=mode, header=(idx == 0), index=False)
+        wdf.to_csv(weights_path, mode=mode, header=(idx == 0), index=False)
+
+
+def main():
+    """
+    Contains high-level logic of the script.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python synthetic_data.py',
+        description=('Writes synthetic input and weights files containing '
+                     'SIZE filing units generated from cps.csv.gz using '
+                     'random-number SEED.')
+    )
+    parser.add_argument('SIZE', type=int,
+                        help='SIZE is number of filing units; must be >= 1.')
+    parser.add_argument('SEED', type=int,
+                        help='SEED is random-number seed; must be >= 0.')
+    parser.add_argument('--data', default='synth.csv.gz',
+                        help=('name of input file written; default is '
+                              'synth.csv.gz'))
+    parser.add_argument('--weights', default='synth_weights.csv.gz',
+                        help=('name of weights file written; default is '
+                              'synth_weights.csv.gz'))
+    args = parser.parse_args()
+    try:
+        write_synthetic_files(args.SIZE, args.SEED, args.data, args.weights)
+    except ValueError as valerr_msg:
+        sys.stderr.write('ERROR: {}\n'.format(valerr_msg))
+        sys.stderr.write('USAGE: python synthetic_data.py --help\n')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -88,7 +88,7 @@ def BenefitPrograms(calc):
     calc.array('benefit_value_total', value)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def EI_PayrollTax(SS_Earnings_c, e00200p, e00200s, pencon_p, pencon_s,
                   FICA_ss_trt, FICA_mc_trt, ALD_SelfEmploymentTax_hc,
                   SS_Earnings_thd, e00900p, e00900s, e02100p, e02100s, k1bx14p,
@@ -166,7 +166,7 @@ def EI_PayrollTax(SS_Earnings_c, e00200p, e00200s, pencon_p, pencon_s,
             earned, earned_p, earned_s, was_plus_sey_p, was_plus_sey_s)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def DependentCare(nu13, elderly_dependents, earned,
                   MARS, ALD_Dependents_thd, ALD_Dependents_hc,
                   ALD_Dependents_Child_c, ALD_Dependents_Elder_c,
@@ -200,7 +200,7 @@ def DependentCare(nu13, elderly_dependents, earned,
     return care_deduction
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def Adj(e03150, e03210, c03260,
         e03270, e03300, e03400, e03500, e00800,
         e03220, e03230, e03240, e03290, care_deduction,
@@ -288,7 +288,7 @@ def Adj(e03150, e03210, c03260,
     return c02900
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def ALD_InvInc_ec_base(p22250, p23250, sep,
                        e00300, e00600, e01100, e01200,
                        invinc_ec_base):
@@ -302,7 +302,7 @@ def ALD_InvInc_ec_base(p22250, p23250, sep,
     return invinc_ec_base
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def CapGains(p23250, p22250, sep, ALD_StudentLoan_hc,
              ALD_InvInc_ec_rt, invinc_ec_base,
              e00200, e00300, e00600, e00650, e00700, e00800,
@@ -340,7 +340,7 @@ def CapGains(p23250, p22250, sep, ALD_StudentLoan_hc,
     return (c01000, c23650, ymod, ymod1, invinc_agi_ec)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def SSBenefits(MARS, ymod, e02400, SS_thd50, SS_thd85,
                SS_percentage1, SS_percentage2, c02500):
     """
@@ -358,7 +358,7 @@ def SSBenefits(MARS, ymod, e02400, SS_thd50, SS_thd85,
     return c02500
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def UBI(nu18, n1820, n21, UBI_u18, UBI_1820, UBI_21, UBI_ecrt,
         ubi, taxable_ubi, nontaxable_ubi):
     """
@@ -394,7 +394,7 @@ def UBI(nu18, n1820, n21, UBI_u18, UBI_1820, UBI_21, UBI_ecrt,
     return ubi, taxable_ubi, nontaxable_ubi
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def AGI(ymod1, c02500, c02900, XTOT, MARS, sep, DSI, exact, nu18, taxable_ubi,
         II_em, II_em_ps, II_prt, II_no_em_nu18,
         c00100, pre_c04600, c04600):
@@ -425,7 +425,7 @@ def AGI(ymod1, c02500, c02900, XTOT, MARS, sep, DSI, exact, nu18, taxable_ubi,
     return (c00100, pre_c04600, c04600)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def ItemDedCap(e17500, e18400, e18500, e19200, e19800, e20100, e20400, g20500,
                c00100, ID_AmountCap_rt, ID_AmountCap_Switch, e17500_capped,
                e18400_capped, e18500_capped, e19200_capped, e19800_capped,
@@ -530,7 +530,7 @@ def ItemDedCap(e17500, e18400, e18500, e19200, e19800, e20100, e20400, g20500,
             e20400_capped, e19200_capped, e19800_capped, e20100_capped)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def ItemDed(e17500_capped, e18400_capped, e18500_capped, e19200_capped,
             e19800_capped, e20100_capped, e20400_capped, g20500_capped,
             MARS, age_head, age_spouse, c00100, c04470, c21040, c21060,
@@ -687,7 +687,7 @@ def ItemDed(e17500_capped, e18400_capped, e18500_capped, e19200_capped,
             c21040, c21060, c04470)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def AdditionalMedicareTax(e00200, MARS,
                           AMEDT_ec, sey, AMEDT_rt,
                           FICA_mc_trt, FICA_ss_trt,
@@ -725,7 +725,7 @@ def AdditionalMedicareTax(e00200, MARS,
     return (ptax_amc, payrolltax)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def StdDed(DSI, earned, STD, age_head, age_spouse, STD_Aged, STD_Dep,
            MARS, MIDR, blind_head, blind_spouse, standard, c19700,
            STD_allow_charity_ded_nonitemizers):
@@ -786,7 +786,7 @@ def StdDed(DSI, earned, STD, age_head, age_spouse, STD_Aged, STD_Dep,
     return standard
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def TaxInc(c00100, standard, c04470, c04600, MARS, e00900, e26270,
            e02100, e27200, e00650, c01000,
            PT_SSTB_income, PT_binc_w2_wages, PT_ubia_property,
@@ -843,7 +843,7 @@ def TaxInc(c00100, standard, c04470, c04600, MARS, e00900, e26270,
     return (c04800, qbided)
 
 
-@JIT(nopython=True)
+@JIT(nopython=True, nogil=True)
 def SchXYZ(taxable_income, MARS, e00900, e26270, e02000, e00200,
            PT_rt1, PT_rt2, PT_rt3, PT_rt4, PT_rt5,
            PT_rt6, PT_rt7, PT_rt8,
@@ -899,7 +899,7 @@ def SchXYZ(taxable_income, MARS, e00900, e26270, e02000, e00200,
     return reg_tax + pt_tax
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def SchXYZTax(c04800, MARS, e00900, e26270, e02000, e00200,
               PT_rt1, PT_rt2, PT_rt3, PT_rt4, PT_rt5,
               PT_rt6, PT_rt7, PT_rt8,
@@ -928,7 +928,7 @@ def SchXYZTax(c04800, MARS, e00900, e26270, e02000, e00200,
     return c05200
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def GainsTax(e00650, c01000, c23650, p23250, e01100, e58990, e00200,
              e24515, e24518, MARS, c04800, c05200, e00900, e26270, e02000,
              II_rt1, II_rt2, II_rt3, II_rt4, II_rt5, II_rt6, II_rt7, II_rt8,
@@ -1039,7 +1039,7 @@ def GainsTax(e00650, c01000, c23650, p23250, e01100, e58990, e00200,
     return (dwks10, dwks13, dwks14, dwks19, c05700, taxbc)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def AGIsurtax(c00100, MARS, AGI_surtax_trt, AGI_surtax_thd, taxbc, surtax):
     """
     Computes surtax on AGI above some threshold.
@@ -1051,7 +1051,7 @@ def AGIsurtax(c00100, MARS, AGI_surtax_trt, AGI_surtax_thd, taxbc, surtax):
     return (taxbc, surtax)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def AMT(e07300, dwks13, standard, f6251, c00100, c18300, taxbc,
         c04470, c17000, c20800, c21040, e24515, MARS, sep, dwks19,
         dwks14, c05700, e62900, e00700, dwks10, age_head, age_spouse,
@@ -1145,7 +1145,7 @@ def AMT(e07300, dwks13, standard, f6251, c00100, c18300, taxbc,
     return (c62100, c09600, c05800)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def NetInvIncTax(e00300, e00600, e02000, e26270, c01000,
                  c00100, NIIT_thd, MARS, NIIT_PT_taxed, NIIT_rt, niit):
     """
@@ -1161,7 +1161,7 @@ def NetInvIncTax(e00300, e00600, e02000, e26270, c01000,
     return niit
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def F2441(MARS, earned_p, earned_s, f2441, CDCC_c, e32800,
           exact, c00100, CDCC_ps, CDCC_crt, c05800, e07300, c07180):
     """
@@ -1189,7 +1189,7 @@ def F2441(MARS, earned_p, earned_s, f2441, CDCC_c, e32800,
     return c07180
 
 
-@JIT(nopython=True)
+@JIT(nopython=True, nogil=True)
 def EITCamount(basic_frac, phasein_rate, earnings, max_amount,
                phaseout_start, agi, phaseout_rate):
     """
@@ -1207,7 +1207,7 @@ def EITCamount(basic_frac, phasein_rate, earnings, max_amount,
     return eitc
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def EITC(MARS, DSI, EIC, c00100, e00300, e00400, e00600, c01000,
          e02000, e26270, age_head, age_spouse, earned, earned_p, earned_s,
          EITC_ps, EITC_MinEligAge, EITC_MaxEligAge, EITC_ps_MarriedJ,
@@ -1276,7 +1276,7 @@ def EITC(MARS, DSI, EIC, c00100, e00300, e00400, e00600, c01000,
     return c59660
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def RefundablePayrollTaxCredit(was_plus_sey_p, was_plus_sey_s,
                                RPTC_c, RPTC_rt,
                                rptc_p, rptc_s, rptc):
@@ -1289,7 +1289,7 @@ def RefundablePayrollTaxCredit(was_plus_sey_p, was_plus_sey_s,
     return (rptc_p, rptc_s, rptc)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def ChildDepTaxCredit(n24, MARS, c00100, XTOT, num, c05800,
                       e07260, CR_ResidentialEnergy_hc,
                       e07300, CR_ForeignTax_hc,
@@ -1344,7 +1344,7 @@ def ChildDepTaxCredit(n24, MARS, c00100, XTOT, num, c05800,
     return (c07220, odc, codtc_limited)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def PersonalTaxCredit(MARS, c00100,
                       II_credit, II_credit_ps, II_credit_prt,
                       II_credit_nr, II_credit_nr_ps, II_credit_nr_prt,
@@ -1369,7 +1369,7 @@ def PersonalTaxCredit(MARS, c00100,
     return (personal_refundable_credit, personal_nonrefundable_credit)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def AmOppCreditParts(exact, e87521, num, c00100, CR_AmOppRefundable_hc,
                      CR_AmOppNonRefundable_hc, c10960, c87668):
     """
@@ -1428,7 +1428,7 @@ def AmOppCreditParts(exact, e87521, num, c00100, CR_AmOppRefundable_hc,
     return (c10960, c87668)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def SchR(age_head, age_spouse, MARS, c00100,
          c05800, e07300, c07180, e02400, c02500, e01500, e01700, CR_SchR_hc,
          c07200):
@@ -1483,7 +1483,7 @@ def SchR(age_head, age_spouse, MARS, c00100,
     return c07200
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def EducationTaxCredit(exact, e87530, MARS, c00100, num, c05800,
                        e07300, c07180, c07200, c87668,
                        LLC_Expense_c, ETC_pe_Single, ETC_pe_Married,
@@ -1545,7 +1545,7 @@ def EducationTaxCredit(exact, e87530, MARS, c00100, num, c05800,
     return c07230
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def CharityCredit(e19800, e20100, c00100, CR_Charity_rt, CR_Charity_f,
                   CR_Charity_frt, MARS, charity_credit):
     """
@@ -1559,7 +1559,7 @@ def CharityCredit(e19800, e20100, c00100, CR_Charity_rt, CR_Charity_f,
     return charity_credit
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def NonrefundableCredits(c05800, e07240, e07260, e07300, e07400,
                          e07600, p08000, odc,
                          personal_nonrefundable_credit,
@@ -1625,7 +1625,7 @@ def NonrefundableCredits(c05800, e07240, e07260, e07300, e07400,
             personal_nonrefundable_credit)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def AdditionalCTC(codtc_limited, ACTC_c, n24, earned, ACTC_Income_thd,
                   ACTC_rt, nu06, ACTC_rt_bonus_under6family, ACTC_ChildNum,
                   ptax_was, c03260, e09800, c59660, e11200,
@@ -1664,7 +1664,7 @@ def AdditionalCTC(codtc_limited, ACTC_c, n24, earned, ACTC_Income_thd,
     return c11070
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def C1040(c05800, c07180, c07200, c07220, c07230, c07240, c07260, c07300,
           c07400, c07600, c08000, e09700, e09800, e09900, niit, othertaxes,
           c07100, c09200, odc, charity_credit,
@@ -1685,7 +1685,7 @@ def C1040(c05800, c07180, c07200, c07220, c07230, c07240, c07260, c07300,
     return (c07100, othertaxes, c09200)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def CTC_new(CTC_new_c, CTC_new_rt, CTC_new_c_under6_bonus,
             CTC_new_ps, CTC_new_prt, CTC_new_for_all,
             CTC_new_refund_limited, CTC_new_refund_limit_payroll_rt,
@@ -1718,7 +1718,7 @@ def CTC_new(CTC_new_c, CTC_new_rt, CTC_new_c_under6_bonus,
     return ctc_new
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def IITAX(c59660, c11070, c10960, personal_refundable_credit, ctc_new, rptc,
           c09200, payrolltax,
           eitc, refund, iitax, combined):
@@ -1733,7 +1733,7 @@ def IITAX(c59660, c11070, c10960, personal_refundable_credit, ctc_new, rptc,
     return (eitc, refund, iitax, combined)
 
 
-@JIT(nopython=True)
+@JIT(nopython=True, nogil=True)
 def Taxes(income, MARS, tbrk_base,
           rate1, rate2, rate3, rate4, rate5, rate6, rate7, rate8,
           tbrk1, tbrk2, tbrk3, tbrk4, tbrk5, tbrk6, tbrk7):
@@ -1853,7 +1853,7 @@ def BenefitLimitation(calc):
         calc.incarray('combined', excess_benefit)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def FairShareTax(c00100, MARS, ptax_was, setax, ptax_amc,
                  FST_AGI_trt, FST_AGI_thd_lo, FST_AGI_thd_hi,
                  fstax, iitax, combined, surtax):
@@ -1898,7 +1898,7 @@ def FairShareTax(c00100, MARS, ptax_was, setax, ptax_amc,
     return (fstax, iitax, combined, surtax)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def LumpSumTax(DSI, num, XTOT,
                LST,
                lumpsum_tax, combined):
@@ -1913,7 +1913,7 @@ def LumpSumTax(DSI, num, XTOT,
     return (lumpsum_tax, combined)
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def ExpandIncome(e00200, pencon_p, pencon_s, e00300, e00400, e00600,
                  e00700, e00800, e00900, e01100, e01200, e01400, e01500,
                  e02000, e02100, p22250, p23250, cmbtp, ptax_was,
@@ -1948,7 +1948,7 @@ def ExpandIncome(e00200, pencon_p, pencon_s, e00300, e00400, e00600,
     return expanded_income
 
 
-@iterate_jit(nopython=True)
+@iterate_jit(nopython=True, nogil=True)
 def AfterTaxIncome(combined, expanded_income, aftertax_income):
     """
     Calculates after-tax expanded income.
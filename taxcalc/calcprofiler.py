@@ -0,0 +1,265 @@
+"""
+Tax-Calculator CalcProfiler class.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle calcprofiler.py
+# pylint --disable=locally-disabled calcprofiler.py
+
+import os
+import sys
+import json
+import time
+import threading
+import tracemalloc
+import contextlib
+import pandas as pd
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # pylint: disable=invalid-name
+
+
+class CalcProfiler():
+    """
+    Constructor for the CalcProfiler class, which is a context manager
+    that records the wall time (and optionally the bytes allocated) of
+    each call of the tax-calculation functions made in any thread while
+    it is active, so that the calls that dominate a calculation can be
+    identified.
+
+    Parameters
+    ----------
+    memory: boolean
+        whether or not to record the bytes allocated by each call, which
+        are traced using the tracemalloc module and so slow the calls,
+        and the growth of the peak resident set size of the process
+        during each call.
+
+    Raises
+    ------
+    ValueError:
+        if memory is True and the tracemalloc module cannot reset its
+        traced peak (which requires Python 3.9 or later), or when the
+        CalcProfiler is entered while another CalcProfiler is active.
+
+    Returns
+    -------
+    class instance: CalcProfiler
+
+    Notes
+    -----
+    Typical usage is:
+         with CalcProfiler() as prof:
+             calc.calc_all()
+         print(prof.table())
+         prof.write_chrome_trace('calc_all.json')
+    where the trace file can be viewed using chrome://tracing or
+    https://ui.perfetto.dev.
+
+    Each call is recorded in one of the LAYERS:
+    'tcio' is a stage of a TaxCalcIO analysis (reading the INPUT data,
+    aging them, calculating the reform and baseline taxes and the
+    marginal tax rates, building the dump output and writing each kind
+    of output);
+    'calculator' is a Calculator calc_all call;
+    'stage' is a call of a calc_all stage that is not an apply-style
+    function (BenefitPrograms, DeductionChoice, BenefitSurtax and
+    BenefitLimitation);
+    'dispatcher' is a call of an apply-style function created by the
+    iterate_jit decorator, which gets the parameter values and variable
+    arrays, calls its kernel and returns the calculated arrays;
+    'kernel' is a call of the compiled function that loops over the
+    filing units.
+    So the time of each call includes the time of the calls it makes in
+    the layers below it.  The bytes allocated by a call are the increase
+    of the traced memory peak during the call, which are only
+    approximate when several threads calculate concurrently.  The
+    resident set size of the process includes memory not traced by
+    tracemalloc, so its growth during the calls shows which of them
+    determine the peak_rss of the process.
+    """
+
+    LAYERS = ['tcio', 'calculator', 'stage', 'dispatcher', 'kernel']
+
+    # CalcProfiler object that is recording calls, or None
+    active = None
+
+    _activation_lock = threading.Lock()
+
+    def __init__(self, memory=False):
+        if memory and not hasattr(tracemalloc, 'reset_peak'):
+            raise ValueError('memory=True requires Python 3.9 or later')
+        self.memory = memory
+        # list of (name, layer, thread, start_ns, duration_ns, nbytes,
+        # rss_growth) tuples for the recorded calls in order of their
+        # completion
+        self.events = list()
+        self._origin_ns = time.perf_counter_ns()
+        self._started_tracing = False
+        self._local = threading.local()
+
+    def __enter__(self):
+        with CalcProfiler._activation_lock:
+            if CalcProfiler.active is not None:
+                raise ValueError('another CalcProfiler is active')
+            if self.memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            CalcProfiler.active = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        CalcProfiler.active = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    @staticmethod
+    def call(name, layer, func, *args, **kwargs):
+        """
+        Return value of func(*args, **kwargs), recording the call with the
+        name in the layer when a CalcProfiler is active.
+        """
+        profiler = CalcProfiler.active
+        if profiler is None:
+            return func(*args, **kwargs)
+        token = profiler._begin()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler._end(name, layer, token)
+
+    @staticmethod
+    def section(name, layer):
+        """
+        Return context manager that records the code it contains as a call
+        with the name in the layer when a CalcProfiler is active.
+        """
+        profiler = CalcProfiler.active
+        if profiler is None:
+            return contextlib.nullcontext()
+        return profiler._section(name, layer)
+
+    @staticmethod
+    def peak_rss():
+        """
+        Return peak resident set size of the process in bytes, or zero
+        when it cannot be determined on this platform.
+        """
+        if resource is None:
+            return 0  # pragma: no cover
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+    def table(self, layers=None):
+        """
+        Return Pandas DataFrame containing, for each name and layer of the
+        recorded calls in the list of layers (None implies all LAYERS),
+        the number of calls, their total seconds and their mean
+        milliseconds, plus the total bytes allocated by them and the total
+        growth of the peak resident set size during them when memory is
+        True, sorted by layer and decreasing total seconds.
+        """
+        columns = ['name', 'layer', 'calls', 'seconds', 'mean_ms']
+        if self.memory:
+            columns.extend(['bytes', 'rss_growth'])
+        events = self.events
+        if layers is not None:
+            events = [event for event in events if event[1] in layers]
+        if not events:
+            return pd.DataFrame(columns=columns)
+        edf = pd.DataFrame(events,
+                           columns=['name', 'layer', 'thread', 'start_ns',
+                                    'duration_ns', 'bytes', 'rss_growth'])
+        tdf = edf.groupby(['name', 'layer'], as_index=False).agg(
+            calls=('duration_ns', 'size'),
+            seconds=('duration_ns', 'sum'),
+            bytes=('bytes', 'sum'),
+            rss_growth=('rss_growth', 'sum')
+        )
+        tdf['seconds'] *= 1e-9
+        tdf['mean_ms'] = 1e3 * tdf['seconds'] / tdf['calls']
+        tdf['layer_order'] = tdf['layer'].map(
+            {layer: idx for idx, layer in enumerate(CalcProfiler.LAYERS)}
+        )
+        tdf = tdf.sort_values(['layer_order', 'seconds'],
+                              ascending=[True, False])
+        return tdf[columns].reset_index(drop=True)
+
+    def chrome_trace(self):
+        """
+        Return dictionary containing the recorded calls as complete events
+        in the Chrome trace event format, whose timestamps are microseconds
+        since the CalcProfiler object was created.
+        """
+        pid = os.getpid()
+        events = list()
+        for (name, layer, thread, start_ns, duration_ns, nbytes,
+             rss_growth) in sorted(self.events, key=lambda event: event[3]):
+            event = {'name': name, 'cat': layer, 'ph': 'X',
+                     'ts': (start_ns - self._origin_ns) / 1e3,
+                     'dur': duration_ns / 1e3, 'pid': pid, 'tid': thread}
+            if self.memory:
+                event['args'] = {'bytes': nbytes, 'rss_growth': rss_growth}
+            events.append(event)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path):
+        """
+        Write the chrome_trace dictionary to the JSON file at path.
+        """
+        with open(path, 'w') as tfile:
+            json.dump(self.chrome_trace(), tfile)
+
+    # ----- begin private methods of CalcProfiler class -----
+
+    @contextlib.contextmanager
+    def _section(self, name, layer):
+        """
+        Generator of context manager returned by section method.
+        """
+        token = self._begin()
+        try:
+            yield
+        finally:
+            self._end(name, layer, token)
+
+    def _begin(self):
+        """
+        Return token describing the start of a call.
+        """
+        peak = None
+        if self.memory:
+            # remember the calling thread's open calls so that each of
+            # them includes the traced peak of the calls it makes
+            stack = getattr(self._local, 'stack', None)
+            if stack is None:
+                stack = self._local.stack = list()
+            current, traced_peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1][0] = max(stack[-1][0], traced_peak)
+            tracemalloc.reset_peak()
+            peak = [current, current, CalcProfiler.peak_rss()]
+            stack.append(peak)
+        return (time.perf_counter_ns(), peak)
+
+    def _end(self, name, layer, token):
+        """
+        Record call with the name in the layer that began with the token.
+        """
+        end_ns = time.perf_counter_ns()
+        start_ns, peak = token
+        nbytes = 0
+        rss_growth = 0
+        if peak is not None:
+            stack = self._local.stack
+            stack.pop()
+            traced_peak = max(peak[0], tracemalloc.get_traced_memory()[1])
+            nbytes = max(traced_peak - peak[1], 0)
+            rss_growth = CalcProfiler.peak_rss() - peak[2]
+            if stack:
+                stack[-1][0] = max(stack[-1][0], traced_peak)
+        self.events.append((name, layer, threading.get_ident(), start_ns,
+                            end_ns - start_ns, nbytes, rss_growth))
@@ -8,6 +8,9 @@ Tax-Calculator federal income and payroll tax Calculator class.
 # pylint: disable=too-many-lines,no-value-for-parameter
 
 import copy
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 import paramtools
@@ -30,15 +33,53 @@ from taxcalc.records import Records
 from taxcalc.consumption import Consumption
 from taxcalc.growdiff import GrowDiff
 from taxcalc.growfactors import GrowFactors
+from taxcalc.groupingindex import GroupingIndex
+from taxcalc.tableaccumulator import TableAccumulator
+from taxcalc.calcprofiler import CalcProfiler
 from taxcalc.utils import (DIST_VARIABLES, create_distribution_table,
                            DIFF_VARIABLES, create_difference_table,
-                           create_diagnostic_table,
                            ce_aftertax_expanded_income,
                            mtr_graph_data, atr_graph_data, xtr_graph_plot,
                            pch_graph_data, pch_graph_plot)
 # import pdb
 
 
+# Stages of the _calc_one_year method in calling order, where the
+# DeductionChoice stage denotes the logic that chooses between the
+# standard deduction and itemized deductions (and so calls the TaxInc
+# through AMT functions three times).
+ONE_YEAR_STAGES = [
+    EI_PayrollTax, DependentCare, Adj, ALD_InvInc_ec_base, CapGains,
+    SSBenefits, AGI, ItemDedCap, ItemDed, AdditionalMedicareTax, StdDed,
+    'DeductionChoice',
+    F2441, EITC, RefundablePayrollTaxCredit, PersonalTaxCredit,
+    AmOppCreditParts, SchR, EducationTaxCredit, CharityCredit,
+    ChildDepTaxCredit, NonrefundableCredits, AdditionalCTC, C1040,
+    CTC_new, IITAX
+]
+# Stages of a complete calc_all call in calling order, which are called
+# by both the calc_all method and the calc_all_async coroutine.
+CALC_ALL_STAGES = (
+    [UBI, BenefitPrograms] +
+    ONE_YEAR_STAGES +
+    [BenefitSurtax, BenefitLimitation,
+     FairShareTax, LumpSumTax, ExpandIncome, AfterTaxIncome]
+)
+# Stages of an incremental calc_all call in calling order.  The
+# BenefitSurtax and BenefitLimitation functions are not stages because
+# incremental calculations are done only when they have no effect.
+INCREMENTAL_STAGES = [stage for stage in CALC_ALL_STAGES
+                      if stage not in (BenefitSurtax, BenefitLimitation)]
+TAXINC_TO_AMT_FUNCTIONS = [TaxInc, SchXYZTax, GainsTax, AGIsurtax,
+                           NetInvIncTax, AMT]
+ITEMIZED_DEDUCTION_VARIABLES = ['c04470', 'c21060', 'c21040',
+                                'c17000', 'c18300', 'c19200',
+                                'c19700', 'c20500', 'c20800']
+BENEFIT_VARIABLES = ['housing_ben', 'ssi_ben', 'snap_ben', 'tanf_ben',
+                     'vet_ben', 'wic_ben', 'mcare_ben', 'mcaid_ben',
+                     'e02400', 'e02300', 'ubi', 'other_ben']
+
+
 class Calculator():
     """
     Constructor for the Calculator class.
@@ -91,6 +132,11 @@ class Calculator():
     """
     # pylint: disable=too-many-public-methods
 
+    # (parameters, reads, writes, saves) name sets for each
+    # INCREMENTAL_STAGES item, which are set by the first
+    # _stage_signatures call
+    _STAGE_SIGNATURES = None
+
     def __init__(self, policy=None, records=None, verbose=False,
                  sync_years=True, consumption=None):
         # pylint: disable=too-many-arguments,too-many-branches
@@ -138,12 +184,18 @@ class Calculator():
         assert self.__policy.current_year == self.__records.current_year
         assert self.__policy.current_year == self.__consumption.current_year
         self.__stored_records = None
+        self.__calc_all_state = None
+        self.__records_digest = None
+        self.__grouping_indexes = dict()
+        self.__stored_grouping_indexes = None
 
     def increment_year(self):
         """
         Advance all embedded objects to next year.
         """
         next_year = self.__policy.current_year + 1
+        self.__calc_all_state = None
+        self.__grouping_indexes = dict()
         self.__records.increment_year()
         self.__policy.set_year(next_year)
         self.__consumption.set_year(next_year)
@@ -162,20 +214,103 @@ class Calculator():
             self.increment_year()
         assert self.current_year == year
 
-    def calc_all(self, zero_out_calc_vars=False):
+    def calc_all(self, zero_out_calc_vars=False, cache=None,
+                 incremental=False, growdiffs=None):
         """
         Call all tax-calculation functions for the current_year.
+
+        When cache is a ResultCache object, the cached variables are
+        restored from cache if an earlier calculation had the same input
+        data, policy, consumption, list of GrowDiff objects used to create
+        the growth factors (growdiffs, where None implies an empty list)
+        and current_year, in which case no tax-calculation functions are
+        called; otherwise, the cached variables are stored in cache after
+        being calculated.  The digest of the input data is computed only
+        once for each embedded Records object and year (and again after
+        the array, incarray or zeroarray method is used to set an input
+        variable), so input data changed in place between calc_all calls
+        that use a cache are not detected.
+
+        When incremental is True and the previous calc_all call was for
+        the current_year with the embedded Records object left unchanged
+        since then, only the tax-calculation functions that depend on the
+        policy and consumption parameters whose values have changed since
+        the previous call are called, along with the functions that use
+        variables calculated by those functions.  All the tax-calculation
+        functions are called when there was no previous incremental call,
+        when a benefit-repeal parameter has changed, or when the
+        BenefitSurtax or BenefitLimitation functions have an effect.
+        """
+        self.__grouping_indexes = dict()
+        with CalcProfiler.section('calc_all', 'calculator'):
+            if cache is not None:
+                records_digest = self._records_digest(cache)
+                cache_key = cache.key(self.__records, self.__policy,
+                                      self.__consumption, self.current_year,
+                                      growdiffs=growdiffs,
+                                      records_digest=records_digest)
+                if cache.restore(cache_key, self.__records):
+                    self.__calc_all_state = None
+                    return
+            if incremental and not zero_out_calc_vars and \
+                    self._benefit_functions_inactive():
+                self._calc_all_incremental()
+            else:
+                self.__calc_all_state = None
+                self._calc_all_stages(zero_out_calc_vars)
+            if cache is not None:
+                cache.store(cache_key, self.__records)
+
+    async def calc_all_async(self, zero_out_calc_vars=False, cache=None,
+                             incremental=False, executor=None,
+                             growdiffs=None):
+        """
+        Coroutine that does the same calculations as the calc_all method,
+        which has the same other arguments, in a thread of the executor (None
+        implies the default executor of the asyncio event loop), so that
+        the event loop is not blocked while the calculations are done.
+
+        Unless cache is specified or incremental is True, each of the
+        CALC_ALL_STAGES is calculated in a separate executor call, so
+        cancelling the task awaiting this coroutine stops the calculations
+        after the stage being calculated; calculated variables are then
+        incomplete until calc_all (or this coroutine) is called again.
+        The same Calculator object must not be used by other threads or
+        tasks while this coroutine is being awaited.
+        """
+        loop = asyncio.get_running_loop()
+        if cache is not None or incremental:
+            await loop.run_in_executor(
+                executor, functools.partial(self.calc_all,
+                                            zero_out_calc_vars, cache,
+                                            incremental, growdiffs)
+            )
+            return
+        self.__grouping_indexes = dict()
+        self.__calc_all_state = None
+        for step in self._calc_all_steps(zero_out_calc_vars):
+            await loop.run_in_executor(executor, step)
+
+    def _calc_all_stages(self, zero_out_calc_vars):
+        """
+        Call all tax-calculation functions in calc_all() method.
         """
         # conducts static analysis of Calculator object for current_year
-        UBI(self.__policy, self.__records)
-        BenefitPrograms(self)
-        self._calc_one_year(zero_out_calc_vars)
-        BenefitSurtax(self)
-        BenefitLimitation(self)
-        FairShareTax(self.__policy, self.__records)
-        LumpSumTax(self.__policy, self.__records)
-        ExpandIncome(self.__policy, self.__records)
-        AfterTaxIncome(self.__policy, self.__records)
+        for step in self._calc_all_steps(zero_out_calc_vars):
+            step()
+
+    def _calc_all_steps(self, zero_out_calc_vars):
+        """
+        Generator that yields, in calling order, the functions without
+        arguments whose calls make up a complete calc_all calculation,
+        which are the CALC_ALL_STAGES preceded, when zero_out_calc_vars
+        is True, by the zeroing out of the changing calculated variables
+        at the start of the ONE_YEAR_STAGES.
+        """
+        for stage in CALC_ALL_STAGES:
+            if zero_out_calc_vars and stage is ONE_YEAR_STAGES[0]:
+                yield self.__records.zero_out_changing_calculated_vars
+            yield functools.partial(self._call_stage, stage)
 
     def weighted_total(self, variable_name):
         """
@@ -221,6 +356,9 @@ class Calculator():
         if variable_value is None:
             return getattr(self.__records, variable_name)
         assert isinstance(variable_value, np.ndarray)
+        self.__calc_all_state = None
+        self._forget_records_digest(variable_name)
+        self.__grouping_indexes = dict()
         setattr(self.__records, variable_name, variable_value)
         return None
 
@@ -239,6 +377,9 @@ class Calculator():
         Add variable_add to named variable in embedded Records object.
         """
         assert isinstance(variable_add, np.ndarray)
+        self.__calc_all_state = None
+        self._forget_records_digest(variable_name)
+        self.__grouping_indexes = dict()
         setattr(self.__records, variable_name,
                 self.array(variable_name) + variable_add)
 
@@ -246,6 +387,9 @@ class Calculator():
         """
         Set named variable in embedded Records object to zeros.
         """
+        self.__calc_all_state = None
+        self._forget_records_digest(variable_name)
+        self.__grouping_indexes = dict()
         setattr(self.__records, variable_name, np.zeros(self.array_len))
 
     def store_records(self):
@@ -256,6 +400,7 @@ class Calculator():
         """
         assert self.__stored_records is None
         self.__stored_records = copy.deepcopy(self.__records)
+        self.__stored_grouping_indexes = self.__grouping_indexes
 
     def restore_records(self):
         """
@@ -264,6 +409,9 @@ class Calculator():
         """
         assert isinstance(self.__stored_records, Records)
         self.__records = copy.deepcopy(self.__stored_records)
+        self.__calc_all_state = None
+        self.__grouping_indexes = self.__stored_grouping_indexes
+        self.__stored_grouping_indexes = None
         del self.__stored_records
         self.__stored_records = None
 
@@ -274,6 +422,39 @@ class Calculator():
         """
         return self.__records.array_length
 
+    def grouping_index(self, income_measure='expanded_income',
+                       pop_quantiles=False, weight_by_income_measure=False,
+                       mars='ALL'):
+        """
+        Return GroupingIndex object that assigns the filing units to table
+        rows using the named income_measure variable, where the quantiles
+        contain an equal number of people when pop_quantiles is True, an
+        equal number of income dollars when weight_by_income_measure is
+        True, or else an equal number of filing units.  When mars is not
+        'ALL', only the filing units with that MARS value are included.
+        The returned object is cached until the embedded Records object
+        changes (for example, by a calc_all call), so the table rows used
+        by the distribution_tables, difference_table and graph methods
+        are computed only once.
+        """
+        key = (income_measure, pop_quantiles, weight_by_income_measure,
+               mars)
+        if key not in self.__grouping_indexes:
+            income = self.array(income_measure)
+            weight = self.array('s006')
+            xtot = self.array('XTOT') if pop_quantiles else None
+            if mars != 'ALL':
+                selected = self.array('MARS') == mars
+                income = income[selected]
+                weight = weight[selected]
+                if xtot is not None:
+                    xtot = xtot[selected]
+            self.__grouping_indexes[key] = GroupingIndex(
+                income, weight, xtot=xtot,
+                weight_by_income_measure=weight_by_income_measure
+            )
+        return self.__grouping_indexes[key]
+
     def policy_param(self, param_name, param_value=None):
         """
         If param_value is None, return named parameter in
@@ -340,21 +521,24 @@ class Calculator():
         Returns
         -------
         Pandas DataFrame object containing the multi-year diagnostic table
+
+        Notes
+        -----
+        The MultiYearRunner diagnostic_table method returns the same table
+        with each year computed in a separate worker process.
         """
         assert num_years >= 1
         max_num_years = self.__policy.end_year - self.__policy.current_year + 1
         assert num_years <= max_num_years
         calc = copy.deepcopy(self)
-        yearlist = list()
-        varlist = list()
+        accumulator = TableAccumulator()
         for iyr in range(1, num_years + 1):
             calc.calc_all()
-            yearlist.append(calc.current_year)
-            varlist.append(calc.dataframe(DIST_VARIABLES))
+            accumulator.add(calc)
             if iyr < num_years:
                 calc.increment_year()
         del calc
-        return create_diagnostic_table(varlist, yearlist)
+        return accumulator.diagnostic_table()
 
     def distribution_tables(self, calc, groupby,
                             pop_quantiles=False, scaling=True):
@@ -448,8 +632,10 @@ class Calculator():
                                calc.array('s006'))  # check rows in same order
         var_dataframe = distribution_table_dataframe(self)
         imeasure = 'expanded_income'
+        gindex = self.grouping_index(imeasure, pop_quantiles)
         dt1 = create_distribution_table(var_dataframe, groupby, imeasure,
-                                        pop_quantiles, scaling)
+                                        pop_quantiles, scaling,
+                                        gindex.table_row(groupby))
         del var_dataframe
         if calc is None:
             dt2 = None
@@ -461,11 +647,13 @@ class Calculator():
             var_dataframe = distribution_table_dataframe(calc)
             if have_same_income_measure(self, calc):
                 imeasure = 'expanded_income'
+                gindex = calc.grouping_index(imeasure, pop_quantiles)
             else:
                 imeasure = 'expanded_income_baseline'
                 var_dataframe[imeasure] = self.array('expanded_income')
             dt2 = create_distribution_table(var_dataframe, groupby, imeasure,
-                                            pop_quantiles, scaling)
+                                            pop_quantiles, scaling,
+                                            gindex.table_row(groupby))
             del var_dataframe
         return (dt1, dt2)
 
@@ -522,8 +710,10 @@ class Calculator():
                            calc.consump_benval_params())
         self_var_dframe = self.dataframe(DIFF_VARIABLES)
         calc_var_dframe = calc.dataframe(DIFF_VARIABLES)
+        gindex = self.grouping_index('expanded_income', pop_quantiles)
         diff = create_difference_table(self_var_dframe, calc_var_dframe,
-                                       groupby, tax_to_diff, pop_quantiles)
+                                       groupby, tax_to_diff, pop_quantiles,
+                                       gindex.table_row(groupby))
         del self_var_dframe
         del calc_var_dframe
         return diff
@@ -827,13 +1017,20 @@ class Calculator():
             income_variable = 'e00200'
         # check validity of mtr_measure parameter
         assert mtr_measure in ('combined', 'itax', 'ptax')
-        # calculate marginal tax rates
-        (mtr1_ptax, mtr1_itax,
-         mtr1_combined) = self.mtr(variable_str=mtr_variable,
-                                   wrt_full_compensation=mtr_wrt_full_compen)
-        (mtr2_ptax, mtr2_itax,
-         mtr2_combined) = calc.mtr(variable_str=mtr_variable,
-                                   wrt_full_compensation=mtr_wrt_full_compen)
+        # calculate marginal tax rates, in concurrent threads when the two
+        # Calculator objects are distinct because the tax-calculation
+        # functions release the GIL
+        mtr_func = functools.partial(
+            Calculator.mtr, variable_str=mtr_variable,
+            wrt_full_compensation=mtr_wrt_full_compen
+        )
+        if calc is self:
+            mtrs = [mtr_func(self), mtr_func(calc)]
+        else:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                mtrs = list(pool.map(mtr_func, [self, calc]))
+        (mtr1_ptax, mtr1_itax, mtr1_combined) = mtrs[0]
+        (mtr2_ptax, mtr2_itax, mtr2_combined) = mtrs[1]
         if mtr_measure == 'combined':
             mtr1 = mtr1_combined
             mtr2 = mtr2_combined
@@ -863,7 +1060,11 @@ class Calculator():
                               mtr_wrt_full_compen=mtr_wrt_full_compen,
                               income_measure=income_measure,
                               pop_quantiles=pop_quantiles,
-                              dollar_weighting=dollar_weighting)
+                              dollar_weighting=dollar_weighting,
+                              table_row=self.grouping_index(
+                                  income_variable, pop_quantiles,
+                                  dollar_weighting, mars
+                              ).table_row('percentiles'))
         # delete intermediate variables
         del vdf
         del mtr1_ptax
@@ -968,7 +1169,11 @@ class Calculator():
                               year=self.current_year,
                               mars=mars,
                               atr_measure=atr_measure,
-                              pop_quantiles=pop_quantiles)
+                              pop_quantiles=pop_quantiles,
+                              table_row=self.grouping_index(
+                                  'expanded_income', pop_quantiles,
+                                  mars=mars
+                              ).table_row('percentiles'))
         # delete intermediate variables
         del vdf
         del record_variables
@@ -1026,8 +1231,10 @@ class Calculator():
         vdf['expanded_income'] = vdf1['expanded_income']
         vdf['chg_aftinc'] = vdf2['aftertax_income'] - vdf1['aftertax_income']
         # construct data for graph
+        gindex = self.grouping_index('expanded_income', pop_quantiles)
         data = pch_graph_data(vdf, year=self.current_year,
-                              pop_quantiles=pop_quantiles)
+                              pop_quantiles=pop_quantiles,
+                              table_row=gindex.table_row('percentiles'))
         del vdf
         del vdf1
         del vdf2
@@ -1344,6 +1551,161 @@ class Calculator():
 
     # ----- begin private methods of Calculator class -----
 
+    def _param_values(self):
+        """
+        Return dictionary of copies of the current_year values of all the
+        embedded policy and consumption parameters.
+        """
+        values = dict()
+        for params in (self.__policy, self.__consumption):
+            for pname in params:
+                values[pname] = np.array(getattr(params, pname))
+        return values
+
+    def _benefit_functions_inactive(self):
+        """
+        Return True if neither the BenefitSurtax function nor the
+        BenefitLimitation function has an effect in current_year.
+        """
+        return (self.__policy.ID_BenefitSurtax_crt == 1. and
+                self.__policy.ID_BenefitCap_rt == 1.)
+
+    def _forget_records_digest(self, variable_name):
+        """
+        Forget the digest of the input variables in the embedded Records
+        object if variable_name is one of them.
+        """
+        if variable_name in self.__records.USABLE_READ_VARS or \
+                variable_name == 's006':
+            self.__records_digest = None
+
+    def _records_digest(self, cache):
+        """
+        Return the cache records_digest of the input variables in the
+        embedded Records object, which is computed only once for each
+        Records object and year.
+        """
+        if self.__records_digest is not None:
+            records, year, digest = self.__records_digest
+            if records is self.__records and year == self.current_year:
+                return digest
+        digest = cache.records_digest(self.__records)
+        self.__records_digest = (self.__records, self.current_year, digest)
+        return digest
+
+    def _calc_all_incremental(self):
+        """
+        Call the INCREMENTAL_STAGES that use, directly or through the
+        variables calculated by other stages, parameters whose values
+        have changed since the previous incremental calc_all call, or
+        call all the stages if there was no such call for the current_year
+        using the same unchanged Records object or if a benefit-repeal
+        parameter has changed.  The values that each stage reads of the
+        variables calculated by the same or a later stage are saved so
+        that the stage can be called again without calling the earlier
+        stages that calculate them.
+        """
+        values = self._param_values()
+        changed = None
+        prior_saved = None
+        if self.__calc_all_state is not None:
+            records, year, prior_values, prior_saved = self.__calc_all_state
+            if records is self.__records and year == self.current_year:
+                changed = set(pname for pname, value in values.items()
+                              if not np.array_equal(value,
+                                                    prior_values[pname]))
+                if any(pname.endswith('_repeal') for pname in changed):
+                    changed = None
+        saved = list()
+        stale_vars = set()
+        for idx, stage in enumerate(INCREMENTAL_STAGES):
+            params, reads, writes, saves = Calculator._stage_signatures()[idx]
+            # a stage is stale if it uses a changed parameter, reads a
+            # variable calculated by a stale stage, or calculates such a
+            # variable (so that variables calculated by several stages
+            # are calculated by each of them in calling order)
+            if changed is not None and not (params & changed or
+                                            (reads | writes) & stale_vars):
+                saved.append(prior_saved[idx])
+                continue
+            current = dict()
+            stage_saved = dict()
+            for var in saves:
+                if changed is None or var in stale_vars:
+                    stage_saved[var] = getattr(self.__records, var).copy()
+                else:
+                    stage_saved[var] = prior_saved[idx][var]
+                    current[var] = getattr(self.__records, var)
+                    setattr(self.__records, var, stage_saved[var].copy())
+            self._call_stage(stage)
+            for var, value in current.items():
+                if var not in writes:
+                    setattr(self.__records, var, value)
+            saved.append(stage_saved)
+            stale_vars |= writes
+        self.__calc_all_state = (self.__records, self.current_year,
+                                 values, saved)
+
+    def _call_stage(self, stage):
+        """
+        Call the stage function, or the _deduction_choice method when stage
+        is 'DeductionChoice', with the arguments that the stage requires.
+        """
+        if stage == 'DeductionChoice':
+            CalcProfiler.call(stage, 'stage', self._deduction_choice)
+        elif stage in (BenefitPrograms, BenefitSurtax, BenefitLimitation):
+            CalcProfiler.call(stage.__name__, 'stage', stage, self)
+        else:
+            stage(self.__policy, self.__records)
+
+    @staticmethod
+    def _stage_signatures():
+        """
+        Return list containing a (parameters, reads, writes, saves) tuple
+        of name sets for each of the INCREMENTAL_STAGES, where saves
+        contains the variables read by the stage that are calculated by
+        the same or a later stage.  The sets are derived from the
+        signatures of the calc functions.
+        """
+        if Calculator._STAGE_SIGNATURES is not None:
+            return Calculator._STAGE_SIGNATURES
+
+        def signature(funcs):
+            """
+            Return (parameters, reads, writes) tuple for calc funcs.
+            """
+            params = set()
+            reads = set()
+            writes = set()
+            for func in funcs:
+                params |= set(func.parameters)
+                reads |= set(func.read_args) - set(func.parameters)
+                writes |= set(func.out_args)
+            return (params, reads, writes)
+
+        signatures = list()
+        for stage in INCREMENTAL_STAGES:
+            if stage is BenefitPrograms:
+                params = set('BEN_{}_value'.format(var)
+                             for var in Consumption.BENEFIT_VARS)
+                signatures.append((params, set(BENEFIT_VARIABLES),
+                                   set(['benefit_cost_total',
+                                        'benefit_value_total'])))
+            elif stage == 'DeductionChoice':
+                params, reads, writes = signature(TAXINC_TO_AMT_FUNCTIONS)
+                dedvars = set(['standard'] + ITEMIZED_DEDUCTION_VARIABLES)
+                signatures.append((params, reads | dedvars,
+                                   writes | dedvars))
+            else:
+                signatures.append(signature([stage]))
+        later_writes = set()
+        for idx in reversed(range(len(signatures))):
+            params, reads, writes = signatures[idx]
+            later_writes |= writes
+            signatures[idx] = (params, reads, writes, reads & later_writes)
+        Calculator._STAGE_SIGNATURES = signatures
+        return signatures
+
     def _taxinc_to_amt(self):
         """
         Call TaxInc through AMT functions.
@@ -1359,21 +1721,17 @@ class Calculator():
         """
         Call all the functions except those in the calc_all() method.
         """
-        # pylint: disable=too-many-statements
         if zero_out_calc_vars:
             self.__records.zero_out_changing_calculated_vars()
-        # pdb.set_trace()
-        EI_PayrollTax(self.__policy, self.__records)
-        DependentCare(self.__policy, self.__records)
-        Adj(self.__policy, self.__records)
-        ALD_InvInc_ec_base(self.__policy, self.__records)
-        CapGains(self.__policy, self.__records)
-        SSBenefits(self.__policy, self.__records)
-        AGI(self.__policy, self.__records)
-        ItemDedCap(self.__policy, self.__records)
-        ItemDed(self.__policy, self.__records)
-        AdditionalMedicareTax(self.__policy, self.__records)
-        StdDed(self.__policy, self.__records)
+        for stage in ONE_YEAR_STAGES:
+            self._call_stage(stage)
+
+    def _deduction_choice(self):
+        """
+        Call TaxInc through AMT functions with the standard deduction and
+        with itemized deductions, and then again with the deduction that
+        produces the lower tax for each filing unit.
+        """
         # Store calculated standard deduction, calculate
         # taxes with standard deduction, store AMT + Regular Tax
         std = self.array('standard').copy()
@@ -1420,17 +1778,3 @@ class Calculator():
         del item_cvar
         # Calculate taxes with optimal itemized deduction
         self._taxinc_to_amt()
-        F2441(self.__policy, self.__records)
-        EITC(self.__policy, self.__records)
-        RefundablePayrollTaxCredit(self.__policy, self.__records)
-        PersonalTaxCredit(self.__policy, self.__records)
-        AmOppCreditParts(self.__policy, self.__records)
-        SchR(self.__policy, self.__records)
-        EducationTaxCredit(self.__policy, self.__records)
-        CharityCredit(self.__policy, self.__records)
-        ChildDepTaxCredit(self.__policy, self.__records)
-        NonrefundableCredits(self.__policy, self.__records)
-        AdditionalCTC(self.__policy, self.__records)
-        C1040(self.__policy, self.__records)
-        CTC_new(self.__policy, self.__records)
-        IITAX(self.__policy, self.__records)
@@ -11,6 +11,7 @@ import sys
 import argparse
 import difflib
 import taxcalc as tc
+from taxcalc.cli.tcserver import TaxCalcServer
 
 
 TEST_INPUT_FILENAME = 'test.csv'
@@ -24,7 +25,7 @@ def cli_tc_main():
     # pylint: disable=too-many-statements,too-many-branches
     # pylint: disable=too-many-return-statements
     # parse command-line arguments:
-    usage_str = 'tc INPUT TAXYEAR {}{}{}{}{}'.format(
+    usage_str = 'tc INPUT TAXYEAR {}{}{}{}{}{}{}'.format(
         '[--help]\n',
         ('          '
          '[--baseline BASELINE] [--reform REFORM] [--assump  ASSUMP]\n'),
@@ -32,6 +33,12 @@ def cli_tc_main():
          '[--exact] [--tables] [--graphs]\n'),
         ('          '
          '[--dump] [--dvars DVARS] [--sqldb] [--outdir OUTDIR]\n'),
+        ('          '
+         '[--chunksize CHUNKSIZE] [--format FORMAT]\n'),
+        ('          '
+         '[--reforms REFORMS [REFORMS ...]] [--workers WORKERS]\n'),
+        ('          '
+         '[--serve PORT]\n'),
         ('          '
          '[--test] [--version]'))
     parser = argparse.ArgumentParser(
@@ -80,7 +87,11 @@ def cli_tc_main():
                         action="store_true")
     parser.add_argument('--tables',
                         help=('optional flag that causes distributional '
-                              'tables to be written to a text file.'),
+                              'tables to be written to a text file.  The '
+                              'tables use ten numbers (80 bytes) for each '
+                              'INPUT filing unit, which are kept in memory '
+                              'even with the --chunksize option because the '
+                              'table deciles depend on all the incomes.'),
                         default=False,
                         action="store_true")
     parser.add_argument('--graphs',
@@ -119,6 +130,73 @@ def cli_tc_main():
                               'No --outdir implies output files are written '
                               'in the current directory.'),
                         default=None)
+    parser.add_argument('--chunksize',
+                        help=('CHUNKSIZE is optional number of INPUT filing '
+                              'units that are read, aged and analyzed at a '
+                              'time, which bounds memory use for large INPUT '
+                              'files.  The OUTPUT of each chunk is appended '
+                              'to the OUTPUT file.  Cannot be used with the '
+                              '--graphs option.  No --chunksize implies all '
+                              'INPUT filing units are analyzed at once.'),
+                        type=int,
+                        default=None)
+    parser.add_argument('--format',
+                        help=('FORMAT is optional format of the OUTPUT file, '
+                              'which is one of csv, parquet, feather or npz.  '
+                              'The binary formats contain typed columns and '
+                              'are much faster to write and read than csv '
+                              'for --dump OUTPUT.  The parquet and feather '
+                              'formats require the pyarrow package.  Cannot '
+                              'be used with the --chunksize option.  No '
+                              '--format implies a CSV-formatted OUTPUT file.'),
+                        choices=list(tc.TaxCalcIO.OUTPUT_FORMATS),
+                        default='csv')
+    parser.add_argument('--reforms',
+                        help=('REFORMS are names of one or more JSON reform '
+                              'files, each of which can be a compound reform, '
+                              'that are analyzed in parallel after reading '
+                              'and extrapolating INPUT only once.  A separate '
+                              'OUTPUT file (and --tables file) is written for '
+                              'each reform, named as if it had been specified '
+                              'using the --reform option.  Cannot be used '
+                              'with the --reform, --graphs, --dump, --sqldb '
+                              'or --chunksize options.'),
+                        nargs='+',
+                        default=None)
+    parser.add_argument('--workers',
+                        help=('WORKERS is optional maximum number of worker '
+                              'processes used to analyze the --reforms.  '
+                              'No --workers implies the number of CPUs.'),
+                        type=int,
+                        default=None)
+    parser.add_argument('--serve',
+                        help=('PORT is number of local port on which tc runs '
+                              'a server that keeps the INPUT, extrapolated to '
+                              'TAXYEAR, in memory and answers HTTP requests '
+                              'to analyze reforms of the INPUT until it is '
+                              'interrupted.  Each request specifies its '
+                              'reforms, assumptions and whether or not to '
+                              'return tables.  The --workers option limits '
+                              'the number of worker processes used by each '
+                              'request.  Cannot be used with the --reform, '
+                              '--reforms, --assump, --tables, --graphs, '
+                              '--dump, --sqldb, --outdir or --chunksize '
+                              'options.'),
+                        metavar='PORT',
+                        type=int,
+                        default=None)
+    parser.add_argument('--memprofile',
+                        help=('optional flag that writes a text file '
+                              'containing the peak memory used by tc and '
+                              'the memory allocated by each stage of the '
+                              'analysis (such as reading and aging INPUT, '
+                              'calculating taxes and marginal tax rates, and '
+                              'writing --dump and --sqldb output).  Tracing '
+                              'the memory allocations slows the analysis.  '
+                              'Cannot be used with the --reforms or --serve '
+                              'options.'),
+                        default=False,
+                        action="store_true")
     parser.add_argument('--test',
                         help=('optional flag that conducts installation '
                               'test, writes test result to stdout, '
@@ -143,21 +221,82 @@ def cli_tc_main():
     else:
         inputfn = args.INPUT
         taxyear = args.TAXYEAR
+    if args.chunksize is not None and args.graphs:
+        msg = 'ERROR: --chunksize cannot be used with --graphs\n'
+        sys.stderr.write(msg)
+        sys.stderr.write('USAGE: tc --help\n')
+        return 1
+    if args.reforms is not None:
+        conflicts = [opt for opt, used in [('--reform', args.reform),
+                                           ('--graphs', args.graphs),
+                                           ('--dump', args.dump),
+                                           ('--sqldb', args.sqldb),
+                                           ('--chunksize', args.chunksize),
+                                           ('--memprofile', args.memprofile)]
+                     if used]
+        if conflicts:
+            msg = 'ERROR: --reforms cannot be used with {}\n'
+            sys.stderr.write(msg.format(' or '.join(conflicts)))
+            sys.stderr.write('USAGE: tc --help\n')
+            return 1
+        return _analyze_reforms(args, inputfn, taxyear)
+    if args.serve is not None:
+        conflicts = [opt for opt, used in [('--reform', args.reform),
+                                           ('--reforms', args.reforms),
+                                           ('--assump', args.assump),
+                                           ('--tables', args.tables),
+                                           ('--graphs', args.graphs),
+                                           ('--dump', args.dump),
+                                           ('--sqldb', args.sqldb),
+                                           ('--outdir', args.outdir),
+                                           ('--chunksize', args.chunksize),
+                                           ('--memprofile', args.memprofile)]
+                     if used]
+        if conflicts:
+            msg = 'ERROR: --serve cannot be used with {}\n'
+            sys.stderr.write(msg.format(' or '.join(conflicts)))
+            sys.stderr.write('USAGE: tc --help\n')
+            return 1
+        return _serve(args, inputfn, taxyear)
     # instantiate TaxCalcIO object and do tax analysis
     tcio = tc.TaxCalcIO(input_data=inputfn, tax_year=taxyear,
                         baseline=args.baseline,
                         reform=args.reform, assump=args.assump,
-                        outdir=args.outdir)
+                        outdir=args.outdir,
+                        output_format=args.format)
     if tcio.errmsg:
         sys.stderr.write(tcio.errmsg)
         sys.stderr.write('USAGE: tc --help\n')
         return 1
+    if args.memprofile:
+        with tc.CalcProfiler(memory=True) as profiler:
+            retcode = _analyze(args, tcio, inputfn, taxyear)
+        if retcode == 0:
+            tcio.write_memprofile_file(profiler)
+    else:
+        retcode = _analyze(args, tcio, inputfn, taxyear)
+    if retcode != 0:
+        return retcode
+    # compare test output with expected test output if --test option specified
+    if args.test:
+        retcode = _compare_test_output_files()
+        return retcode
+    return 0
+# end of cli_tc_main function code
+
+
+def _analyze(args, tcio, inputfn, taxyear):
+    """
+    Initialize the tcio TaxCalcIO object and conduct the tax analysis
+    specified by the args, returning zero, or one if there is an error.
+    """
     aging = inputfn.endswith('puf.csv') or inputfn.endswith('cps.csv')
     tcio.init(input_data=inputfn, tax_year=taxyear,
               baseline=args.baseline,
               reform=args.reform, assump=args.assump,
               aging_input_data=aging,
-              exact_calculations=args.exact)
+              exact_calculations=args.exact,
+              chunk_size=args.chunksize)
     if tcio.errmsg:
         sys.stderr.write(tcio.errmsg)
         sys.stderr.write('USAGE: tc --help\n')
@@ -184,12 +323,77 @@ def cli_tc_main():
                  dump_varset=dumpvar_set,
                  output_dump=args.dump,
                  output_sqldb=args.sqldb)
-    # compare test output with expected test output if --test option specified
-    if args.test:
-        retcode = _compare_test_output_files()
-        return retcode
     return 0
-# end of cli_tc_main function code
+
+
+def _analyze_reforms(args, inputfn, taxyear):
+    """
+    Private function that analyzes each of the --reforms using the same
+    INPUT data and writes the output files of each reform;
+    returns 0 if successful, otherwise returns 1.
+    """
+    tcios = list()
+    for reform in args.reforms:
+        tcio = tc.TaxCalcIO(input_data=inputfn, tax_year=taxyear,
+                            baseline=args.baseline,
+                            reform=reform, assump=args.assump,
+                            outdir=args.outdir,
+                            output_format=args.format)
+        if tcio.errmsg:
+            sys.stderr.write(tcio.errmsg)
+            sys.stderr.write('USAGE: tc --help\n')
+            return 1
+        tcios.append(tcio)
+    aging = inputfn.endswith('puf.csv') or inputfn.endswith('cps.csv')
+    runner = tcios[0].batch_runner(input_data=inputfn, tax_year=taxyear,
+                                   baseline=args.baseline,
+                                   assump=args.assump,
+                                   aging_input_data=aging,
+                                   exact_calculations=args.exact,
+                                   num_workers=args.workers)
+    if tcios[0].errmsg:
+        sys.stderr.write(tcios[0].errmsg)
+        sys.stderr.write('USAGE: tc --help\n')
+        return 1
+    try:
+        outputs = runner.run(args.reforms)
+    except ValueError as valerr_msg:
+        sys.stderr.write('ERROR: {}\n'.format(valerr_msg))
+        return 1
+    for tcio, reform, output in zip(tcios, args.reforms, outputs):
+        tcio.write_batch_files(runner, output, reform, args.assump,
+                               output_tables=args.tables)
+    return 0
+
+
+def _serve(args, inputfn, taxyear):
+    """
+    Private function that runs a TaxCalcServer on the --serve port of the
+    local host until it is interrupted;
+    returns 0 if interrupted, otherwise returns 1.
+    """
+    aging = inputfn.endswith('puf.csv') or inputfn.endswith('cps.csv')
+    try:
+        server = TaxCalcServer(('127.0.0.1', args.serve),
+                               input_data=inputfn, tax_year=taxyear,
+                               baseline=args.baseline,
+                               aging_input_data=aging,
+                               exact_calculations=args.exact,
+                               num_workers=args.workers)
+    except (ValueError, OSError) as err_msg:
+        sys.stderr.write('ERROR: {}\n'.format(str(err_msg).rstrip()))
+        sys.stderr.write('USAGE: tc --help\n')
+        return 1
+    msg = 'Serving {} for {} on http://{}:{}/ (press Ctrl-C to stop)\n'
+    sys.stdout.write(msg.format(inputfn, taxyear, *server.server_address))
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
 
 
 EXPECTED_TEST_OUTPUT_FILENAME = 'test-{}-out.csv'.format(str(TEST_TAXYEAR)[2:])
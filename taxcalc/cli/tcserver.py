@@ -0,0 +1,246 @@
+"""
+Tax-Calculator server used by the tc --serve option.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle tcserver.py
+# pylint --disable=locally-disabled tcserver.py
+
+import json
+import traceback
+import http.server
+import paramtools
+import taxcalc as tc
+
+
+class TaxCalcServer(http.server.HTTPServer):
+    """
+    Constructor for the TaxCalcServer class, which is a local HTTP server
+    that keeps the INPUT data, extrapolated to the TAXYEAR, and the compiled
+    tax-calculation functions in memory, so that each request to analyze
+    reforms of the INPUT data is answered without the startup cost of a
+    tc run.
+
+    A GET request returns a JSON object describing the INPUT and TAXYEAR.
+    A POST request contains a JSON object with these members:
+    "reforms", a list each item of which is a JSON reform file name (a
+    compound reform can be specified using two file names separated by a
+    plus (+) character) or a JSON reform object like those in a reform
+    file; "assump" (optional), a JSON assumption file name or a JSON
+    assumption object; and "tables" (optional), whether or not to return
+    the distributional tables.  The response is a JSON object whose
+    "outputs" member is a list containing, for each reform, the text of
+    the minimal OUTPUT file written by tc, and whose "tables" member (when
+    requested) is a list containing the text of each reform's tables file.
+    Invalid requests get a 400 response with an "error" member, and
+    requests that cause an unexpected error get a 500 response with an
+    "error" member (the traceback is written to the server log).
+
+    Parameters
+    ----------
+    address: tuple
+        (host, port) address on which the server listens, where port zero
+        implies any free port (see the server_address attribute).
+
+    input_data, tax_year, baseline, aging_input_data, exact_calculations:
+        same as the arguments of the TaxCalcIO init method.
+
+    num_workers: None or integer
+        maximum number of worker processes used to analyze the reforms in
+        one request; None implies the number of CPUs.
+
+    Raises
+    ------
+    ValueError:
+        if the INPUT, TAXYEAR or BASELINE are not valid.
+
+    Returns
+    -------
+    class instance: TaxCalcServer
+
+    Notes
+    -----
+    Requests are handled one at a time.  Because the extrapolated INPUT data
+    depend on the growdiff assumptions, the server keeps the data for each
+    of the RUNNER_CACHE_SIZE most recently used assumptions.
+    """
+
+    # number of distinct assumptions whose extrapolated data are kept
+    RUNNER_CACHE_SIZE = 2
+
+    def __init__(self, address, input_data, tax_year, baseline,
+                 aging_input_data, exact_calculations, num_workers=None):
+        # pylint: disable=too-many-arguments
+        self.tax_year = tax_year
+        self._tcio = tc.TaxCalcIO(input_data=input_data, tax_year=tax_year,
+                                  baseline=baseline, reform=None,
+                                  assump=None)
+        if self._tcio.errmsg:
+            raise ValueError(self._errors())
+        self._runner_args = {'input_data': input_data,
+                             'tax_year': tax_year,
+                             'baseline': baseline,
+                             'aging_input_data': aging_input_data,
+                             'exact_calculations': exact_calculations,
+                             'num_workers': num_workers}
+        self._runners = dict()
+        # read and extrapolate INPUT and compile the tax-calculation
+        # functions before accepting any requests
+        self.runner(None).baseline_output()
+        self._input_name = (input_data if isinstance(input_data, str)
+                            else 'DataFrame')
+        super().__init__(address, _RequestHandler)
+
+    def runner(self, assump):
+        """
+        Return BatchRunner object for the assump JSON text or file name,
+        which is created the first time this assump is used.
+        """
+        if assump in self._runners:
+            # move runner to the end of the least-recently-used order
+            self._runners[assump] = self._runners.pop(assump)
+            return self._runners[assump]
+        runner = self._tcio.batch_runner(assump=assump, **self._runner_args)
+        if runner is None:
+            raise ValueError(self._errors())
+        while len(self._runners) >= TaxCalcServer.RUNNER_CACHE_SIZE:
+            del self._runners[next(iter(self._runners))]
+        self._runners[assump] = runner
+        return runner
+
+    def info(self):
+        """
+        Return dictionary describing the INPUT and TAXYEAR.
+        """
+        return {'input': self._input_name, 'tax_year': self.tax_year,
+                'version': tc.__version__}
+
+    def analyze(self, request):
+        """
+        Return response dictionary for the request dictionary, which is
+        described in the class documentation.  Invalid requests raise a
+        ValueError.
+        """
+        if not isinstance(request, dict):
+            raise ValueError('request is not a JSON object')
+        unknown = set(request) - set(['reforms', 'assump', 'tables'])
+        if unknown:
+            msg = 'request contains unknown members {}'
+            raise ValueError(msg.format(sorted(unknown)))
+        reforms = request.get('reforms')
+        if not isinstance(reforms, list):
+            raise ValueError('reforms is not a list')
+        assump = request.get('assump')
+        if assump is not None:
+            assump = TaxCalcServer._json_arg(assump, 'assump')
+            TaxCalcServer._check_json(None, assump)
+        reforms = [TaxCalcServer._reform_arg(reform) for reform in reforms]
+        try:
+            runner = self.runner(assump)
+            outputs = runner.run(reforms)
+        except paramtools.ValidationError as valerr_msg:
+            raise ValueError(str(valerr_msg))
+        response = {'outputs': [
+            tc.TaxCalcIO.minimal_frame(output, self.tax_year).to_csv(
+                index=False, float_format='%.2f'
+            )
+            for output in outputs
+        ]}
+        if request.get('tables', False):
+            response['tables'] = [
+                tc.TaxCalcIO.tables_text(runner.table_data(output))
+                for output in outputs
+            ]
+        return response
+
+    # ----- begin private methods of TaxCalcServer class -----
+
+    def _errors(self):
+        """
+        Return TaxCalcIO error messages without their ERROR prefixes.
+        """
+        return '; '.join(line.replace('ERROR: ', '', 1)
+                         for line in self._tcio.errmsg.splitlines())
+
+    @staticmethod
+    def _reform_arg(reform):
+        """
+        Return reform argument of the BatchRunner run method, which is the
+        policy dictionary of a JSON reform object or a reform file name.
+        """
+        if isinstance(reform, dict):
+            return TaxCalcServer._check_json(json.dumps(reform),
+                                             None)['policy']
+        reform = TaxCalcServer._json_arg(reform, 'reform')
+        for ref in reform.split('+'):
+            TaxCalcServer._check_json(ref, None)
+        return reform
+
+    @staticmethod
+    def _check_json(reform, assump):
+        """
+        Return dictionary returned by the Calculator read_json_param_objects
+        method for the reform and assump arguments, raising a ValueError
+        when their JSON content is not structured like a reform file or an
+        assumption file.
+        """
+        try:
+            return tc.Calculator.read_json_param_objects(reform, assump)
+        except (AssertionError, AttributeError, KeyError, TypeError):
+            name = 'assump' if reform is None else 'reform'
+            msg = '{} {} is not structured like a JSON {} file'
+            text = reform if reform is not None else assump
+            raise ValueError(msg.format(name, text, name))
+
+    @staticmethod
+    def _json_arg(arg, name):
+        """
+        Return arg as a string, where a JSON object is converted into
+        JSON text.
+        """
+        if isinstance(arg, dict):
+            return json.dumps(arg, sort_keys=True)
+        if isinstance(arg, str):
+            return arg
+        raise ValueError('{} is neither a string nor an object'.format(name))
+
+
+class _RequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Handler of the requests received by a TaxCalcServer.
+    """
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Respond to GET request.
+        """
+        self._respond(200, self.server.info())
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """
+        Respond to POST request.
+        """
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length))
+            response = self.server.analyze(request)
+        except ValueError as valerr_msg:  # includes JSONDecodeError
+            self._respond(400, {'error': str(valerr_msg)})
+            return
+        except Exception:  # pylint: disable=broad-except
+            # respond instead of dropping the connection, which is what
+            # the socketserver module does with unexpected exceptions
+            self.log_error('%s', traceback.format_exc())
+            self._respond(500, {'error': 'unexpected error; see server log'})
+            return
+        self._respond(200, response)
+
+    def _respond(self, status, content):
+        """
+        Send response with status code and JSON content.
+        """
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
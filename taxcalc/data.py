@@ -7,6 +7,7 @@ Tax-Calculator abstract base data class.
 
 import os
 import abc
+import copy
 import numpy as np
 import pandas as pd
 from taxcalc.growfactors import GrowFactors
@@ -41,6 +42,12 @@ class Data():
         DataFrame already contains sample weights.
         NOTE: when using custom weights, set this argument to a DataFrame.
         NOTE: assumes weights are integers that are 100 times the real weights.
+        The weights are stored in weights_matrix, which is a read-only,
+        column-major numpy array of real weights with one row for each
+        record and one column for each year, so that the s006 weights of
+        each year are a copy of one contiguous column.  Copies of a Data
+        object share the weights_matrix rather than copying it.  The WT
+        property returns the weights in a DataFrame as they are read.
 
     Raises
     ------
@@ -96,21 +103,27 @@ class Data():
                     raise ValueError('gfactors is not a GrowFactors instance')
             self.gfactors = gfactors
             # read sample weights
-            self.WT = None
+            self.weights_matrix = None
+            self.__wt_column = dict()
             if self.__aging_data:
                 self._read_weights(weights)
-                # ... weights must be same size as data
-                if self.array_length != len(self.WT.index):
-                    # scale-up sub-sample weights by year-specific factor
-                    sum_full_weights = self.WT.sum()
-                    self.WT = self.WT.iloc[self.__index]
-                    sum_sub_weights = self.WT.sum()
-                    factor = sum_full_weights / sum_sub_weights
-                    self.WT *= factor
                 # ... construct sample weights for current_year
                 wt_colname = 'WT{}'.format(self.current_year)
-                if wt_colname in self.WT.columns:
-                    self.s006 = self.WT[wt_colname] * 0.01
+                if wt_colname in self.__wt_column:
+                    self._set_weights(wt_colname)
+
+    def __deepcopy__(self, memo):
+        """
+        Return deep copy of this object that shares its read-only arrays,
+        such as the weights_matrix, with this object.
+        """
+        for value in self.__dict__.values():
+            if isinstance(value, np.ndarray) and not value.flags.writeable:
+                memo[id(value)] = value
+        dup = self.__class__.__new__(self.__class__)
+        memo[id(self)] = dup
+        dup.__dict__.update(copy.deepcopy(self.__dict__, memo))
+        return dup
 
     @property
     def data_year(self):
@@ -133,6 +146,19 @@ class Data():
         """
         return self.__dim
 
+    @property
+    def WT(self):
+        """
+        Pandas DataFrame containing the sample weights of each year as they
+        are read (that is, 100 times the real weights, which are scaled up
+        for a sub-sample) or None if there are no weights.  The DataFrame
+        is built from the weights_matrix each time this property is used.
+        """
+        if self.weights_matrix is None:
+            return None
+        return pd.DataFrame(self.weights_matrix * 100.,
+                            columns=list(self.__wt_column))
+
     def increment_year(self):
         """
         Add one to current year; and also does
@@ -145,10 +171,17 @@ class Data():
             self._extrapolate(self.__current_year)
             # ... specify current-year sample weights
             wt_colname = 'WT{}'.format(self.__current_year)
-            self.s006 = self.WT[wt_colname] * 0.01
+            self._set_weights(wt_colname)
 
     # ----- begin private methods of Data class -----
 
+    def _set_weights(self, wt_colname):
+        """
+        Set s006 to a copy of the wt_colname column of the weights_matrix,
+        which is copied so that s006 can be changed like other variables.
+        """
+        self.s006 = self.weights_matrix[:, self.__wt_column[wt_colname]].copy()
+
     def _read_var_info(self):
         """
         Read Data variables metadata from JSON file and
@@ -252,8 +285,12 @@ class Data():
         """
         Read sample weights from file or
         use specified DataFrame as weights or
-        create empty DataFrame if None.
+        do nothing if None.
         NOTE: assumes weights are integers equal to 100 times the real weight.
+        When the data are a sub-sample of the records whose weights are
+        read, the weights of the sub-sample records are scaled up by a
+        year-specific factor so that their sum is the same as the sum of
+        all the read weights.
         """
         if weights is None:
             return
@@ -269,7 +306,20 @@ class Data():
             msg = 'weights is not None or a string or a Pandas DataFrame'
             raise ValueError(msg)
         assert isinstance(WT, pd.DataFrame)
-        setattr(self, 'WT', WT.astype(np.int32))
+        WT = WT.astype(np.int32)
+        wts = WT.values.astype(np.float64)
+        # ... weights must be same size as data
+        if self.array_length != len(WT.index):
+            # scale-up sub-sample weights by year-specific factor
+            sum_full_weights = wts.sum(axis=0)
+            wts = wts[np.asarray(self.__index)]
+            sum_sub_weights = wts.sum(axis=0)
+            wts *= sum_full_weights / sum_sub_weights
+        wts *= 0.01
+        self.__wt_column = {colname: col
+                            for col, colname in enumerate(WT.columns)}
+        self.weights_matrix = np.asfortranarray(wts)
+        self.weights_matrix.flags.writeable = False
         del WT
 
     def _extrapolate(self, year):
@@ -12,6 +12,7 @@ import ast
 import inspect
 import numba
 from taxcalc.policy import Policy
+from taxcalc.calcprofiler import CalcProfiler
 
 
 DO_JIT = True
@@ -58,6 +59,38 @@ class GetReturnNode(ast.NodeVisitor):
         return [node.value.id]
 
 
+class GetReadNames(ast.NodeVisitor):
+    """
+    A NodeVisitor to get the names whose values are read in the body of a
+    calc-style function, where the names in its return statement are not
+    read and augmented assignments read their target.
+    """
+    def __init__(self):
+        self.names = set()
+
+    def visit_Name(self, node):  # pylint: disable=invalid-name
+        """
+        visit_Name is used by NodeVisitor.visit method.
+        """
+        if isinstance(node.ctx, ast.Load):
+            self.names.add(node.id)
+
+    def visit_AugAssign(self, node):  # pylint: disable=invalid-name
+        """
+        visit_AugAssign is used by NodeVisitor.visit method.
+        """
+        if isinstance(node.target, ast.Name):
+            self.names.add(node.target.id)
+        self.generic_visit(node)
+
+    def visit_Return(self, node):  # pylint: disable=invalid-name
+        """
+        visit_Return is used by NodeVisitor.visit method.
+        The returned names are deliberately not visited because they are
+        outputs of the function rather than variables it reads.
+        """
+
+
 def create_apply_function_string(sigout, sigin, parameters):
     """
     Create a string for a function of the form::
@@ -254,8 +287,10 @@ def iterate_jit(parameters=None, **kwargs):
         # pylint: disable=too-many-locals
         # Get the input arguments from the function
         in_args = inspect.getfullargspec(func).args
-        # Get the numba.jit arguments
-        jit_args_list = inspect.getfullargspec(JIT).args + ['nopython']
+        # Get the numba.jit arguments, where compiling with nogil=True
+        # lets several threads call the jitted functions concurrently
+        jit_args_list = (inspect.getfullargspec(JIT).args +
+                         ['nopython', 'nogil'])
         kwargs_for_jit = dict()
         for key, val in kwargs.items():
             if key in jit_args_list:
@@ -286,6 +321,11 @@ def iterate_jit(parameters=None, **kwargs):
         if not all_out_args:
             raise ValueError("Can't find return statement in function!")
 
+        # Discover the arguments whose values are read by the function
+        grn = GetReadNames()
+        grn.visit(ast.parse(''.join(src)))
+        read_args = [arg for arg in in_args if arg in grn.names]
+
         # Now create the apply-style possibly-jitted function
         applied_jitted_f = make_apply_function(func,
                                                list(reversed(all_out_args)),
@@ -294,32 +334,59 @@ def iterate_jit(parameters=None, **kwargs):
                                                do_jit=DO_JIT,
                                                **kwargs_for_jit)
 
+        def profiled_jitted_f(*arrays):
+            """
+            Call applied_jitted_f recording the call as a kernel call
+            when a CalcProfiler is active.
+            """
+            return CalcProfiler.call(func.__name__, 'kernel',
+                                     applied_jitted_f, *arrays)
+
+        # high level functions already created for each pm_or_pf list
+        # and profiling state, which are never changed so that any thread
+        # can use them
+        high_level_fns = dict()
+
         def wrapper(*args, **kwargs):
             """
             wrapper function nested in make_wrapper function nested
             in iterate_jit decorator.
             """
-            in_arrays = []
             pm_or_pf = []
             for farg in all_out_args + in_args:
                 if hasattr(args[0], farg):
-                    in_arrays.append(getattr(args[0], farg))
                     pm_or_pf.append("pm")
                 elif hasattr(args[1], farg):
-                    in_arrays.append(getattr(args[1], farg))
                     pm_or_pf.append("pf")
-            # Create the high level function
-            high_level_func = create_toplevel_function_string(all_out_args,
-                                                              list(in_args),
-                                                              pm_or_pf)
-            func_code = compile(high_level_func, "<string>", "exec")
-            fakeglobals = {}
-            eval(func_code,  # pylint: disable=eval-used
-                 {"applied_f": applied_jitted_f}, fakeglobals)
-            high_level_fn = fakeglobals['hl_func']
+            profiling = CalcProfiler.active is not None
+            fn_key = (tuple(pm_or_pf), profiling)
+            high_level_fn = high_level_fns.get(fn_key)
+            if high_level_fn is None:
+                # Create the high level function
+                high_level_func = create_toplevel_function_string(
+                    all_out_args, list(in_args), pm_or_pf
+                )
+                func_code = compile(high_level_func, "<string>", "exec")
+                fakeglobals = {}
+                applied_f = (profiled_jitted_f if profiling
+                             else applied_jitted_f)
+                eval(func_code,  # pylint: disable=eval-used
+                     {"applied_f": applied_f}, fakeglobals)
+                high_level_fn = fakeglobals['hl_func']
+                high_level_fns[fn_key] = high_level_fn
+            if profiling:
+                return CalcProfiler.call(func.__name__, 'dispatcher',
+                                         high_level_fn, *args, **kwargs)
             ans = high_level_fn(*args, **kwargs)
             return ans
 
+        # record the signature of func so that callers can determine
+        # which parameters and variables the apply-style function uses
+        wrapper.__name__ = func.__name__
+        wrapper.in_args = list(in_args)
+        wrapper.out_args = list(all_out_args)
+        wrapper.read_args = read_args
+        wrapper.parameters = sorted(set(in_args) & set(all_parameters))
         return wrapper
 
     return make_wrapper
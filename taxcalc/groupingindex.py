@@ -0,0 +1,122 @@
+"""
+Tax-Calculator GroupingIndex class.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle groupingindex.py
+# pylint --disable=locally-disabled groupingindex.py
+
+import numpy as np
+from taxcalc.utils import (STANDARD_INCOME_BINS, SOI_AGI_BINS,
+                           quantile_table_row, income_table_row)
+
+
+class GroupingIndex():
+    """
+    Constructor for the GroupingIndex class, which assigns filing units to
+    the rows of distribution tables, difference tables and graphs, and
+    which computes the sort order and each kind of table row only once.
+
+    Parameters
+    ----------
+    income: numpy array
+        income measure values of the filing units.
+
+    weight: numpy array
+        sample weights, s006, of the filing units.
+
+    xtot: numpy array or None
+        number of exemptions, XTOT, of the filing units when quantiles
+        contain an equal number of people; None when quantiles contain an
+        equal number of filing units.
+
+    weight_by_income_measure: boolean
+        whether or not quantiles contain an equal number of income dollars.
+
+    Raises
+    ------
+    ValueError:
+        if the arrays do not have the same length.
+
+    Returns
+    -------
+    class instance: GroupingIndex
+
+    Notes
+    -----
+    Typical usage is "calc.grouping_index().table_row('weighted_deciles')",
+    where the Calculator grouping_index method returns a cached object
+    for the specified income measure and weighting.
+    """
+
+    # number of table rows for each valid groupby value
+    NUM_ROWS = {
+        'weighted_deciles': 14,
+        'deciles': 10,
+        'percentiles': 100,
+        'standard_income_bins': len(STANDARD_INCOME_BINS) - 1,
+        'soi_agi_bins': len(SOI_AGI_BINS) - 1
+    }
+
+    def __init__(self, income, weight, xtot=None,
+                 weight_by_income_measure=False):
+        self.income = np.asarray(income)
+        self.weight = np.asarray(weight)
+        self.xtot = None if xtot is None else np.asarray(xtot)
+        if self.weight.size != self.income.size or (
+                self.xtot is not None and self.xtot.size != self.income.size):
+            raise ValueError('income, weight and xtot lengths differ')
+        if weight_by_income_measure and xtot is not None:
+            raise ValueError('weight_by_income_measure with xtot array')
+        self.weight_by_income_measure = weight_by_income_measure
+        self._sort_order = None
+        self._table_rows = dict()
+
+    @property
+    def sort_order(self):
+        """
+        Indexes that sort the filing units by their (adjusted) income.
+        """
+        if self._sort_order is None:
+            if self.xtot is None:
+                adj_income = self.income
+            else:
+                adj_income = np.divide(
+                    self.income,
+                    np.sqrt(np.where(self.xtot == 0, 1, self.xtot))
+                )
+            self._sort_order = np.argsort(adj_income, kind='quicksort')
+        return self._sort_order
+
+    def table_row(self, groupby):
+        """
+        Return integer array containing the zero-based table row of each
+        filing unit for the specified groupby value, which is one of the
+        GroupingIndex.NUM_ROWS keys.  The returned array must not be
+        changed because it is cached for later calls.
+        """
+        if groupby not in GroupingIndex.NUM_ROWS:
+            raise ValueError('groupby="{}" is not valid'.format(groupby))
+        if groupby not in self._table_rows:
+            if groupby == 'standard_income_bins':
+                trow = income_table_row(self.income, STANDARD_INCOME_BINS)
+            elif groupby == 'soi_agi_bins':
+                trow = income_table_row(self.income, SOI_AGI_BINS)
+            else:
+                trow = quantile_table_row(
+                    self.income, self.weight,
+                    100 if groupby == 'percentiles' else 10,
+                    xtot=self.xtot,
+                    decile_details=(groupby == 'weighted_deciles'),
+                    weight_by_income_measure=self.weight_by_income_measure,
+                    order=self.sort_order
+                )
+            trow.flags.writeable = False
+            self._table_rows[groupby] = trow
+        return self._table_rows[groupby]
+
+    @staticmethod
+    def num_rows(groupby):
+        """
+        Return number of table rows for the specified groupby value.
+        """
+        return GroupingIndex.NUM_ROWS[groupby]
@@ -6,6 +6,8 @@ Tax-Calculator GrowFactors class.
 # pylint --disable=locally-disabled growfactors.py
 
 import os
+import io
+import hashlib
 import numpy as np
 import pandas as pd
 from taxcalc.utils import read_egg_csv
@@ -48,19 +50,44 @@ class GrowFactors():
                        'ABENSSI', 'ABENSNAP', 'ABENWIC',
                        'ABENHOUSING', 'ABENTANF', 'ABENVET'])
 
+    # Parsed and validated grow factors shared by all GrowFactors instances
+    # read from files with the same content, keyed by a digest of the file
+    # content.  Registry entries are never modified: an instance that is
+    # updated first makes its own copy of the shared grow factors.
+    _registry = dict()
+
     def __init__(self, growfactors_filename=FILE_NAME):
         # read grow factors from specified growfactors_filename
-        gfdf = pd.DataFrame()
         if isinstance(growfactors_filename, str):
             full_filename = os.path.join(GrowFactors.FILE_PATH,
                                          growfactors_filename)
             if os.path.isfile(full_filename):
-                gfdf = pd.read_csv(full_filename, index_col='YEAR')
+                with open(full_filename, 'rb') as gffile:
+                    content = gffile.read()
+                key = hashlib.sha1(content).hexdigest()
+                if key not in GrowFactors._registry:
+                    gfdf = pd.read_csv(io.BytesIO(content), index_col='YEAR')
+                    GrowFactors._registry[key] = GrowFactors._parse(gfdf)
+                entry = GrowFactors._registry[key]
             else:  # find file in conda package
                 gfdf = read_egg_csv(os.path.basename(growfactors_filename),
                                     index_col='YEAR')  # pragma: no cover
+                entry = GrowFactors._parse(gfdf)  # pragma: no cover
         else:
             raise ValueError('growfactors_filename is not a string')
+        # set shared grow factors as attributes of class
+        self.gfdf, self._first_year, self._last_year, self._factors = entry
+        self._shared = True
+        # specify factors as being unused (that is, not yet accessed)
+        self.used = False
+
+    @staticmethod
+    def _parse(gfdf):
+        """
+        Return tuple containing read-only grow factors in gfdf DataFrame:
+        the DataFrame, its first and last year, and a dictionary of numpy
+        arrays of factor values indexed by year minus first year.
+        """
         assert isinstance(gfdf, pd.DataFrame)
         # check validity of gfdf column names
         gfdf_names = set(list(gfdf))
@@ -70,14 +97,17 @@ class GrowFactors():
             invalid = gfdf_names - GrowFactors.VALID_NAMES
             raise ValueError(msg.format(missing, invalid))
         # determine first_year and last_year from gfdf
-        self._first_year = min(gfdf.index)
-        self._last_year = max(gfdf.index)
-        # set gfdf as attribute of class
-        self.gfdf = pd.DataFrame()
-        setattr(self, 'gfdf', gfdf.astype(np.float64))
-        del gfdf
-        # specify factors as being unused (that is, not yet accessed)
-        self.used = False
+        first_year = min(gfdf.index)
+        last_year = max(gfdf.index)
+        gfdf = gfdf.astype(np.float64)
+        factors = dict()
+        for name in GrowFactors.VALID_NAMES:
+            values = np.array([gfdf[name][year]
+                               for year in range(first_year, last_year + 1)],
+                              dtype=np.float64)
+            values.flags.writeable = False
+            factors[name] = values
+        return (gfdf, first_year, last_year, factors)
 
     @property
     def first_year(self):
@@ -107,7 +137,8 @@ class GrowFactors():
         if lastyear > self.last_year:
             msg = 'last_year={} > GrowFactors.last_year={}'
             raise ValueError(msg.format(lastyear, self.last_year))
-        rates = [round((self.gfdf['ACPIU'][cyr] - 1.0), 4)
+        values = self._factors['ACPIU']
+        rates = [round((values[cyr - self.first_year] - 1.0), 4)
                  for cyr in range(firstyear, lastyear + 1)]
         return rates
 
@@ -125,7 +156,8 @@ class GrowFactors():
         if lastyear > self.last_year:
             msg = 'lastyear={} > GrowFactors.last_year={}'
             raise ValueError(msg.format(lastyear, self.last_year))
-        rates = [round((self.gfdf['AWAGE'][cyr] - 1.0), 4)
+        values = self._factors['AWAGE']
+        rates = [round((values[cyr - self.first_year] - 1.0), 4)
                  for cyr in range(firstyear, lastyear + 1)]
         return rates
 
@@ -143,11 +175,13 @@ class GrowFactors():
         if year > self.last_year:
             msg = 'year={} > GrowFactors.last_year={}'
             raise ValueError(msg.format(year, self.last_year))
-        return self.gfdf[name][year]
+        return self._factors[name][year - self.first_year]
 
     def update(self, name, year, diff):
         """
         Add to self.gfdf[name][year] the specified diff amount.
+        The first update of an instance that shares its grow factors with
+        other instances makes a private copy of the grow factors.
         """
         if self.used:
             msg = 'cannot update growfactors after they have been used'
@@ -156,4 +190,11 @@ class GrowFactors():
         assert year >= self.first_year
         assert year <= self.last_year
         assert isinstance(diff, float)
-        self.gfdf[name][year] += diff
+        if self._shared:
+            self.gfdf = self.gfdf.copy()
+            self._factors = {gfname: values.copy()
+                             for gfname, values in self._factors.items()}
+            self._shared = False
+        idx = year - self.first_year
+        self._factors[name][idx] += diff
+        self.gfdf.loc[year, name] = self._factors[name][idx]
@@ -9,6 +9,7 @@ import os
 import numpy as np
 import pandas as pd
 from taxcalc.data import Data
+from taxcalc.decorators import JIT
 from taxcalc.growfactors import GrowFactors
 from taxcalc.utils import read_egg_csv
 
@@ -68,12 +69,21 @@ class Records(Data):
         any smoothing of stair-step provisions in income tax law;
         default value is false.
 
+    trusted: boolean
+        specifies whether or not the data are known to satisfy all the
+        VALIDITY_CHECKS (for example, because they were written from a
+        Records object that has already checked them), in which case the
+        checks are skipped; default value is false.
+
     Raises
     ------
     ValueError:
         if data is not the appropriate type.
-        if taxpayer and spouse variables do not add up to filing-unit total.
-        if dividends is less than qualified dividends.
+        if any record fails any of the VALIDITY_CHECKS (for example, if
+        taxpayer and spouse variables do not add up to filing-unit total
+        or if dividends is less than qualified dividends), in which case
+        the message lists, for each check, the number of failing records
+        and the RECID of up to VALIDITY_MAX_RECIDS of them.
         if gfactors is not None or a GrowFactors class instance.
         if start_year is not an integer.
         if files cannot be found.
@@ -116,14 +126,44 @@ class Records(Data):
     VARINFO_FILE_NAME = 'records_variables.json'
     VARINFO_FILE_PATH = CODE_PATH
 
+    # descriptions of the checks of the data values done by the
+    # validity_flags function, whose bit i flags records failing check i
+    VALIDITY_CHECKS = [
+        'not all MARS values in [1,5] range',
+        'not all EIC values in [0,3] range',
+        ('expression "e00200 == e00200p + e00200s" is not true for '
+         'every record'),
+        ('expression "e00900 == e00900p + e00900s" is not true for '
+         'every record'),
+        ('expression "e02100 == e02100p + e02100s" is not true for '
+         'every record'),
+        'e00200s is not always zero for non-married filing unit',
+        'e00900s is not always zero for non-married filing unit',
+        'e02100s is not always zero for non-married filing unit',
+        'k1bx14s is not always zero for non-married filing unit',
+        'expression "e00600 >= e00650" is not true for every record',
+        'expression "e01500 >= e01700" is not true for every record',
+        'not all PT_SSTB_income values are 0 or 1'
+    ]
+
+    # maximum number of RECID values listed for each failed check
+    VALIDITY_MAX_RECIDS = 20
+
+    # smallest number of records whose VALIDITY_CHECKS are done by the
+    # compiled validity_flags function, which takes about 0.2 seconds to
+    # load in each new process; smaller data are checked faster by the
+    # numpy_validity_flags function
+    VALIDITY_JIT_MIN_RECORDS = 5000000
+
     def __init__(self,
                  data='puf.csv',
                  start_year=PUFCSV_YEAR,
                  gfactors=GrowFactors(),
                  weights=PUF_WEIGHTS_FILENAME,
                  adjust_ratios=PUF_RATIOS_FILENAME,
-                 exact_calculations=False):
-        # pylint: disable=no-member,too-many-branches
+                 exact_calculations=False,
+                 trusted=False):
+        # pylint: disable=no-member
         if isinstance(weights, str):
             weights = os.path.join(Records.CODE_PATH, weights)
         super().__init__(data, start_year, gfactors, weights)
@@ -136,64 +176,18 @@ class Records(Data):
         self.exact[:] = np.where(exact_calculations is True, 1, 0)
         # specify FLPDYR value based on start_year
         self.FLPDYR.fill(start_year)
-        # check for valid MARS values
-        if not np.all(np.logical_and(np.greater_equal(self.MARS, 1),
-                                     np.less_equal(self.MARS, 5))):
-            raise ValueError('not all MARS values in [1,5] range')
+        # check that all the data values are valid
+        if not trusted:
+            self._validate()
         # create variables derived from MARS, which is in MUST_READ_VARS
         self.num[:] = np.where(self.MARS == 2, 2, 1)
         self.sep[:] = np.where(self.MARS == 3, 2, 1)
-        # check for valid EIC values
-        if not np.all(np.logical_and(np.greater_equal(self.EIC, 0),
-                                     np.less_equal(self.EIC, 3))):
-            raise ValueError('not all EIC values in [0,3] range')
-        # check that three sets of split-earnings variables have valid values
-        msg = 'expression "{0} == {0}p + {0}s" is not true for every record'
-        tol = 0.020001  # handles "%.2f" rounding errors
-        if not np.allclose(self.e00200, (self.e00200p + self.e00200s),
-                           rtol=0.0, atol=tol):
-            raise ValueError(msg.format('e00200'))
-        if not np.allclose(self.e00900, (self.e00900p + self.e00900s),
-                           rtol=0.0, atol=tol):
-            raise ValueError(msg.format('e00900'))
-        if not np.allclose(self.e02100, (self.e02100p + self.e02100s),
-                           rtol=0.0, atol=tol):
-            raise ValueError(msg.format('e02100'))
-        # check that spouse income variables have valid values
-        nospouse = self.MARS != 2
-        zeros = np.zeros_like(self.MARS[nospouse])
-        msg = '{} is not always zero for non-married filing unit'
-        if not np.allclose(self.e00200s[nospouse], zeros):
-            raise ValueError(msg.format('e00200s'))
-        if not np.allclose(self.e00900s[nospouse], zeros):
-            raise ValueError(msg.format('e00900s'))
-        if not np.allclose(self.e02100s[nospouse], zeros):
-            raise ValueError(msg.format('e02100s'))
-        if not np.allclose(self.k1bx14s[nospouse], zeros):
-            raise ValueError(msg.format('k1bx14s'))
-        # check that ordinary dividends are no less than qualified dividends
-        other_dividends = np.maximum(0., self.e00600 - self.e00650)
-        if not np.allclose(self.e00600, self.e00650 + other_dividends,
-                           rtol=0.0, atol=tol):
-            msg = 'expression "e00600 >= e00650" is not true for every record'
-            raise ValueError(msg)
-        del other_dividends
-        # check that total pension income is no less than taxable pension inc
-        nontaxable_pensions = np.maximum(0., self.e01500 - self.e01700)
-        if not np.allclose(self.e01500, self.e01700 + nontaxable_pensions,
-                           rtol=0.0, atol=tol):
-            msg = 'expression "e01500 >= e01700" is not true for every record'
-            raise ValueError(msg)
-        del nontaxable_pensions
-        # check that PT_SSTB_income has valid value
-        if not np.all(np.logical_and(np.greater_equal(self.PT_SSTB_income, 0),
-                                     np.less_equal(self.PT_SSTB_income, 1))):
-            raise ValueError('not all PT_SSTB_income values are 0 or 1')
 
     @staticmethod
     def cps_constructor(data=None,
                         gfactors=GrowFactors(),
-                        exact_calculations=False):
+                        exact_calculations=False,
+                        trusted=False):
         """
         Static method returns a Records object instantiated with CPS
         input data.  This works in a analogous way to Records(), which
@@ -216,7 +210,93 @@ class Records(Data):
                        gfactors=gfactors,
                        weights=weights,
                        adjust_ratios=Records.CPS_RATIOS_FILENAME,
-                       exact_calculations=exact_calculations)
+                       exact_calculations=exact_calculations,
+                       trusted=trusted)
+
+    @staticmethod
+    def data_chunks(chunk_size, data='puf.csv',
+                    weights=PUF_WEIGHTS_FILENAME):
+        """
+        Generator that yields (data, weights) pairs of Pandas DataFrames,
+        each containing the next chunk_size (or fewer) rows of the specified
+        data and the corresponding rows of the specified weights (None when
+        weights is None), so that a CSV data file larger than memory can be
+        processed one chunk at a time.  The data and weights arguments have
+        the same meaning as in the Records class constructor except that a
+        data file and the weights must have the same number of rows.
+        """
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError('chunk_size is not a positive integer')
+        if isinstance(weights, str):
+            weights = os.path.join(Records.CODE_PATH, weights)
+        dchunks = Records._frame_chunks(chunk_size, data, 'data')
+        if weights is None:
+            for dchunk in dchunks:
+                yield dchunk, None
+            return
+        wchunks = Records._frame_chunks(chunk_size, weights, 'weights')
+        for dchunk in dchunks:
+            wchunk = next(wchunks, None)
+            if wchunk is None or len(wchunk.index) != len(dchunk.index):
+                raise ValueError('data and weights have different lengths')
+            yield dchunk, wchunk
+        if next(wchunks, None) is not None:
+            raise ValueError('data and weights have different lengths')
+
+    @staticmethod
+    def read_chunks(chunk_size,
+                    data='puf.csv',
+                    start_year=PUFCSV_YEAR,
+                    gfactors=GrowFactors(),
+                    weights=PUF_WEIGHTS_FILENAME,
+                    adjust_ratios=PUF_RATIOS_FILENAME,
+                    exact_calculations=False,
+                    trusted=False):
+        """
+        Generator that yields Records objects, each containing the next
+        chunk_size (or fewer) filing units of the specified data, where
+        the other arguments have the same meaning as in the Records class
+        constructor.  Only one chunk of data is in memory at a time, so
+        typical usage is to age each Records object in a Calculator object,
+        call its calc_all method and write or accumulate the results
+        (for example, with a TableAccumulator object) before reading the
+        next chunk.
+        """
+        # pylint: disable=too-many-arguments
+        for dchunk, wchunk in Records.data_chunks(chunk_size, data, weights):
+            yield Records(data=dchunk,
+                          start_year=start_year,
+                          gfactors=gfactors,
+                          weights=wchunk,
+                          adjust_ratios=adjust_ratios,
+                          exact_calculations=exact_calculations,
+                          trusted=trusted)
+
+    @staticmethod
+    def cps_read_chunks(chunk_size,
+                        data=None,
+                        gfactors=GrowFactors(),
+                        exact_calculations=False,
+                        trusted=False):
+        """
+        Generator that yields Records objects containing chunks of CPS
+        input data in the same way as the read_chunks method, where the
+        arguments have the same meaning as in the cps_constructor method.
+        """
+        if data is None:
+            data = os.path.join(Records.CODE_PATH, 'cps.csv.gz')
+        if gfactors is None:
+            weights = None
+        else:
+            weights = Records.CPS_WEIGHTS_FILENAME
+        return Records.read_chunks(chunk_size,
+                                   data=data,
+                                   start_year=Records.CPSCSV_YEAR,
+                                   gfactors=gfactors,
+                                   weights=weights,
+                                   adjust_ratios=Records.CPS_RATIOS_FILENAME,
+                                   exact_calculations=exact_calculations,
+                                   trusted=trusted)
 
     def increment_year(self):
         """
@@ -242,6 +322,61 @@ class Records(Data):
 
     # ----- begin private methods of Records class -----
 
+    def _validate(self):
+        """
+        Raise ValueError listing, for each of the VALIDITY_CHECKS that any
+        record fails, the RECID of up to VALIDITY_MAX_RECIDS failing records
+        and the number of other failing records.
+        """
+        # pylint: disable=no-member
+        if self.array_length >= Records.VALIDITY_JIT_MIN_RECORDS:
+            flags_function = validity_flags
+        else:
+            flags_function = numpy_validity_flags
+        flags = flags_function(
+            self.MARS, self.EIC,
+            self.e00200, self.e00200p, self.e00200s,
+            self.e00900, self.e00900p, self.e00900s,
+            self.e02100, self.e02100p, self.e02100s,
+            self.k1bx14s, self.e00600, self.e00650,
+            self.e01500, self.e01700, self.PT_SSTB_income
+        )
+        invalid = np.flatnonzero(flags)
+        if invalid.size == 0:
+            return
+        msgs = list()
+        for bit, check in enumerate(Records.VALIDITY_CHECKS):
+            failed = invalid[(flags[invalid] >> bit) & 1 == 1]
+            if failed.size > 0:
+                listed = failed[:Records.VALIDITY_MAX_RECIDS]
+                recids = ', '.join(str(rid) for rid in self.RECID[listed])
+                if failed.size > listed.size:
+                    recids += ' and {} more'.format(failed.size - listed.size)
+                msgs.append('{} (RECID {})'.format(check, recids))
+        raise ValueError('\n'.join(msgs))
+
+    @staticmethod
+    def _frame_chunks(chunk_size, frame, name):
+        """
+        Generator that yields Pandas DataFrames containing the next
+        chunk_size (or fewer) rows of the specified frame, which is a
+        Pandas DataFrame or the name of a CSV file that is read one
+        chunk at a time.
+        """
+        if isinstance(frame, str):
+            if os.path.isfile(frame):
+                with pd.read_csv(frame, chunksize=chunk_size) as reader:
+                    for chunk in reader:
+                        yield chunk.reset_index(drop=True)
+                return
+            frame = read_egg_csv(os.path.basename(frame))  # pragma: no cover
+        if not isinstance(frame, pd.DataFrame):
+            msg = '{} is neither a string nor a Pandas DataFrame'
+            raise ValueError(msg.format(name))
+        for first in range(0, len(frame.index), chunk_size):
+            chunk = frame.iloc[first:(first + chunk_size)]
+            yield chunk.reset_index(drop=True)
+
     def _extrapolate(self, year):
         """
         Apply to variables the grow factor values for specified calendar year.
@@ -383,3 +518,87 @@ class Records(Data):
         self.ADJ = pd.DataFrame()
         setattr(self, 'ADJ', ADJ.astype(np.float32))
         del ADJ
+
+
+@JIT(nopython=True, nogil=True, cache=True)
+def validity_flags(MARS, EIC, e00200, e00200p, e00200s,
+                   e00900, e00900p, e00900s, e02100, e02100p, e02100s,
+                   k1bx14s, e00600, e00650, e01500, e01700, PT_SSTB_income):
+    """
+    Returns array of integers whose bit i is one for each record that fails
+    check i of the Records.VALIDITY_CHECKS, which are all done in one pass
+    over the records without allocating any temporary arrays, which is
+    faster than the numpy_validity_flags function for very large numbers
+    of records.  Missing (NaN) amounts fail the checks that use them.
+    The compiled function is cached on disk so that only the first
+    process that validates data of given types pays the compilation time.
+    """
+    # pylint: disable=invalid-name,too-many-arguments,too-many-locals
+    tol = 0.020001  # handles "%.2f" rounding errors
+    ztol = 1e-8  # tolerance used by np.allclose when comparing with zero
+    flags = np.zeros(MARS.size, dtype=np.int32)
+    for i in range(MARS.size):
+        flag = 0
+        if not 1 <= MARS[i] <= 5:
+            flag |= 1
+        if not 0 <= EIC[i] <= 3:
+            flag |= 1 << 1
+        if not abs(e00200[i] - (e00200p[i] + e00200s[i])) <= tol:
+            flag |= 1 << 2
+        if not abs(e00900[i] - (e00900p[i] + e00900s[i])) <= tol:
+            flag |= 1 << 3
+        if not abs(e02100[i] - (e02100p[i] + e02100s[i])) <= tol:
+            flag |= 1 << 4
+        if MARS[i] != 2:
+            if not abs(e00200s[i]) <= ztol:
+                flag |= 1 << 5
+            if not abs(e00900s[i]) <= ztol:
+                flag |= 1 << 6
+            if not abs(e02100s[i]) <= ztol:
+                flag |= 1 << 7
+            if not abs(k1bx14s[i]) <= ztol:
+                flag |= 1 << 8
+        if not e00650[i] - e00600[i] <= tol:
+            flag |= 1 << 9
+        if not e01700[i] - e01500[i] <= tol:
+            flag |= 1 << 10
+        if not 0 <= PT_SSTB_income[i] <= 1:
+            flag |= 1 << 11
+        flags[i] = flag
+    return flags
+
+
+def numpy_validity_flags(MARS, EIC, e00200, e00200p, e00200s,
+                         e00900, e00900p, e00900s, e02100, e02100p, e02100s,
+                         k1bx14s, e00600, e00650, e01500, e01700,
+                         PT_SSTB_income):
+    """
+    Returns the same array of integers as the validity_flags function,
+    but computes each check with vectorized numpy operations, which is
+    faster for all but very large numbers of records because the compiled
+    validity_flags function takes time to load in each new process.
+    """
+    # pylint: disable=invalid-name,too-many-arguments,too-many-locals
+    tol = 0.020001  # handles "%.2f" rounding errors
+    ztol = 1e-8  # tolerance used by np.allclose when comparing with zero
+    nospouse = MARS != 2
+    checks = [
+        lambda: ~((MARS >= 1) & (MARS <= 5)),
+        lambda: ~((EIC >= 0) & (EIC <= 3)),
+        lambda: ~(np.abs(e00200 - (e00200p + e00200s)) <= tol),
+        lambda: ~(np.abs(e00900 - (e00900p + e00900s)) <= tol),
+        lambda: ~(np.abs(e02100 - (e02100p + e02100s)) <= tol),
+        lambda: nospouse & ~(np.abs(e00200s) <= ztol),
+        lambda: nospouse & ~(np.abs(e00900s) <= ztol),
+        lambda: nospouse & ~(np.abs(e02100s) <= ztol),
+        lambda: nospouse & ~(np.abs(k1bx14s) <= ztol),
+        lambda: ~(e00650 - e00600 <= tol),
+        lambda: ~(e01700 - e01500 <= tol),
+        lambda: ~((PT_SSTB_income >= 0) & (PT_SSTB_income <= 1))
+    ]
+    flags = np.zeros(MARS.size, dtype=np.int32)
+    for bit, check in enumerate(checks):
+        # evaluate one check at a time so that only its temporary arrays
+        # are in memory at once
+        flags[check()] |= 1 << bit
+    return flags
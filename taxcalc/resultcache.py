@@ -0,0 +1,215 @@
+"""
+Tax-Calculator ResultCache class.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle resultcache.py
+# pylint --disable=locally-disabled resultcache.py
+
+import os
+import hashlib
+import tempfile
+import numpy as np
+import taxcalc
+from taxcalc.utils import DIST_VARIABLES
+
+
+class ResultCache():
+    """
+    Constructor for the ResultCache class, which stores on disk the values
+    of selected calculated variables so that a later calculation with the
+    same input data, policy, consumption, growth assumptions and year can
+    restore them instead of calling the tax-calculation functions.
+
+    Parameters
+    ----------
+    cache_dir: string
+        name of directory in which cached results are stored;
+        the directory is created if it does not exist.
+
+    max_entries: integer
+        maximum number of results kept in cache_dir; when a new result
+        is stored, the least-recently-used results are removed.
+
+    variables: list of strings or None
+        names of the calculated variables that are stored; None implies
+        the variables in ResultCache.CACHED_VARIABLES.
+
+    Raises
+    ------
+    ValueError:
+        if max_entries is not a positive integer.
+
+    Returns
+    -------
+    class instance: ResultCache
+
+    Notes
+    -----
+    Typical usage is "calc.calc_all(cache=ResultCache(cache_dir))".
+    After a cache hit, only the cached variables have calculated values:
+    all the other changing calculated variables are set to zero.
+    """
+
+    # calculated variables needed for minimal, --tables and --graphs output
+    CACHED_VARIABLES = sorted(set(DIST_VARIABLES + ['lumpsum_tax']) -
+                              set(['s006', 'XTOT']))
+
+    FILE_SUFFIX = '.npz'
+
+    def __init__(self, cache_dir, max_entries=64, variables=None):
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise ValueError('max_entries is not a positive integer')
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        if variables is None:
+            variables = ResultCache.CACHED_VARIABLES
+        self.variables = list(variables)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, records, policy, consumption, year, growdiffs=None,
+            records_digest=None):
+        """
+        Return hexadecimal digest of the content of the input variables
+        in records, the values in all years of the policy and consumption
+        parameters and of the parameters in the optional list of GrowDiff
+        objects, the year, the taxcalc version and the names of the cached
+        variables.  The records_digest of the input variables is computed
+        from records when it is None.
+        """
+        if records_digest is None:
+            records_digest = ResultCache.records_digest(records)
+        digest = hashlib.sha256()
+        ResultCache._update_digest(digest, 'version', taxcalc.__version__)
+        ResultCache._update_digest(digest, 'year', year)
+        ResultCache._update_digest(digest, 'variables', self.variables)
+        ResultCache._update_digest(digest, 'records', records_digest)
+        for params in [policy, consumption] + list(growdiffs or []):
+            ResultCache._update_digest(digest, 'class',
+                                       params.__class__.__name__)
+            for pname in sorted(params):
+                ResultCache._update_digest(
+                    digest, pname, getattr(params, '_{}'.format(pname))
+                )
+        return digest.hexdigest()
+
+    @staticmethod
+    def records_digest(records):
+        """
+        Return hexadecimal digest of the content of the input variables
+        (including the s006 weights) in records, which the key method
+        uses and which the Calculator calc_all method computes only once
+        for each Records object and year.
+        """
+        digest = hashlib.sha256()
+        for varname in sorted(records.USABLE_READ_VARS | set(['s006'])):
+            ResultCache._update_digest(digest, varname,
+                                       getattr(records, varname))
+        return digest.hexdigest()
+
+    def restore(self, key, records):
+        """
+        Set the cached variables in records to the values stored under key,
+        and set all other changing calculated variables in records to zero.
+        Return True if key is in the cache; otherwise return False
+        and leave records unchanged.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path) as npz:
+                cached = {name: npz[name] for name in npz.files}
+        except (OSError, ValueError, KeyError):
+            return False
+        if set(cached) != set(self.variables):
+            return False
+        records.zero_out_changing_calculated_vars()
+        for varname, values in cached.items():
+            getattr(records, varname)[:] = values
+        # mark cached result as most-recently used
+        try:
+            os.utime(path)
+        except OSError:  # pragma: no cover
+            pass
+        return True
+
+    def store(self, key, records):
+        """
+        Store the values of the cached variables in records under key and
+        remove least-recently-used results when there are more than
+        max_entries results in cache_dir.
+        """
+        arrays = {varname: getattr(records, varname)
+                  for varname in self.variables}
+        tfd, tname = tempfile.mkstemp(suffix=ResultCache.FILE_SUFFIX,
+                                      dir=self.cache_dir)
+        try:
+            with os.fdopen(tfd, 'wb') as tfile:
+                np.savez(tfile, **arrays)
+            os.replace(tname, self._path(key))
+        except BaseException:
+            os.remove(tname)
+            raise
+        self._evict()
+
+    def clear(self):
+        """
+        Remove all cached results from cache_dir.
+        """
+        for path in self._entries():
+            os.remove(path)
+
+    def __len__(self):
+        return len(self._entries())
+
+    def __contains__(self, key):
+        return os.path.isfile(self._path(key))
+
+    # ----- begin private methods of ResultCache class -----
+
+    def _path(self, key):
+        """
+        Return name of the file in which result with key is stored.
+        """
+        return os.path.join(self.cache_dir, key + ResultCache.FILE_SUFFIX)
+
+    def _entries(self):
+        """
+        Return list of names of files that contain cached results.
+        """
+        return [os.path.join(self.cache_dir, fname)
+                for fname in os.listdir(self.cache_dir)
+                if fname.endswith(ResultCache.FILE_SUFFIX) and
+                not fname.startswith('tmp')]
+
+    def _evict(self):
+        """
+        Remove least-recently-used results in excess of max_entries.
+        """
+        entries = list()
+        for path in self._entries():
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:  # pragma: no cover
+                continue  # removed by another process
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            try:
+                os.remove(path)
+            except OSError:  # pragma: no cover
+                pass
+
+    @staticmethod
+    def _update_digest(digest, name, value):
+        """
+        Add name and value to digest.
+        """
+        digest.update(str(name).encode('utf-8'))
+        if isinstance(value, (list, tuple)) and all(
+                isinstance(val, str) for val in value):
+            digest.update('\x1f'.join(value).encode('utf-8'))
+            return
+        array = np.ascontiguousarray(np.asarray(value))
+        digest.update(str((array.dtype.str, array.shape)).encode('utf-8'))
+        if array.dtype.kind == 'O':
+            digest.update(repr(array.tolist()).encode('utf-8'))
+        else:
+            digest.update(array.tobytes())
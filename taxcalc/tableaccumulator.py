@@ -0,0 +1,191 @@
+"""
+Tax-Calculator TableAccumulator class.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle tableaccumulator.py
+# pylint --disable=locally-disabled tableaccumulator.py
+
+import numpy as np
+from taxcalc.groupingindex import GroupingIndex
+from taxcalc.utils import (DIST_VARIABLES, DIST_TABLE_COLUMNS,
+                           table_row_sums, quantile_table_row,
+                           distribution_table_from_sums,
+                           diagnostic_table_sums, diagnostic_table_from_sums)
+
+
+class TableAccumulator():
+    """
+    Constructor for the TableAccumulator class, which accumulates the
+    weighted sums in diagnostic and distribution tables directly from the
+    arrays of one or more Calculator objects, each containing all or a
+    chunk of the filing units, without constructing a Pandas DataFrame
+    containing the DIST_VARIABLES of all the filing units.
+
+    Parameters
+    ----------
+    groupby: string or None
+        distribution table rows, which are 'weighted_deciles',
+        'standard_income_bins' or 'soi_agi_bins'; None implies that
+        only diagnostic table sums are accumulated.
+
+    pop_quantiles: boolean
+        specifies whether or not weighted_deciles contain an equal number
+        of people (True) or an equal number of filing units (False).
+
+    Raises
+    ------
+    ValueError:
+        if groupby is not valid or if pop_quantiles is True when groupby
+        is not 'weighted_deciles'.
+
+    Returns
+    -------
+    class instance: TableAccumulator
+
+    Notes
+    -----
+    Typical usage is "acc.add(calc)" after each "calc.calc_all()" call,
+    followed by "acc.diagnostic_table()" or "acc.distribution_table()".
+    The diagnostic table has a column for each year of the added
+    Calculator objects, while all the filing units in a distribution
+    table must be in the same year.
+    Income-bin sums are accumulated when each Calculator object is added.
+    Because the weighted_deciles row of a filing unit depends on the
+    incomes of all the filing units, weighted_deciles retains the income,
+    weight and distribution-table column values of each filing unit
+    (but none of the other variables) until distribution_table is called.
+    """
+
+    # distribution-table columns that are not multiplied by s006
+    COUNT_COLUMNS = ['count', 'count_StandardDed',
+                     'count_ItemDed', 'count_AMT']
+
+    def __init__(self, groupby=None, pop_quantiles=False):
+        if groupby is not None and groupby not in ('weighted_deciles',
+                                                   'standard_income_bins',
+                                                   'soi_agi_bins'):
+            raise ValueError('groupby="{}" is not valid'.format(groupby))
+        if pop_quantiles and groupby != 'weighted_deciles':
+            raise ValueError('pop_quantiles requires weighted_deciles')
+        self.groupby = groupby
+        self.pop_quantiles = pop_quantiles
+        self.year = None
+        self._diag_sums = dict()
+        self._dist_sums = None
+        self._units = list()
+
+    def add(self, calc):
+        """
+        Add to the accumulated sums the filing units in the specified
+        Calculator object, calc, whose calc_all method has been called.
+        The calc object is not changed and no references to its arrays
+        are kept.
+        """
+        year = calc.current_year
+        if self.groupby is not None:
+            if self.year is not None and year != self.year:
+                msg = 'distribution table year {} differs from {}'
+                raise ValueError(msg.format(year, self.year))
+            self.year = year
+        sums = diagnostic_table_sums(
+            {name: calc.array(name) for name in DIST_VARIABLES}
+        )
+        if year in self._diag_sums:
+            for label, val in sums.items():
+                self._diag_sums[year][label] += val
+        else:
+            self._diag_sums[year] = sums
+        if self.groupby is None:
+            return
+        columns = self._table_columns(calc)
+        if self.groupby == 'weighted_deciles':
+            columns['income'] = calc.array('expanded_income')
+            if self.pop_quantiles:
+                columns['XTOT'] = calc.array('XTOT')
+            self._units.append({name: np.array(values)
+                                for name, values in columns.items()})
+            return
+        gindex = calc.grouping_index()
+        sums = table_row_sums(
+            columns, gindex.table_row(self.groupby),
+            GroupingIndex.num_rows(self.groupby),
+            TableAccumulator.COUNT_COLUMNS, self._weighted_columns()
+        )[DIST_TABLE_COLUMNS]
+        if self._dist_sums is None:
+            self._dist_sums = sums
+        else:
+            self._dist_sums += sums
+
+    def diagnostic_table(self):
+        """
+        Return diagnostic table, like the one returned by the Calculator
+        diagnostic_table method, for the filing units added so far.
+        """
+        if not self._diag_sums:
+            raise ValueError('no Calculator objects have been added')
+        years = sorted(self._diag_sums)
+        return diagnostic_table_from_sums(
+            [self._diag_sums[year] for year in years], years
+        )
+
+    def distribution_table(self, scaling=True):
+        """
+        Return distribution table, like the one returned by the Calculator
+        distribution_tables method, for the filing units added so far.
+        """
+        if self.groupby is None:
+            raise ValueError('distribution table requires groupby value')
+        if self.groupby == 'weighted_deciles':
+            if not self._units:
+                raise ValueError('no Calculator objects have been added')
+            if len(self._units) > 1:
+                self._units = [{
+                    name: np.concatenate([cols[name] for cols in self._units])
+                    for name in self._units[0]
+                }]
+            units = self._units[0]
+            table_row = quantile_table_row(
+                units['income'], units['s006'], 10,
+                xtot=units['XTOT'] if self.pop_quantiles else None,
+                decile_details=True
+            )
+            sums = table_row_sums(
+                units, table_row, GroupingIndex.num_rows(self.groupby),
+                TableAccumulator.COUNT_COLUMNS, self._weighted_columns()
+            )[DIST_TABLE_COLUMNS]
+        else:
+            if self._dist_sums is None:
+                raise ValueError('no Calculator objects have been added')
+            sums = self._dist_sums.copy()
+        return distribution_table_from_sums(sums, self.groupby, scaling)
+
+    # ----- begin private methods of TableAccumulator class -----
+
+    @staticmethod
+    def _weighted_columns():
+        """
+        Return list of distribution-table columns multiplied by s006.
+        """
+        return [col for col in DIST_TABLE_COLUMNS
+                if col not in TableAccumulator.COUNT_COLUMNS]
+
+    def _table_columns(self, calc):
+        """
+        Return dictionary of the arrays needed to compute the
+        distribution-table column sums for the filing units in calc.
+        """
+        columns = {'s006': calc.array('s006')}
+        for col in TableAccumulator._weighted_columns():
+            columns[col] = calc.array(col)
+        if self.pop_quantiles:
+            count = np.multiply(columns['s006'], calc.array('XTOT'))
+        else:
+            count = columns['s006']
+        columns['count'] = count
+        columns['count_ItemDed'] = np.where(calc.array('c04470') > 0.,
+                                            count, 0.)
+        columns['count_StandardDed'] = np.where(calc.array('standard') > 0.,
+                                                count, 0.)
+        columns['count_AMT'] = np.where(calc.array('c09600') > 0.,
+                                        count, 0.)
+        return columns
@@ -5,21 +5,28 @@ Tax-Calculator Input-Output class.
 # pycodestyle taxcalcio.py
 # pylint --disable=locally-disabled taxcalcio.py
 
+import io
 import os
 import gc
 import copy
+import asyncio
+import functools
 import sqlite3
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 import paramtools
+from taxcalc.batchrunner import BatchRunner
 from taxcalc.policy import Policy
 from taxcalc.records import Records
 from taxcalc.consumption import Consumption
 from taxcalc.growdiff import GrowDiff
 from taxcalc.growfactors import GrowFactors
 from taxcalc.calculator import Calculator
-from taxcalc.utils import (delete_file, write_graph_file,
-                           add_quantile_table_row_variable,
+from taxcalc.calcprofiler import CalcProfiler
+from taxcalc.utils import (delete_file, write_graph_file, read_egg_csv,
+                           quantile_table_row,
                            unweighted_sum, weighted_sum)
 
 
@@ -58,14 +65,34 @@ class TaxCalcIO():
         None implies output files written to current directory,
         or string is name of optional output directory
 
+    output_format: string
+        format of the output file, which is one of OUTPUT_FORMATS:
+        'csv' (the default) implies a CSV-formatted file, while 'parquet',
+        'feather' and 'npz' imply a binary file containing typed columns
+        that has the same name as the CSV-formatted file except for the
+        extension ('parquet' and 'feather' require the optional pyarrow
+        package, although 'parquet' can also use fastparquet)
+
     Returns
     -------
     class instance: TaxCalcIO
     """
     # pylint: disable=too-many-instance-attributes
 
+    # tax variables in --tables output
+    TABLE_TAX_VARS = ['iitax', 'payrolltax', 'lumpsum_tax', 'combined']
+
+    # output file formats and the packages any one of which is required
+    OUTPUT_FORMATS = {'csv': [],
+                      'parquet': ['pyarrow', 'fastparquet'],
+                      'feather': ['pyarrow'],
+                      'npz': []}
+
+    # number of rows inserted into SQLite3 table by each executemany call
+    SQLDB_INSERT_ROWS = 10000
+
     def __init__(self, input_data, tax_year, baseline, reform, assump,
-                 outdir=None):
+                 outdir=None, output_format='csv'):
         # pylint: disable=too-many-arguments,too-many-locals
         # pylint: disable=too-many-branches,too-many-statements
         self.errmsg = ''
@@ -182,6 +209,19 @@ class TaxCalcIO():
             valid_outdir = False
             msg = 'TaxCalcIO.ctor: outdir is neither None nor str'
             self.errmsg += 'ERROR: {}\n'.format(msg)
+        # check output_format and availability of the packages it requires
+        self.output_format = output_format
+        if output_format not in TaxCalcIO.OUTPUT_FORMATS:
+            msg = 'output_format {} is not in {}'
+            msg = msg.format(output_format, list(TaxCalcIO.OUTPUT_FORMATS))
+            self.errmsg += 'ERROR: {}\n'.format(msg)
+        else:
+            packages = TaxCalcIO.OUTPUT_FORMATS[output_format]
+            if packages and not any(importlib.util.find_spec(pkg)
+                                    for pkg in packages):
+                msg = 'output_format {} requires the {} package'
+                msg = msg.format(output_format, ' or '.join(packages))
+                self.errmsg += 'ERROR: {}\n'.format(msg)
         # create OUTPUT file name and delete any existing output files
         output_filename = '{}{}{}{}.csv'.format(inp, bas, ref, asm)
         if outdir is None:
@@ -193,21 +233,29 @@ class TaxCalcIO():
         else:
             delete_old_files = False
         if delete_old_files:
-            delete_file(self._output_filename)
+            for fmt in TaxCalcIO.OUTPUT_FORMATS:
+                delete_file(self._output_filename.replace('.csv', '.' + fmt))
             delete_file(self._output_filename.replace('.csv', '.db'))
             delete_file(self._output_filename.replace('.csv', '-doc.text'))
             delete_file(self._output_filename.replace('.csv', '-tab.text'))
             delete_file(self._output_filename.replace('.csv', '-atr.html'))
             delete_file(self._output_filename.replace('.csv', '-mtr.html'))
             delete_file(self._output_filename.replace('.csv', '-pch.html'))
+            delete_file(self._output_filename.replace('.csv', '-mem.text'))
         # initialize variables whose values are set in init method
         self.calc = None
         self.calc_base = None
         self.param_dict = None
         self.policy_dicts = list()
+        self.chunk_size = None
+        self._calc_chunks = None
+        # GrowDiff objects that create the growth factors of the baseline
+        # and reform Calculator objects, which are part of cache keys
+        self._growdiffs_base = list()
+        self._growdiffs = list()
 
     def init(self, input_data, tax_year, baseline, reform, assump,
-             aging_input_data, exact_calculations):
+             aging_input_data, exact_calculations, chunk_size=None):
         """
         TaxCalcIO class post-constructor method that completes initialization.
 
@@ -223,6 +271,13 @@ class TaxCalcIO():
         exact_calculations: boolean
             specifies whether or not exact tax calculations are done without
             any smoothing of "stair-step" provisions in the tax law.
+
+        chunk_size: None or integer
+            None implies all the INPUT filing units are read into memory,
+            or integer is the number of INPUT filing units that are read,
+            aged and analyzed at a time, in which case the analyze method
+            writes the output of each chunk before reading the next one;
+            only the first chunk is read by this method.
         """
         # pylint: disable=too-many-arguments,too-many-locals
         # pylint: disable=too-many-statements,too-many-branches
@@ -261,6 +316,8 @@ class TaxCalcIO():
         gfactors_ref = GrowFactors()
         gdiff_baseline.apply_to(gfactors_ref)
         gdiff_response.apply_to(gfactors_ref)
+        self._growdiffs_base = [gdiff_baseline]
+        self._growdiffs = [gdiff_baseline, gdiff_response]
         # create Policy objects:
         # ... the baseline Policy object
         base = Policy(gfactors=gfactors_base)
@@ -305,49 +362,103 @@ class TaxCalcIO():
         # set policy to tax_year
         pol.set_year(tax_year)
         base.set_year(tax_year)
+        # read first chunk of input file contents into Records objects
+        if chunk_size is not None:
+            if not isinstance(chunk_size, int) or chunk_size < 1:
+                msg = 'chunk_size {} is not a positive integer'
+                self.errmsg += 'ERROR: {}\n'.format(msg.format(chunk_size))
+                return
+            if self.output_format != 'csv':
+                msg = 'chunk_size cannot be used with output_format {}'
+                msg = msg.format(self.output_format)
+                self.errmsg += 'ERROR: {}\n'.format(msg)
+                return
+            if not aging_input_data:
+                data_year = tax_year
+            elif self.cps_input_data:
+                data_year = Records.CPSCSV_YEAR
+            else:
+                data_year = Records.PUFCSV_YEAR
+            if tax_year < data_year:
+                msg = 'tax_year {} less than records.data_year {}'
+                msg = msg.format(tax_year, data_year)
+                self.errmsg += 'ERROR: {}\n'.format(msg)
+                return
+            if aging_input_data and not self.cps_input_data:
+                # sub-sample weights are scaled up using the sums of all
+                # the weights, which cannot be done one chunk at a time
+                weights = os.path.join(Records.CODE_PATH,
+                                       Records.PUF_WEIGHTS_FILENAME)
+                try:
+                    same_size = (TaxCalcIO._num_rows(input_data) ==
+                                 TaxCalcIO._num_rows(weights))
+                except ValueError as valerr_msg:
+                    self.errmsg += 'ERROR: {}\n'.format(valerr_msg)
+                    return
+                if not same_size:
+                    msg = ('chunk_size cannot be used with INPUT that is '
+                           'a sub-sample of puf.csv because its weights '
+                           'must be scaled up using all the weights')
+                    self.errmsg += 'ERROR: {}\n'.format(msg)
+                    return
+            self.chunk_size = chunk_size
+            self._calc_chunks = self._chunk_calculators(
+                input_data, pol, base, con, gfactors_ref, gfactors_base,
+                aging_input_data, exact_calculations
+            )
+            try:
+                self.calc, self.calc_base = next(self._calc_chunks)
+            except StopIteration:
+                msg = 'INPUT contains no filing units'
+                self.errmsg += 'ERROR: {}\n'.format(msg)
+            return
         # read input file contents into Records objects
-        if aging_input_data:
-            if self.cps_input_data:
-                recs = Records.cps_constructor(
-                    gfactors=gfactors_ref,
-                    exact_calculations=exact_calculations
-                )
-                recs_base = Records.cps_constructor(
-                    gfactors=gfactors_base,
-                    exact_calculations=exact_calculations
-                )
-            else:  # if not cps_input_data but aging_input_data
-                recs = Records(
-                    data=input_data,
-                    gfactors=gfactors_ref,
-                    exact_calculations=exact_calculations
-                )
-                recs_base = Records(
-                    data=input_data,
-                    gfactors=gfactors_base,
-                    exact_calculations=exact_calculations
-                )
-        else:  # input_data are raw data that are not being aged
-            recs = Records(data=input_data,
-                           start_year=tax_year,
-                           gfactors=None,
-                           weights=None,
-                           adjust_ratios=None,
-                           exact_calculations=exact_calculations)
-            recs_base = copy.deepcopy(recs)
+        with CalcProfiler.section('load', 'tcio'):
+            recs = self._read_records(input_data, tax_year, gfactors_ref,
+                                      aging_input_data, exact_calculations)
+            if aging_input_data:
+                recs_base = self._read_records(input_data, tax_year,
+                                               gfactors_base,
+                                               aging_input_data,
+                                               exact_calculations)
+            else:  # input_data are raw data that are not being aged
+                recs_base = copy.deepcopy(recs)
         if tax_year < recs.data_year:
             msg = 'tax_year {} less than records.data_year {}'
             msg = msg.format(tax_year, recs.data_year)
             self.errmsg += 'ERROR: {}\n'.format(msg)
         # create Calculator objects
-        self.calc = Calculator(policy=pol, records=recs,
-                               verbose=True,
-                               consumption=con,
-                               sync_years=aging_input_data)
-        self.calc_base = Calculator(policy=base, records=recs_base,
-                                    verbose=False,
-                                    consumption=con,
-                                    sync_years=aging_input_data)
+        with CalcProfiler.section('aging', 'tcio'):
+            self.calc = Calculator(policy=pol, records=recs,
+                                   verbose=True,
+                                   consumption=con,
+                                   sync_years=aging_input_data)
+            self.calc_base = Calculator(policy=base, records=recs_base,
+                                        verbose=False,
+                                        consumption=con,
+                                        sync_years=aging_input_data)
+
+    def batch_runner(self, input_data, tax_year, baseline, assump,
+                     aging_input_data, exact_calculations, num_workers=None):
+        """
+        Return BatchRunner object that analyzes many reforms of the INPUT
+        data after reading and extrapolating the data only once, or return
+        None and build self.errmsg if the BatchRunner cannot be created.
+        Arguments are the same as those of the init method, except that
+        num_workers is the maximum number of worker processes.
+        """
+        # pylint: disable=too-many-arguments
+        self.errmsg = ''
+        try:
+            return BatchRunner(
+                self._read_records(input_data, tax_year, GrowFactors(),
+                                   aging_input_data, exact_calculations),
+                tax_year, baseline=baseline, assump=assump,
+                num_workers=num_workers
+            )
+        except (ValueError, paramtools.ValidationError) as valerr_msg:
+            self.errmsg += 'ERROR: {}\n'.format(valerr_msg)
+        return None
 
     def custom_dump_variables(self, tcdumpvars_str):
         """
@@ -387,7 +498,9 @@ class TaxCalcIO():
 
     def output_filepath(self):
         """
-        Return full path to output file named in TaxCalcIO constructor.
+        Return full path to output file named in TaxCalcIO constructor;
+        when output_format is not 'csv', the output file has the same
+        path except that its extension is the output_format.
         """
         dirpath = os.path.abspath(os.path.dirname(__file__))
         return os.path.join(dirpath, self._output_filename)
@@ -397,10 +510,22 @@ class TaxCalcIO():
                 output_graphs=False,
                 dump_varset=None,
                 output_dump=False,
-                output_sqldb=False):
+                output_sqldb=False,
+                cache=None):
         """
         Conduct tax analysis.
 
+        When a chunk_size was specified in the init method, the filing units
+        are analyzed one chunk at a time: the output file and SQLite3
+        database rows of each chunk are written before the next chunk is
+        read, and the tables are computed from the weights, baseline incomes
+        and taxes of all the chunks.  Graphs cannot be written in this case.
+        Because the baseline decile of each filing unit depends on the
+        incomes of all the filing units, writing tables keeps the ten
+        table_data values (80 bytes) of each filing unit until all the
+        chunks are analyzed, so that memory use grows with the size of the
+        input data when output_tables is True.
+
         Parameters
         ----------
         writing_output_file: boolean
@@ -426,11 +551,17 @@ class TaxCalcIO():
            whether or not to write SQLite3 database with dump table
            containing same output as written by output_dump to a csv file
 
+        cache: ResultCache or None
+           cache of calculated results used by the baseline and reform
+           calc_all calls; ignored when output_dump or output_sqldb is
+           True because dump output includes all calculated variables
+
         Returns
         -------
         Nothing
         """
         # pylint: disable=too-many-arguments,too-many-branches,too-many-locals
+        # pylint: disable=too-many-statements
         if self.puf_input_data and self.calc.reform_warnings:
             warn = 'PARAMETER VALUE WARNING(S):  {}\n{}{}'  # pragma: no cover
             print(  # pragma: no cover
@@ -438,55 +569,153 @@ class TaxCalcIO():
                             self.calc.reform_warnings,
                             'CONTINUING WITH CALCULATIONS...')
             )
-        calc_base_calculated = False
-        self.calc.calc_all()
+        if output_graphs and self.chunk_size is not None:
+            raise ValueError('graphs cannot be written one chunk at a time')
         if output_dump or output_sqldb:
-            # might need marginal tax rates
-            (mtr_paytax, mtr_inctax,
-             _) = self.calc.mtr(wrt_full_compensation=False,
-                                calc_all_already_called=True)
-        else:
-            # definitely do not need marginal tax rates
-            mtr_paytax = None
-            mtr_inctax = None
-        # extract output if writing_output_file
-        if writing_output_file:
-            self.write_output_file(output_dump, dump_varset,
-                                   mtr_paytax, mtr_inctax)
-            self.write_doc_file()
-        # optionally write --sqldb output to SQLite3 database
-        if output_sqldb:
-            self.write_sqldb_file(dump_varset, mtr_paytax, mtr_inctax)
-        # optionally write --tables output to text file
+            cache = None
+        chunk_tables = list()
+        first_chunk = True
+        while True:
+            # calculate reform taxes (and marginal tax rates if dump output
+            # might need them) and baseline taxes in concurrent threads
+            calc_tasks = [functools.partial(self._calc_reform, cache,
+                                            output_dump or output_sqldb)]
+            if output_tables or output_graphs:
+                calc_tasks.append(functools.partial(
+                    CalcProfiler.call, 'calc_all_baseline', 'tcio',
+                    self.calc_base.calc_all, cache=cache,
+                    growdiffs=self._growdiffs_base
+                ))
+            (mtr_paytax,
+             mtr_inctax) = TaxCalcIO._run_concurrently(calc_tasks)[0]
+            # extract dump output only once when writing it twice
+            if writing_output_file and output_dump and output_sqldb:
+                dump_df = CalcProfiler.call('dump_build', 'tcio',
+                                            self.dump_output, dump_varset,
+                                            mtr_inctax, mtr_paytax)
+            else:
+                dump_df = None
+            # extract output if writing_output_file
+            if writing_output_file:
+                self.write_output_file(output_dump, dump_varset,
+                                       mtr_paytax, mtr_inctax,
+                                       append=not first_chunk,
+                                       dump_df=dump_df)
+                if first_chunk:
+                    self.write_doc_file()
+            # optionally write --sqldb output to SQLite3 database
+            if output_sqldb:
+                self.write_sqldb_file(dump_varset, mtr_paytax, mtr_inctax,
+                                      append=not first_chunk,
+                                      dump_df=dump_df)
+            del dump_df
+            # read next chunk of filing units, if any
+            if self._calc_chunks is None:
+                break
+            if output_tables:
+                chunk_tables.append(self._table_data())
+            try:
+                self.calc, self.calc_base = next(self._calc_chunks)
+            except StopIteration:
+                break
+            first_chunk = False
+        # optionally write --tables and --graphs output in concurrent threads
+        writers = list()
         if output_tables:
-            if not calc_base_calculated:
-                self.calc_base.calc_all()
-                calc_base_calculated = True
-            self.write_tables_file()
-        # optionally write --graphs output to HTML files
+            if chunk_tables:
+                # concatenate one variable at a time, releasing the chunk
+                # arrays of each variable as soon as they are concatenated
+                table_data = dict()
+                for var in list(chunk_tables[0]):
+                    table_data[var] = np.concatenate(
+                        [tdata.pop(var) for tdata in chunk_tables]
+                    )
+                del chunk_tables
+                table_row = None
+            elif output_graphs:
+                # copy table variables because the graph writer temporarily
+                # changes the Calculator objects when computing tax rates
+                table_data = {var: array.copy()
+                              for var, array in self._table_data().items()}
+                table_row = self._baseline_deciles()
+            else:
+                table_data = None
+                table_row = None
+            writers.append(functools.partial(
+                CalcProfiler.call, 'tables_write', 'tcio',
+                self.write_tables_file, table_data, table_row
+            ))
         if output_graphs:
-            if not calc_base_calculated:
-                self.calc_base.calc_all()
-                calc_base_calculated = True
-            self.write_graph_files()
+            writers.append(functools.partial(
+                CalcProfiler.call, 'graphs_write', 'tcio',
+                self.write_graph_files
+            ))
+        TaxCalcIO._run_concurrently(writers)
+
+    async def analyze_async(self, executor=None, **kwargs):
+        """
+        Coroutine that conducts the same tax analysis as the analyze
+        method, whose arguments are the kwargs, in a thread of the executor
+        (None implies the default executor of the asyncio event loop), so
+        that the event loop is not blocked while the analysis is done.
+        Cancelling the task awaiting this coroutine does not stop an
+        analysis that has started, so the TaxCalcIO object must not be
+        used until the executor has finished the analysis.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor,
+                                   functools.partial(self.analyze, **kwargs))
 
     def write_output_file(self, output_dump, dump_varset,
-                          mtr_paytax, mtr_inctax):
+                          mtr_paytax, mtr_inctax, append=False,
+                          dump_df=None):
         """
-        Write output to CSV-formatted file.
+        Write output to file in output_format, or when append is True,
+        add output rows without a header row to the end of the CSV file.
+        When output_dump is True, dump_df can be a DataFrame already
+        returned by the dump_output method, which is then not called.
         """
+        # pylint: disable=too-many-arguments
         if output_dump:
-            outdf = self.dump_output(dump_varset, mtr_inctax, mtr_paytax)
+            if dump_df is None:
+                outdf = CalcProfiler.call('dump_build', 'tcio',
+                                          self.dump_output, dump_varset,
+                                          mtr_inctax, mtr_paytax)
+            else:
+                outdf = dump_df
             column_order = sorted(outdf.columns)
         else:
             outdf = self.minimal_output()
-            column_order = outdf.columns
+            column_order = None
         assert len(outdf.index) == self.calc.array_len
-        outdf.to_csv(self._output_filename, columns=column_order,
-                     index=False, float_format='%.2f')
+        CalcProfiler.call('output_write', 'tcio', self._write_output_frame,
+                          outdf, append, column_order, output_dump)
         del outdf
         gc.collect()
 
+    def write_batch_files(self, runner, output, reform, assump,
+                          output_tables=False):
+        """
+        Write minimal output file, reform documentation and optionally
+        tables for the reform specified in the TaxCalcIO constructor using
+        the output DataFrame returned for that reform by the run method of
+        the runner BatchRunner object.  The reform and assump arguments
+        are the same as those of the init method.
+        """
+        # pylint: disable=too-many-arguments
+        outdf = TaxCalcIO.minimal_frame(output, runner.tax_year)
+        self._write_output_frame(outdf)
+        del outdf
+        paramdict = Calculator.read_json_param_objects(None, assump)
+        policydicts = [Calculator.read_json_param_objects(ref, None)['policy']
+                       for ref in reform.split('+')]
+        paramdict['policy'] = policydicts[0]
+        self.param_dict = paramdict
+        self.policy_dicts = policydicts
+        self.write_doc_file()
+        if output_tables:
+            self.write_tables_file(runner.table_data(output))
+
     def write_doc_file(self):
         """
         Write reform documentation to text file.
@@ -500,74 +729,124 @@ class TaxCalcIO():
         with open(doc_fname, 'w') as dfile:
             dfile.write(doc)
 
-    def write_sqldb_file(self, dump_varset, mtr_paytax, mtr_inctax):
+    def write_memprofile_file(self, profiler):
         """
-        Write dump output to SQLite3 database table dump.
+        Write to text file the peak resident set size of the process and
+        the time and memory used by each stage of the analysis recorded by
+        the profiler CalcProfiler object, whose memory must be True.
         """
-        outdf = self.dump_output(dump_varset, mtr_inctax, mtr_paytax)
+        assert profiler.memory
+        tdf = profiler.table(layers=['tcio'])
+        tdf = tdf.sort_values('bytes', ascending=False)
+        megabyte = 1024. * 1024.
+        rdf = pd.DataFrame({
+            'stage': tdf['name'],
+            'calls': tdf['calls'],
+            'seconds': tdf['seconds'],
+            'alloc_MB': tdf['bytes'] / megabyte,
+            'rss_growth_MB': tdf['rss_growth'] / megabyte
+        })
+        mem_fname = self._output_filename.replace('.csv', '-mem.text')
+        with open(mem_fname, 'w') as mfile:
+            mfile.write('Peak resident set size: {:.1f} MB\n'.format(
+                CalcProfiler.peak_rss() / megabyte))
+            mfile.write('Stages in order of decreasing memory allocated:\n')
+            if not rdf.empty:
+                mfile.write(rdf.to_string(index=False, float_format='%.2f'))
+                mfile.write('\n')
+
+    def write_sqldb_file(self, dump_varset, mtr_paytax, mtr_inctax,
+                         append=False, dump_df=None):
+        """
+        Write dump output to SQLite3 database table dump, or when append
+        is True, add dump output rows to the end of the table.
+        The dump_df can be a DataFrame already returned by the dump_output
+        method, which is then not called.
+        """
+        # pylint: disable=too-many-arguments
+        if dump_df is None:
+            outdf = CalcProfiler.call('dump_build', 'tcio', self.dump_output,
+                                      dump_varset, mtr_inctax, mtr_paytax)
+        else:
+            outdf = dump_df
         assert len(outdf.index) == self.calc.array_len
         db_fname = self._output_filename.replace('.csv', '.db')
         dbcon = sqlite3.connect(db_fname)
-        outdf.to_sql('dump', dbcon, if_exists='replace', index=False)
+        CalcProfiler.call('sqldb_write', 'tcio', TaxCalcIO._write_sqldb_table,
+                          dbcon, 'dump', outdf, append)
         dbcon.close()
         del outdf
         gc.collect()
 
-    def write_tables_file(self):
+    def write_tables_file(self, table_data=None, table_row=None):
         """
-        Write tables to text file.
+        Write tables to text file using the table_data dictionary of arrays,
+        which contains the values for each filing unit of the variables in
+        the tables, and the table_row array of baseline deciles (see the
+        tables_text method); None implies table_data contains the variables
+        in the Calculator objects, whose baseline deciles are used.
         """
-        # pylint: disable=too-many-locals
         tab_fname = self._output_filename.replace('.csv', '-tab.text')
+        if table_data is None:
+            table_data = self._table_data()
+            table_row = self._baseline_deciles()
+        with open(tab_fname, 'w') as tfile:
+            tfile.write(TaxCalcIO.tables_text(table_data, table_row))
+
+    @staticmethod
+    def tables_text(table_data, table_row=None):
+        """
+        Return text of the tables written by the write_tables_file method
+        using the table_data dictionary of arrays and the zero-based
+        baseline decile of each filing unit in the table_row array, which
+        is computed from table_data when table_row is None.
+        """
         # skip tables if there are not some positive weights
-        if self.calc_base.total_weight() <= 0.:
-            with open(tab_fname, 'w') as tfile:
-                msg = 'No tables because sum of weights is not positive\n'
-                tfile.write(msg)
-            return
-        # create list of results for nontax variables
-        # - weights don't change with reform
-        # - expanded_income may change, so always use baseline expanded income
-        nontax_vars = ['s006', 'expanded_income']
-        nontax = [self.calc_base.array(var) for var in nontax_vars]
-        # create list of results for tax variables from reform Calculator
-        tax_vars = ['iitax', 'payrolltax', 'lumpsum_tax', 'combined']
-        reform = [self.calc.array(var) for var in tax_vars]
+        if table_data['s006'].sum() <= 0.:
+            return 'No tables because sum of weights is not positive\n'
         # create DataFrame with tax distribution under reform
-        dist = nontax + reform  # using expanded_income under baseline policy
-        all_vars = nontax_vars + tax_vars
-        distdf = pd.DataFrame(data=np.column_stack(dist), columns=all_vars)
+        # using expanded_income under baseline policy
+        nontax_vars = ['s006', 'expanded_income']
+        all_vars = nontax_vars + TaxCalcIO.TABLE_TAX_VARS
+        distdf = pd.DataFrame(
+            data=np.column_stack([table_data[var] for var in all_vars]),
+            columns=all_vars
+        )
         # create DataFrame with tax differences (reform - baseline)
-        base = [self.calc_base.array(var) for var in tax_vars]
-        change = [(reform[idx] - base[idx]) for idx in range(0, len(tax_vars))]
-        diff = nontax + change  # using expanded_income under baseline policy
+        diff = [table_data[var] for var in nontax_vars]
+        diff += [table_data[var] - table_data[var + '_base']
+                 for var in TaxCalcIO.TABLE_TAX_VARS]
         diffdf = pd.DataFrame(data=np.column_stack(diff), columns=all_vars)
-        # write each kind of distributional table
-        with open(tab_fname, 'w') as tfile:
-            TaxCalcIO.write_decile_table(distdf, tfile, tkind='Reform Totals')
-            tfile.write('\n')
-            TaxCalcIO.write_decile_table(diffdf, tfile, tkind='Differences')
+        # write each kind of distributional table using baseline deciles
+        tfile = io.StringIO()
+        TaxCalcIO.write_decile_table(distdf, tfile, tkind='Reform Totals',
+                                     table_row=table_row)
+        tfile.write('\n')
+        TaxCalcIO.write_decile_table(diffdf, tfile, tkind='Differences',
+                                     table_row=table_row)
         # delete intermediate DataFrame objects
         del distdf
         del diffdf
         gc.collect()
+        return tfile.getvalue()
 
     @staticmethod
-    def write_decile_table(dfx, tfile, tkind='Totals'):
-        """
-        Write to tfile the tkind decile table using dfx DataFrame.
-        """
-        dfx = add_quantile_table_row_variable(dfx, 'expanded_income', 10,
-                                              decile_details=False,
-                                              pop_quantiles=False,
-                                              weight_by_income_measure=False)
-        gdfx = dfx.groupby('table_row', as_index=False)
-        rtns_series = gdfx.apply(unweighted_sum, 's006').values[:, 1]
-        xinc_series = gdfx.apply(weighted_sum, 'expanded_income').values[:, 1]
-        itax_series = gdfx.apply(weighted_sum, 'iitax').values[:, 1]
-        ptax_series = gdfx.apply(weighted_sum, 'payrolltax').values[:, 1]
-        htax_series = gdfx.apply(weighted_sum, 'lumpsum_tax').values[:, 1]
-        ctax_series = gdfx.apply(weighted_sum, 'combined').values[:, 1]
+    def write_decile_table(dfx, tfile, tkind='Totals', table_row=None):
+        """
+        Write to tfile the tkind decile table using dfx DataFrame and the
+        zero-based decile of each dfx row in the table_row array, which is
+        computed from dfx when table_row is None.
+        """
+        if table_row is None:
+            table_row = quantile_table_row(dfx['expanded_income'].values,
+                                           dfx['s006'].values, 10)
+        gdfx = dfx.groupby(pd.Categorical.from_codes(table_row, range(10)))
+        rtns_series = gdfx.apply(unweighted_sum, 's006').values
+        xinc_series = gdfx.apply(weighted_sum, 'expanded_income').values
+        itax_series = gdfx.apply(weighted_sum, 'iitax').values
+        ptax_series = gdfx.apply(weighted_sum, 'payrolltax').values
+        htax_series = gdfx.apply(weighted_sum, 'lumpsum_tax').values
+        ctax_series = gdfx.apply(weighted_sum, 'combined').values
         # write decile table to text file
         row = 'Weighted Tax {} by Baseline Expanded-Income Decile\n'
         tfile.write(row.format(tkind))
@@ -671,17 +950,13 @@ class TaxCalcIO():
         """
         Extract minimal output and return it as Pandas DataFrame.
         """
-        varlist = ['RECID', 'YEAR', 'WEIGHT', 'INCTAX', 'LSTAX', 'PAYTAX']
-        odict = dict()
         scalc = self.calc
-        odict['RECID'] = scalc.array('RECID')  # id for tax filing unit
-        odict['YEAR'] = self.tax_year()  # tax calculation year
-        odict['WEIGHT'] = scalc.array('s006')  # sample weight
-        odict['INCTAX'] = scalc.array('iitax')  # federal income taxes
-        odict['LSTAX'] = scalc.array('lumpsum_tax')  # lump-sum tax
-        odict['PAYTAX'] = scalc.array('payrolltax')  # payroll taxes (ee+er)
-        odf = pd.DataFrame(data=odict, columns=varlist)
-        return odf
+        return TaxCalcIO.minimal_frame(
+            {var: scalc.array(var)
+             for var in ['RECID', 's006', 'iitax', 'lumpsum_tax',
+                         'payrolltax']},
+            self.tax_year()
+        )
 
     def dump_output(self, dump_varset, mtr_inctax, mtr_paytax):
         """
@@ -692,19 +967,267 @@ class TaxCalcIO():
             varset = recs_vinfo.USABLE_READ_VARS | recs_vinfo.CALCULATED_VARS
         else:
             varset = dump_varset
-        # create and return dump output DataFrame
-        odf = pd.DataFrame()
+        # collect dump output arrays and create DataFrame from them at once
+        odict = dict()
         for varname in varset:
             vardata = self.calc.array(varname)
             if varname in recs_vinfo.INTEGER_VARS:
-                odf[varname] = vardata
+                odict[varname] = vardata
             else:
-                odf[varname] = vardata.round(2)  # rounded to nearest cent
+                odict[varname] = vardata.round(2)  # rounded to nearest cent
         # specify mtr values in percentage terms
         if 'mtr_inctax' in varset:
-            odf['mtr_inctax'] = (mtr_inctax * 100).round(2)
+            odict['mtr_inctax'] = (mtr_inctax * 100).round(2)
         if 'mtr_paytax' in varset:
-            odf['mtr_paytax'] = (mtr_paytax * 100).round(2)
+            odict['mtr_paytax'] = (mtr_paytax * 100).round(2)
         # specify tax calculation year
-        odf['FLPDYR'] = self.tax_year()
+        odict['FLPDYR'] = np.full(self.calc.array_len, self.tax_year(),
+                                  dtype=np.int64)
+        return pd.DataFrame(data=odict, copy=False)
+
+    @staticmethod
+    def minimal_frame(arrays, year):
+        """
+        Return minimal output DataFrame containing the RECID, s006, iitax,
+        lumpsum_tax and payrolltax values in the arrays dictionary and the
+        tax calculation year.
+        """
+        varlist = ['RECID', 'YEAR', 'WEIGHT', 'INCTAX', 'LSTAX', 'PAYTAX']
+        odict = dict()
+        odict['RECID'] = arrays['RECID']  # id for tax filing unit
+        odict['YEAR'] = year  # tax calculation year
+        odict['WEIGHT'] = arrays['s006']  # sample weight
+        odict['INCTAX'] = arrays['iitax']  # federal income taxes
+        odict['LSTAX'] = arrays['lumpsum_tax']  # lump-sum tax
+        odict['PAYTAX'] = arrays['payrolltax']  # payroll taxes (ee+er)
+        odf = pd.DataFrame(data=odict, columns=varlist)
         return odf
+
+    # ----- begin private methods of TaxCalcIO class -----
+
+    def _calc_reform(self, cache, mtr_needed):
+        """
+        Call calc_all method of reform Calculator object using cache and
+        return (mtr_paytax, mtr_inctax) tuple of marginal tax rate arrays,
+        which are both None when mtr_needed is False.
+        """
+        CalcProfiler.call('calc_all_reform', 'tcio', self.calc.calc_all,
+                          cache=cache, growdiffs=self._growdiffs)
+        if not mtr_needed:
+            return (None, None)
+        (mtr_paytax, mtr_inctax,
+         _) = CalcProfiler.call('mtr', 'tcio', self.calc.mtr,
+                                wrt_full_compensation=False,
+                                calc_all_already_called=True)
+        return (mtr_paytax, mtr_inctax)
+
+    @staticmethod
+    def _run_concurrently(tasks):
+        """
+        Call each function in the tasks list in a separate thread, which
+        lets the tax calculations run in parallel because the
+        tax-calculation functions release the GIL, and return list of the
+        values returned by the tasks.  A single task is called directly.
+        """
+        if len(tasks) <= 1:
+            return [task() for task in tasks]
+        with ThreadPoolExecutor(max_workers=len(tasks)) as pool:
+            futures = [pool.submit(task) for task in tasks]
+            return [future.result() for future in futures]
+
+    @staticmethod
+    def _write_sqldb_table(dbcon, table, outdf, append):
+        """
+        Write outdf DataFrame to the table in the dbcon SQLite3 database
+        using a single transaction of prepared INSERT statements, with
+        the table being replaced by one having typed columns unless
+        append is True.  Produces the same table as the Pandas DataFrame
+        to_sql method with index=False, but much faster.
+        """
+        dbcon.execute('PRAGMA journal_mode=OFF')
+        dbcon.execute('PRAGMA synchronous=OFF')
+        names = ['"{}"'.format(var) for var in outdf.columns]
+        arrays = [outdf[var].values for var in outdf.columns]
+        with dbcon:  # commits all the statements in one transaction
+            if not append:
+                dbcon.execute('DROP TABLE IF EXISTS "{}"'.format(table))
+                coldefs = [
+                    '{} {}'.format(name,
+                                   'REAL' if array.dtype.kind == 'f'
+                                   else 'INTEGER')
+                    for name, array in zip(names, arrays)
+                ]
+                dbcon.execute('CREATE TABLE "{}" ({})'.format(
+                    table, ', '.join(coldefs)
+                ))
+            sql = 'INSERT INTO "{}" ({}) VALUES ({})'.format(
+                table, ', '.join(names), ', '.join(['?'] * len(names))
+            )
+            step = TaxCalcIO.SQLDB_INSERT_ROWS
+            for start in range(0, len(outdf.index), step):
+                # tolist converts numpy values to Python int and float
+                rows = zip(*[array[start:start + step].tolist()
+                             for array in arrays])
+                dbcon.executemany(sql, rows)
+
+    def _write_output_frame(self, outdf, append=False, columns=None,
+                            rounded=False):
+        """
+        Write the columns of outdf DataFrame (None implies all columns)
+        to output file in output_format, where append being True is
+        allowed only for the 'csv' output_format.  When rounded is True,
+        the float columns have already been rounded to the nearest cent
+        (as they are by the dump_output method), so the binary formats
+        write the column arrays of outdf without copying them.
+        """
+        # pylint: disable=too-many-arguments
+        if columns is None:
+            columns = list(outdf.columns)
+        if self.output_format == 'csv':
+            outdf.to_csv(self._output_filename, columns=columns,
+                         index=False, float_format='%.2f',
+                         mode='a' if append else 'w', header=not append)
+            return
+        assert not append
+        fname = self._output_filename.replace('.csv',
+                                              '.' + self.output_format)
+        arrays = {var: outdf[var].values for var in columns}
+        if not rounded:
+            # round float columns as in the CSV-formatted file
+            arrays = {var: (array.round(2) if array.dtype.kind == 'f'
+                            else array)
+                      for var, array in arrays.items()}
+        if self.output_format == 'npz':
+            np.savez_compressed(fname, **arrays)
+        elif importlib.util.find_spec('pyarrow') is None:
+            # parquet file is written by fastparquet, which needs DataFrame
+            pd.DataFrame(data=arrays, copy=False).to_parquet(fname,
+                                                             index=False)
+        else:
+            # optional pyarrow package is imported only when it is used
+            # pylint: disable=import-outside-toplevel
+            import pyarrow
+            import pyarrow.feather
+            import pyarrow.parquet
+            # pyarrow uses the numeric arrays without copying them
+            table = pyarrow.Table.from_arrays(list(arrays.values()),
+                                              names=list(arrays))
+            if self.output_format == 'parquet':
+                pyarrow.parquet.write_table(table, fname)
+            else:
+                pyarrow.feather.write_feather(table, fname)
+
+    def _read_records(self, input_data, tax_year, gfactors,
+                      aging_input_data, exact_calculations):
+        """
+        Return Records object containing INPUT data that are extrapolated
+        using gfactors when aging_input_data is True.
+        """
+        # pylint: disable=too-many-arguments
+        if not aging_input_data:
+            return Records(data=input_data,
+                           start_year=tax_year,
+                           gfactors=None,
+                           weights=None,
+                           adjust_ratios=None,
+                           exact_calculations=exact_calculations)
+        if self.cps_input_data:
+            return Records.cps_constructor(
+                gfactors=gfactors,
+                exact_calculations=exact_calculations
+            )
+        return Records(data=input_data,
+                       gfactors=gfactors,
+                       exact_calculations=exact_calculations)
+
+    def _baseline_deciles(self):
+        """
+        Return array of the baseline decile of each filing unit, which is
+        computed only once by the baseline GroupingIndex object, or None
+        when the sum of weights is not positive because then there are no
+        tables and the decile bin edges are not strictly increasing.
+        """
+        if self.calc_base.total_weight() <= 0.:
+            return None
+        return self.calc_base.grouping_index().table_row('deciles')
+
+    def _table_data(self):
+        """
+        Return dictionary containing arrays of the variables used in tables:
+        the weights and the baseline expanded_income (because
+        expanded_income may change under the reform), and the tax variables
+        under the reform and (with a _base suffix) under the baseline.
+        """
+        tdata = {'s006': self.calc_base.array('s006'),
+                 'expanded_income': self.calc_base.array('expanded_income')}
+        for var in TaxCalcIO.TABLE_TAX_VARS:
+            tdata[var] = self.calc.array(var)
+            tdata[var + '_base'] = self.calc_base.array(var)
+        return tdata
+
+    @staticmethod
+    def _num_rows(frame):
+        """
+        Return number of rows in the frame, which is a Pandas DataFrame or
+        the name of a CSV file whose first column is read one chunk at a
+        time.
+        """
+        if isinstance(frame, pd.DataFrame):
+            return len(frame.index)
+        if not os.path.isfile(frame):
+            frame = read_egg_csv(os.path.basename(frame))  # pragma: no cover
+            return len(frame.index)  # pragma: no cover
+        num_rows = 0
+        with pd.read_csv(frame, usecols=[0], chunksize=1000000) as reader:
+            for chunk in reader:
+                num_rows += len(chunk.index)
+        return num_rows
+
+    def _chunk_calculators(self, input_data, pol, base, con,
+                           gfactors_ref, gfactors_base,
+                           aging_input_data, exact_calculations):
+        """
+        Generator that yields (calc, calc_base) pairs of reform and baseline
+        Calculator objects for each chunk of self.chunk_size filing units
+        in the INPUT data, reading each chunk only once.
+        """
+        # pylint: disable=too-many-arguments
+        if not aging_input_data:
+            data = input_data
+            start_year = pol.current_year
+            weights = None
+            ratios = None
+        elif self.cps_input_data:
+            data = os.path.join(Records.CODE_PATH, 'cps.csv.gz')
+            start_year = Records.CPSCSV_YEAR
+            weights = Records.CPS_WEIGHTS_FILENAME
+            ratios = Records.CPS_RATIOS_FILENAME
+        else:
+            data = input_data
+            start_year = Records.PUFCSV_YEAR
+            weights = Records.PUF_WEIGHTS_FILENAME
+            ratios = Records.PUF_RATIOS_FILENAME
+        first_chunk = True
+        for dchunk, wchunk in Records.data_chunks(self.chunk_size,
+                                                  data, weights):
+            calcs = list()
+            for policy, gfactors in [(pol, gfactors_ref),
+                                     (base, gfactors_base)]:
+                recs = CalcProfiler.call(
+                    'load', 'tcio', Records, data=dchunk,
+                    start_year=start_year,
+                    gfactors=gfactors if aging_input_data else None,
+                    weights=wchunk,
+                    adjust_ratios=ratios,
+                    exact_calculations=exact_calculations
+                )
+                calcs.append(CalcProfiler.call(
+                    'aging', 'tcio', Calculator, policy=policy, records=recs,
+                    verbose=(first_chunk and not calcs),
+                    consumption=con,
+                    sync_years=aging_input_data
+                ))
+            first_chunk = False
+            del dchunk
+            del wchunk
+            yield calcs[0], calcs[1]
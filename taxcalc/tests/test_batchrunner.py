@@ -0,0 +1,156 @@
+"""
+Tests for Tax-Calculator BatchRunner class.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle test_batchrunner.py
+# pylint --disable=locally-disabled test_batchrunner.py
+
+import os
+import gc
+import numpy as np
+import pandas as pd
+import pytest
+# pylint: disable=import-error
+from taxcalc import (Policy, Records, Calculator, BatchRunner,
+                     MultiYearRunner)
+from taxcalc import batchrunner
+
+
+def test_incorrect_instantiation(cps_subsample):
+    """
+    Test incorrect instantiation of BatchRunner object.
+    """
+    recs = Records.cps_constructor(data=cps_subsample)
+    with pytest.raises(ValueError):
+        BatchRunner(list(), 2020)
+    with pytest.raises(ValueError):
+        BatchRunner(recs, 2020.0)
+    with pytest.raises(ValueError):
+        BatchRunner(recs, Records.CPSCSV_YEAR - 1)
+    with pytest.raises(ValueError):
+        BatchRunner(recs, Policy.LAST_BUDGET_YEAR + 1)
+    with pytest.raises(ValueError):
+        BatchRunner(recs, 2020, num_workers=0)
+    raw = Records(data=cps_subsample, start_year=2020,
+                  gfactors=None, weights=None)
+    with pytest.raises(ValueError):
+        BatchRunner(raw, 2021)
+    recs.increment_year()
+    with pytest.raises(ValueError):
+        BatchRunner(recs, 2020)
+
+
+def test_run(cps_subsample, tests_path):
+    """
+    Test that BatchRunner output for each reform is the same as the output
+    of a Calculator object for that reform.
+    """
+    recs = Records.cps_constructor(data=cps_subsample)
+    reforms_path = os.path.join(tests_path, '..', 'reforms')
+    reforms = [
+        os.path.join(reforms_path, '2017_law.json'),
+        {'II_em': {2020: 1000}},
+        '{}+{}'.format(os.path.join(reforms_path, 'ptaxes0.json'),
+                       os.path.join(reforms_path, 'ptaxes1.json'))
+    ]
+    runner = BatchRunner(recs, 2020, num_workers=2)
+    outputs = runner.run(reforms)
+    assert len(outputs) == len(reforms)
+    for reform, output in zip([None] + reforms,
+                              [runner.baseline_output()] + outputs):
+        pol = Policy()
+        if isinstance(reform, dict):
+            pol.implement_reform(reform)
+        elif isinstance(reform, str):
+            for ref in reform.split('+'):
+                pol.implement_reform(
+                    Calculator.read_json_param_objects(ref, None)['policy']
+                )
+        calc = Calculator(policy=pol, records=recs)
+        calc.advance_to_year(2020)
+        calc.calc_all()
+        assert list(output.columns) == BatchRunner.OUTPUT_VARS
+        for var in BatchRunner.OUTPUT_VARS:
+            assert np.allclose(output[var], calc.array(var),
+                               rtol=0., atol=0.)
+    # reform Calculator objects share the extrapolated input variables
+    # but not the calculated variables
+    recs_ref = runner._recs_ref  # pylint: disable=protected-access
+    pol = Policy()
+    pol.set_year(2020)
+    calc = Calculator(policy=pol, records=recs_ref, sync_years=False)
+    assert calc.array('e00200') is recs_ref.e00200
+    assert calc.array('iitax') is not recs_ref.iitax
+    assert runner.run(list()) == list()
+    with pytest.raises(ValueError):
+        runner.run([1])
+    with pytest.raises(ValueError):
+        runner.run([{'II_em': {2020: -1000}}])
+
+
+def test_multiyear_runner(cps_subsample):
+    """
+    Test that MultiYearRunner results are the same as those computed by
+    advancing a Calculator object one year at a time.
+    """
+    recs = Records.cps_constructor(data=cps_subsample)
+    pol = Policy()
+    pol.implement_reform({'II_em': {2018: 1000}})
+    pol.set_year(2017)
+    calc = Calculator(policy=pol, records=recs)
+    expect = calc.diagnostic_table(3)
+    runner = MultiYearRunner(pol, recs, num_workers=2)
+    assert runner.start_year == 2017
+    pd.testing.assert_frame_equal(runner.diagnostic_table(3), expect)
+    pd.testing.assert_frame_equal(runner.diagnostic_table(1),
+                                  calc.diagnostic_table(1))
+    totals = runner.totals(3, ['iitax', 'e00200'])
+    assert list(totals.index) == [2017, 2018, 2019]
+    for year in totals.index:
+        calc.advance_to_year(year)
+        calc.calc_all()
+        for var in totals.columns:
+            assert np.allclose(totals.loc[year, var],
+                               (calc.array(var) * calc.array('s006')).sum())
+    assert list(runner.totals(1).columns) == MultiYearRunner.TOTAL_VARS
+    with pytest.raises(ValueError):
+        runner.totals(0)
+    with pytest.raises(ValueError):
+        runner.diagnostic_table(pol.end_year - 2017 + 2)
+    with pytest.raises(ValueError):
+        MultiYearRunner(recs, recs)
+    with pytest.raises(ValueError):
+        MultiYearRunner(pol, pol)
+    with pytest.raises(ValueError):
+        MultiYearRunner(pol, recs, consumption=pol)
+    with pytest.raises(ValueError):
+        MultiYearRunner(pol, recs, num_workers=0)
+    recs.increment_year()
+    with pytest.raises(ValueError):
+        MultiYearRunner(pol, recs)
+
+
+def test_without_fork(cps_subsample, monkeypatch):
+    """
+    Test that results computed in this process, as they are when worker
+    processes cannot be forked, are the same as those of the workers, and
+    that the workers leave objects frozen by the caller frozen.
+    """
+    recs = Records.cps_constructor(data=cps_subsample)
+    pol = Policy()
+    reforms = [{'II_em': {2020: 1000}}, {'II_em': {2020: 2000}}]
+    gc.freeze()
+    try:
+        frozen = gc.get_freeze_count()
+        forked = BatchRunner(recs, 2020, num_workers=2).run(reforms)
+        table = MultiYearRunner(pol, recs, num_workers=2).diagnostic_table(3)
+        assert gc.get_freeze_count() == frozen
+    finally:
+        gc.unfreeze()
+    monkeypatch.setattr(batchrunner, '_fork_available', lambda: False)
+    outputs = BatchRunner(recs, 2020, num_workers=2).run(reforms)
+    for output, expect in zip(outputs, forked):
+        pd.testing.assert_frame_equal(output, expect)
+    pd.testing.assert_frame_equal(
+        MultiYearRunner(pol, recs, num_workers=2).diagnostic_table(3), table
+    )
@@ -0,0 +1,98 @@
+"""
+Tests for Tax-Calculator CalcProfiler class.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle test_calcprofiler.py
+# pylint --disable=locally-disabled test_calcprofiler.py
+
+import json
+import numpy as np
+import pytest
+# pylint: disable=import-error
+from taxcalc import Policy, Records, Calculator, CalcProfiler
+
+
+@pytest.fixture(scope='module', name='calc')
+def fixture_calc(cps_subsample):
+    """
+    Return Calculator object for the CPS subsample in 2020.
+    """
+    calc = Calculator(policy=Policy(),
+                      records=Records.cps_constructor(data=cps_subsample))
+    calc.advance_to_year(2020)
+    return calc
+
+
+def test_profiled_calc_all(calc, tmpdir):
+    """
+    Test that profiling records the calls of all the layers without
+    changing the calculated results.
+    """
+    calc.calc_all()
+    expect = calc.array('combined').copy()
+    with CalcProfiler() as prof:
+        calc.calc_all()
+    assert CalcProfiler.active is None
+    assert np.allclose(calc.array('combined'), expect)
+    table = prof.table()
+    assert list(table.columns) == ['name', 'layer', 'calls', 'seconds',
+                                   'mean_ms']
+    assert list(table['layer'].unique()) == CalcProfiler.LAYERS[1:]
+    calls = {(name, layer): count for name, layer, count
+             in zip(table['name'], table['layer'], table['calls'])}
+    assert calls[('calc_all', 'calculator')] == 1
+    assert calls[('DeductionChoice', 'stage')] == 1
+    assert calls[('BenefitSurtax', 'stage')] == 1
+    # TaxInc through AMT functions are called three times by the
+    # DeductionChoice stage
+    assert calls[('AMT', 'dispatcher')] == 3
+    assert calls[('AMT', 'kernel')] == 3
+    assert calls[('IITAX', 'dispatcher')] == 1
+    # calls are no longer recorded after the CalcProfiler is exited
+    calc.calc_all()
+    assert prof.table().equals(table)
+    # each event is a complete event in the Chrome trace file
+    fname = str(tmpdir.join('trace.json'))
+    prof.write_chrome_trace(fname)
+    with open(fname) as tfile:
+        trace = json.load(tfile)
+    assert len(trace['traceEvents']) == table['calls'].sum()
+    assert all(event['ph'] == 'X' and event['dur'] >= 0.
+               for event in trace['traceEvents'])
+
+
+def test_profiled_memory(calc):
+    """
+    Test recording of bytes allocated by profiled calls.
+    """
+    with CalcProfiler(memory=True) as prof:
+        calc.calc_all()
+    table = prof.table().set_index(['name', 'layer'])
+    assert table.loc[('calc_all', 'calculator'), 'bytes'] > 0
+    # each call allocates at least as many bytes as the calls it makes
+    assert (table.loc[('calc_all', 'calculator'), 'bytes'] >=
+            table.loc[('DeductionChoice', 'stage'), 'bytes'])
+    dispatcher = table.xs('dispatcher', level='layer')['bytes']
+    kernel = table.xs('kernel', level='layer')['bytes']
+    assert np.all(dispatcher.sort_index() >= kernel.sort_index())
+    chrome = prof.chrome_trace()
+    assert all('bytes' in event['args'] for event in chrome['traceEvents'])
+
+
+def test_profiler_errors(calc):
+    """
+    Test that only one CalcProfiler can be active.
+    """
+    with CalcProfiler() as prof:
+        with pytest.raises(ValueError):
+            with CalcProfiler():
+                pass
+        assert CalcProfiler.active is prof
+    assert CalcProfiler.active is None
+    assert prof.table().empty
+    # profiler is deactivated when an exception is raised
+    with pytest.raises(ZeroDivisionError):
+        with CalcProfiler():
+            calc.calc_all()
+            _ = 1 / 0
+    assert CalcProfiler.active is None
@@ -10,6 +10,8 @@ Tests of Calculator class.
 import os
 from io import StringIO
 import copy
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 import numpy as np
 import pandas as pd
@@ -894,3 +896,101 @@ def test_calc_all_benefits_amounts(cps_subsample):
 
     assert np.allclose(ubi_diff, benefit_cost_diff)
     assert np.allclose(ubi_diff, benefit_value_diff)
+
+
+def test_calc_all_incremental(cps_subsample, monkeypatch):
+    """
+    Test that incremental calc_all calls give the same results as calc_all
+    calls by a new Calculator object and skip unaffected functions.
+    """
+    recs = Records.cps_constructor(data=cps_subsample)
+    calc = Calculator(policy=Policy(), records=recs)
+    calc.advance_to_year(2020)
+    calc.calc_all(incremental=True)
+    deduction_choices = list()
+    original_deduction_choice = Calculator._deduction_choice
+
+    def counting_deduction_choice(self):
+        deduction_choices.append(True)
+        original_deduction_choice(self)
+
+    monkeypatch.setattr(Calculator, '_deduction_choice',
+                        counting_deduction_choice)
+    changes = [('CTC_c', [3000.], False),
+               ('STD', [[13000., 25000., 13000., 19000., 25000.]], True),
+               ('EITC_c', [[600., 3600., 6000., 6700.]], False),
+               ('FST_AGI_trt', [0.3], False),
+               ('CTC_c', [2500.], False),
+               ('II_rt4', [0.3], True)]
+    reform = dict()
+    for pname, pvalue, calls_deduction_choice in changes:
+        calc.policy_param(pname, np.array(pvalue))
+        del deduction_choices[:]
+        calc.calc_all(incremental=True)
+        assert bool(deduction_choices) == calls_deduction_choice
+        reform[pname] = {2020: pvalue[0]}
+        pol = Policy()
+        pol.implement_reform(reform)
+        new_calc = Calculator(policy=pol, records=recs)
+        new_calc.advance_to_year(2020)
+        new_calc.calc_all()
+        for varname in recs.CALCULATED_VARS:
+            assert np.allclose(calc.array(varname),
+                               new_calc.array(varname)), varname
+
+
+def test_calc_all_async(cps_subsample):
+    """
+    Test that calc_all_async coroutines give the same results as calc_all
+    calls when run concurrently and after a cancelled coroutine.
+    """
+    recs = Records.cps_constructor(data=cps_subsample)
+    pol = Policy()
+    calc = Calculator(policy=pol, records=recs)
+    calc.advance_to_year(2020)
+    calc.calc_all()
+    pol.implement_reform({'II_em': {2020: 1000}})
+    ref_calc = Calculator(policy=pol, records=recs)
+    ref_calc.advance_to_year(2020)
+    ref_calc.calc_all()
+    calcs = [Calculator(policy=Policy(), records=recs),
+             Calculator(policy=pol, records=recs)]
+    for acalc in calcs:
+        acalc.advance_to_year(2020)
+
+    async def cancelled_calc_all(executor):
+        task = asyncio.ensure_future(
+            calcs[0].calc_all_async(executor=executor)
+        )
+        await asyncio.sleep(0)  # let task start calculating first stage
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        asyncio.run(cancelled_calc_all(executor))
+    # leaving the with statement waits for the stage being calculated when
+    # the task was cancelled, so the Calculator object can now be used
+    assert not np.any(calcs[0].array('combined'))
+
+    async def concurrent_calc_all():
+        await asyncio.gather(*[acalc.calc_all_async() for acalc in calcs])
+
+    asyncio.run(concurrent_calc_all())
+    for acalc, expect in zip(calcs, [calc, ref_calc]):
+        for varname in recs.CALCULATED_VARS:
+            assert np.allclose(acalc.array(varname),
+                               expect.array(varname)), varname
+    # changing calculated variables are zeroed out at the same point
+    ubi_pol = Policy()
+    ubi_pol.implement_reform({'UBI_21': {2020: 1000}})
+    ubi_calcs = [Calculator(policy=ubi_pol, records=recs) for _ in range(2)]
+    for acalc in ubi_calcs:
+        acalc.advance_to_year(2020)
+    ubi_calcs[0].calc_all()
+    assert ubi_calcs[0].weighted_total('ubi') > 0.
+    ubi_calcs[0].calc_all(zero_out_calc_vars=True)
+    asyncio.run(ubi_calcs[1].calc_all_async(zero_out_calc_vars=True))
+    for varname in recs.CALCULATED_VARS:
+        assert np.allclose(ubi_calcs[1].array(varname),
+                           ubi_calcs[0].array(varname)), varname
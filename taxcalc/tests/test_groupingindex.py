@@ -0,0 +1,98 @@
+"""
+Tests for Tax-Calculator GroupingIndex class.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle test_groupingindex.py
+# pylint --disable=locally-disabled test_groupingindex.py
+
+import numpy as np
+import pytest
+# pylint: disable=import-error
+from taxcalc import Policy, Records, Calculator, GroupingIndex
+from taxcalc.utils import (STANDARD_INCOME_BINS, SOI_AGI_BINS,
+                           quantile_table_row, income_table_row)
+
+
+def test_incorrect_instantiation():
+    """
+    Test incorrect instantiation of GroupingIndex object.
+    """
+    with pytest.raises(ValueError):
+        GroupingIndex(np.ones(3), np.ones(2))
+    with pytest.raises(ValueError):
+        GroupingIndex(np.ones(3), np.ones(3), xtot=np.ones(2))
+    with pytest.raises(ValueError):
+        GroupingIndex(np.ones(3), np.ones(3), xtot=np.ones(3),
+                      weight_by_income_measure=True)
+    with pytest.raises(ValueError):
+        GroupingIndex(np.ones(3), np.ones(3)).table_row('quintiles')
+
+
+@pytest.mark.parametrize('pop_quantiles', [False, True])
+def test_table_rows(pop_quantiles):
+    """
+    Test that GroupingIndex table rows equal those computed by the
+    quantile_table_row and income_table_row utility functions.
+    """
+    rng = np.random.RandomState(seed=123456)
+    income = rng.normal(50e3, 80e3, size=1000)
+    weight = rng.uniform(0.5, 2.0, size=1000)
+    xtot = rng.randint(0, 6, size=1000) if pop_quantiles else None
+    gindex = GroupingIndex(income, weight, xtot=xtot)
+    # more than a tenth of incomes are negative and none are zero, so the
+    # weighted_deciles bin edges do not increase strictly monotonically
+    with pytest.raises(ValueError):
+        gindex.table_row('weighted_deciles')
+    with pytest.raises(ValueError):
+        quantile_table_row(income, weight, 10, xtot=xtot,
+                           decile_details=True)
+    detail_income = np.abs(income)
+    detail_income[:30] = 0.
+    detail_income[30:60] *= -1.
+    detail_gindex = GroupingIndex(detail_income, weight, xtot=xtot)
+    assert np.array_equal(
+        detail_gindex.table_row('weighted_deciles'),
+        quantile_table_row(detail_income, weight, 10, xtot=xtot,
+                           decile_details=True)
+    )
+    assert np.array_equal(gindex.table_row('deciles'),
+                          quantile_table_row(income, weight, 10, xtot=xtot))
+    assert np.array_equal(gindex.table_row('percentiles'),
+                          quantile_table_row(income, weight, 100, xtot=xtot))
+    assert np.array_equal(gindex.table_row('standard_income_bins'),
+                          income_table_row(income, STANDARD_INCOME_BINS))
+    assert np.array_equal(gindex.table_row('soi_agi_bins'),
+                          income_table_row(income, SOI_AGI_BINS))
+    for groupby in GroupingIndex.NUM_ROWS:
+        if groupby == 'weighted_deciles':
+            continue
+        assert gindex.table_row(groupby) is gindex.table_row(groupby)
+        assert gindex.table_row(groupby).max() < gindex.num_rows(groupby)
+    assert (detail_gindex.table_row('weighted_deciles') is
+            detail_gindex.table_row('weighted_deciles'))
+    assert (detail_gindex.table_row('weighted_deciles').max() <
+            detail_gindex.num_rows('weighted_deciles'))
+
+
+def test_calculator_grouping_index(cps_subsample):
+    """
+    Test caching of GroupingIndex objects by Calculator object.
+    """
+    rec = Records.cps_constructor(data=cps_subsample)
+    calc = Calculator(policy=Policy(), records=rec)
+    calc.calc_all()
+    gindex = calc.grouping_index()
+    assert calc.grouping_index() is gindex
+    assert calc.grouping_index(pop_quantiles=True) is not gindex
+    assert np.array_equal(gindex.income, calc.array('expanded_income'))
+    single = calc.grouping_index(mars=1)
+    assert single.income.size == np.sum(calc.array('MARS') == 1)
+    # interim mtr calculations leave cached objects unchanged
+    calc.mtr(calc_all_already_called=True)
+    assert calc.grouping_index() is gindex
+    # changes to the embedded Records object discard cached objects
+    calc.calc_all()
+    assert calc.grouping_index() is not gindex
+    gindex = calc.grouping_index()
+    calc.incarray('e00200p', np.ones(calc.array_len))
+    assert calc.grouping_index() is not gindex
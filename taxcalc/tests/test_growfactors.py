@@ -90,3 +90,20 @@ def test_growfactors_csv_values():
         for gfname in GrowFactors.VALID_NAMES:
             val = gfo.factor_value(gfname, min_data_year)
             assert val == 1
+
+
+def test_shared_growfactors():
+    """
+    Test that GrowFactors objects read from the same file share their
+    factors until one of them is updated.
+    """
+    gfo1 = GrowFactors()
+    gfo2 = GrowFactors()
+    assert gfo1.gfdf is gfo2.gfdf
+    val = gfo1.factor_value('AWAGE', 2015)
+    assert val == gfo1.gfdf['AWAGE'][2015]
+    gfo2.update('AWAGE', 2015, 0.01)
+    assert gfo2.factor_value('AWAGE', 2015) == val + 0.01
+    assert gfo2.gfdf['AWAGE'][2015] == val + 0.01
+    assert gfo1.factor_value('AWAGE', 2015) == val
+    assert GrowFactors().factor_value('AWAGE', 2015) == val
@@ -575,3 +575,34 @@ def test_read_json_revision():
     with pytest.raises(ValueError):
         # error because second topkey argument is not in good_revision
         Parameters._read_json_revision(good_revision, 'unknown_topkey')
+
+
+@pytest.mark.parametrize("rfnames", [
+    ["TCJA.json"],
+    ["TCJA.json", "2017_law.json"],
+])
+def test_incremental_indexing(tests_path, rfnames):
+    """
+    Check that re-extending only the changed indexed parameter values
+    produces the same policy as re-extending all indexed parameter values.
+    """
+    # pylint: disable=protected-access
+    revisions = list()
+    for rfname in rfnames:
+        path = os.path.join(tests_path, '..', 'reforms', rfname)
+        revisions.append(Policy.read_json_reform(path))
+    revisions.append({'II_em': {2020: 5000},
+                      'parameter_indexing_CPI_offset': {2019: -0.005}})
+    results = list()
+    for incremental in (False, True):
+        pol = Policy()
+        pol.incremental_indexing = incremental
+        for revision in revisions:
+            pol.implement_reform(revision, print_warnings=False)
+        results.append(pol)
+    pol_full, pol_incr = results
+    for param in pol_full._data:
+        if param == 'schema':
+            continue
+        assert np.allclose(pol_full.to_array(param),
+                           pol_incr.to_array(param))
@@ -64,6 +64,25 @@ def test_correct_class_instantiation():
         pol.implement_reform({2020: {'II_em': -1000}})
 
 
+def test_policy_template_cloning(monkeypatch):
+    """
+    Test that Policy objects cloned from the current-law template are
+    independent of each other and equal to one read from the defaults file.
+    """
+    # pylint: disable=protected-access
+    pol1 = Policy()
+    pol2 = Policy()
+    assert pol1._data is not pol2._data
+    assert pol1._init_values is pol2._init_values
+    assert pol2._validator_schema.context['spec'] is pol2
+    pol2.implement_reform({'II_em': {2020: 1000}})
+    assert pol1._II_em[2020 - Policy.JSON_START_YEAR] != 1000
+    assert pol2._II_em[2020 - Policy.JSON_START_YEAR] == 1000
+    monkeypatch.setattr(Policy, 'use_templates', False)
+    pol3 = Policy()
+    cmp_policy_objs(pol1, pol3)
+
+
 def test_json_reform_url():
     """
     Test reading a JSON reform from a URL. Results from the URL are expected
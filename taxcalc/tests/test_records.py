@@ -2,6 +2,7 @@
 # pycodestyle test_records.py
 
 import os
+import copy
 import json
 import numpy as np
 from numpy.testing import assert_array_equal
@@ -9,6 +10,7 @@ import pandas as pd
 import pytest
 from io import StringIO
 from taxcalc import GrowFactors, Policy, Records, Calculator
+from taxcalc.records import validity_flags, numpy_validity_flags
 
 
 def test_incorrect_Records_instantiation(cps_subsample):
@@ -119,6 +121,140 @@ def test_read_data(csv):
         Records(data=df)
 
 
+@pytest.mark.parametrize('jit_min_records', [0, 1000000000])
+def test_validity_checks(jit_min_records, monkeypatch):
+    """
+    Test that every failed check and every failing record is reported,
+    whichever function does the checks, and that no checks are done on
+    trusted data.
+    """
+    monkeypatch.setattr(Records, 'VALIDITY_JIT_MIN_RECORDS', jit_min_records)
+    csv = (
+        u'RECID,MARS,EIC,e00200,e00200p,e00200s,e00600,e00650\n'
+        u'1,    2,   0,   50000,  30000,   20000,     8,     8\n'
+        u'7,    6,   4,   50000,  50000,    0.03,     8,     9\n'
+        u'9,    1,   0,   50000,  30000,   20000,     8,     8\n'
+    )
+    df = pd.read_csv(StringIO(csv))
+    with pytest.raises(ValueError) as excinfo:
+        Records(data=df, gfactors=None, weights=None)
+    msgs = str(excinfo.value).split('\n')
+    assert msgs == [
+        'not all MARS values in [1,5] range (RECID 7)',
+        'not all EIC values in [0,3] range (RECID 7)',
+        ('expression "e00200 == e00200p + e00200s" is not true for '
+         'every record (RECID 7)'),
+        ('e00200s is not always zero for non-married filing unit '
+         '(RECID 7, 9)'),
+        'expression "e00600 >= e00650" is not true for every record (RECID 7)'
+    ]
+    recs = Records(data=df, gfactors=None, weights=None, trusted=True)
+    assert_array_equal(recs.num, [2, 1, 1])
+    # only the first VALIDITY_MAX_RECIDS failing records are listed
+    df = pd.DataFrame({'RECID': np.arange(1, 31), 'MARS': 9})
+    with pytest.raises(ValueError) as excinfo:
+        Records(data=df, gfactors=None, weights=None)
+    recids = ', '.join(str(rid) for rid in range(1, 21))
+    assert str(excinfo.value) == (
+        'not all MARS values in [1,5] range (RECID {} and 10 more)'
+    ).format(recids)
+
+
+def test_validity_flags():
+    """
+    Test that the compiled and numpy functions flag the same records,
+    including records with missing amounts.
+    """
+    rng = np.random.default_rng(1)
+    size = 1000
+    args = [rng.integers(1, 6, size=size), rng.integers(0, 4, size=size)]
+    args[0][:10] = [0, 6, 0, 6, 0, 6, 0, 6, 0, 6]
+    args[1][10:20] = [-1, 4, -1, 4, -1, 4, -1, 4, -1, 4]
+    amounts = [0., 0.01, 0.03, 100., -100., np.nan]
+    probs = [0.99, 0.002, 0.002, 0.002, 0.002, 0.002]
+    for _ in range(15):
+        args.append(rng.choice(amounts, size=size, p=probs))
+    flags = validity_flags(*args)
+    assert np.any(flags) and not np.all(flags)
+    assert_array_equal(numpy_validity_flags(*args), flags)
+
+
+def test_weights_matrix(cps_subsample):
+    """
+    Test that the weights of all years are in one read-only matrix that
+    is shared by Calculator objects, that the s006 weights are changeable
+    copies of its columns, and that the WT DataFrame contains the weights
+    as they are read.
+    """
+    wghts = pd.read_csv(os.path.join(Records.CODE_PATH,
+                                     Records.CPS_WEIGHTS_FILENAME))
+    recs = Records.cps_constructor(data=cps_subsample)
+    wmat = recs.weights_matrix
+    assert wmat.dtype == np.float64
+    assert wmat.shape == (recs.array_length, len(wghts.columns))
+    assert wmat.flags['F_CONTIGUOUS']
+    assert not wmat.flags['WRITEABLE']
+    # sub-sample weights are scaled up to the full-sample total
+    assert np.allclose(wmat.sum(axis=0), 0.01 * wghts.sum().values)
+    assert list(recs.WT.columns) == list(wghts.columns)
+    assert np.allclose(recs.WT['WT2014'], wmat[:, 0] * 100.)
+    assert_array_equal(recs.s006, wmat[:, 0])
+    calc1 = Calculator(policy=Policy(), records=recs)
+    calc2 = Calculator(policy=Policy(), records=recs)
+    calc1.advance_to_year(2020)
+    calc2.advance_to_year(2021)
+    assert_array_equal(calc1.array('s006'), wmat[:, 6])
+    assert_array_equal(calc2.array('s006'), wmat[:, 7])
+    weights = calc1.array('s006')
+    weights *= 2.  # s006 can be changed in place
+    assert_array_equal(calc1.array('s006'), 2. * wmat[:, 6])
+    assert_array_equal(calc2.array('s006'), wmat[:, 7])
+    assert copy.deepcopy(recs).weights_matrix is wmat
+    full = Records.cps_constructor()
+    pd.testing.assert_frame_equal(full.WT.round().astype(np.int32),
+                                  wghts.astype(np.int32))
+
+
+def test_read_chunks(cps_subsample, tmpdir):
+    data = cps_subsample.reset_index(drop=True)
+    wghts_path = os.path.join(Records.CODE_PATH, Records.CPS_WEIGHTS_FILENAME)
+    wghts = pd.read_csv(wghts_path).iloc[:len(data.index)]
+    recs = Records(data=data, start_year=Records.CPSCSV_YEAR,
+                   weights=wghts, adjust_ratios=None)
+    recs.increment_year()
+    data_path = os.path.join(str(tmpdir), 'data.csv')
+    data.to_csv(data_path, index=False)
+    wghts_path = os.path.join(str(tmpdir), 'weights.csv')
+    wghts.to_csv(wghts_path, index=False)
+    for dat, wgt in [(data, wghts), (data_path, wghts_path)]:
+        chunks = list(Records.read_chunks(1000, data=dat,
+                                          start_year=Records.CPSCSV_YEAR,
+                                          weights=wgt, adjust_ratios=None))
+        assert [chunk.array_length for chunk in chunks] == [1000, 1000, 800]
+        for chunk in chunks:
+            chunk.increment_year()
+        for var in ['RECID', 'e00200', 's006']:
+            assert_array_equal(
+                np.concatenate([getattr(chunk, var) for chunk in chunks]),
+                getattr(recs, var)
+            )
+    # data and weights must have the same number of rows
+    with pytest.raises(ValueError):
+        list(Records.data_chunks(1000, data, wghts.iloc[:2000]))
+    with pytest.raises(ValueError):
+        list(Records.data_chunks(1000, data, wghts.iloc[:2500]))
+    with pytest.raises(ValueError):
+        list(Records.data_chunks(1000, data.iloc[:2000], wghts))
+    with pytest.raises(ValueError):
+        list(Records.data_chunks(0, data, None))
+    with pytest.raises(ValueError):
+        list(Records.data_chunks(1000, list(), None))
+    # default CPS data are read one chunk at a time
+    chunk = next(Records.cps_read_chunks(100, gfactors=None))
+    assert chunk.array_length == 100
+    assert_array_equal(chunk.RECID, Records.read_cps_data()['RECID'][:100])
+
+
 def test_for_duplicate_names():
     records_varinfo = Records(data=None)
     varnames = set()
@@ -0,0 +1,97 @@
+"""
+Tests for Tax-Calculator ResultCache class.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle test_resultcache.py
+# pylint --disable=locally-disabled test_resultcache.py
+
+import numpy as np
+import pytest
+# pylint: disable=import-error
+from taxcalc import (Policy, Records, Calculator, ResultCache,
+                     Consumption, GrowDiff)
+
+
+def test_incorrect_instantiation(tmpdir):
+    """
+    Test incorrect instantiation of ResultCache object.
+    """
+    with pytest.raises(ValueError):
+        ResultCache(str(tmpdir), max_entries=0)
+    with pytest.raises(ValueError):
+        ResultCache(str(tmpdir), max_entries=1.5)
+
+
+def test_calc_all_with_cache(cps_subsample, tmpdir):
+    """
+    Test that cached results equal calculated results and that changing
+    the year or the policy produces a different cache key.
+    """
+    cache = ResultCache(str(tmpdir), max_entries=2)
+    rec = Records.cps_constructor(data=cps_subsample)
+    calc1 = Calculator(policy=Policy(), records=rec)
+    calc1.advance_to_year(2020)
+    calc1.calc_all(cache=cache)
+    assert len(cache) == 1
+    expect = {var: calc1.array(var) for var in ResultCache.CACHED_VARIABLES}
+    # restore cached results into a Calculator with the same inputs
+    calc2 = Calculator(policy=Policy(), records=rec)
+    calc2.advance_to_year(2020)
+    calc2.calc_all(cache=cache)
+    assert len(cache) == 1
+    for var, values in expect.items():
+        assert np.array_equal(calc2.array(var), values)
+    assert np.all(calc2.array('c05200') == 0.)
+    # changes in year and in policy produce new cache entries
+    calc2.increment_year()
+    calc2.calc_all(cache=cache)
+    assert len(cache) == 2
+    pol = Policy()
+    pol.implement_reform({'II_em': {2020: 1000}})
+    calc3 = Calculator(policy=pol, records=rec)
+    calc3.advance_to_year(2020)
+    calc3.calc_all(cache=cache)
+    assert len(cache) == 2
+    assert not np.array_equal(calc3.array('iitax'), expect['iitax'])
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_cache_key_inputs(cps_subsample, tmpdir, monkeypatch):
+    """
+    Test that GrowDiff parameters are part of the cache key and that the
+    digest of the input data is computed once for each Records object and
+    year unless the input data are set by the Calculator array method.
+    """
+    cache = ResultCache(str(tmpdir))
+    rec = Records.cps_constructor(data=cps_subsample)
+    calc = Calculator(policy=Policy(), records=rec)
+    gdiff = GrowDiff()
+    gdiff.update_growdiff({'ABOOK': {2015: 0.01}})
+    key = cache.key(rec, Policy(), Consumption(), 2014,
+                    growdiffs=[GrowDiff()])
+    assert key == cache.key(rec, Policy(), Consumption(), 2014,
+                            growdiffs=[GrowDiff()],
+                            records_digest=ResultCache.records_digest(rec))
+    assert key != cache.key(rec, Policy(), Consumption(), 2014,
+                            growdiffs=[gdiff])
+    digests = list()
+
+    def counting_digest(records):
+        digests.append(records)
+        return 'records{}'.format(len(digests))
+
+    monkeypatch.setattr(cache, 'records_digest', counting_digest)
+    calc.calc_all(cache=cache)
+    calc.calc_all(cache=cache)
+    assert len(digests) == 1
+    calc.calc_all(cache=cache, growdiffs=[gdiff])
+    assert len(digests) == 1
+    assert len(cache) == 2
+    calc.array('e00200', calc.array('e00200') * 2.)
+    calc.calc_all(cache=cache)
+    assert len(digests) == 2
+    calc.increment_year()
+    calc.calc_all(cache=cache)
+    assert len(digests) == 3
+    assert len(cache) == 4
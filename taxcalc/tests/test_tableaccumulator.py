@@ -0,0 +1,105 @@
+"""
+Tests for Tax-Calculator TableAccumulator class.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle test_tableaccumulator.py
+# pylint --disable=locally-disabled test_tableaccumulator.py
+
+import os
+import copy
+import numpy as np
+import pandas as pd
+import pytest
+# pylint: disable=import-error
+from taxcalc import (Policy, Records, Calculator, GrowFactors,
+                     TableAccumulator)
+
+
+def test_incorrect_instantiation():
+    """
+    Test incorrect instantiation of TableAccumulator object.
+    """
+    with pytest.raises(ValueError):
+        TableAccumulator('quintiles')
+    with pytest.raises(ValueError):
+        TableAccumulator('soi_agi_bins', pop_quantiles=True)
+    with pytest.raises(ValueError):
+        TableAccumulator().diagnostic_table()
+    with pytest.raises(ValueError):
+        TableAccumulator().distribution_table()
+    with pytest.raises(ValueError):
+        TableAccumulator('weighted_deciles').distribution_table()
+    with pytest.raises(ValueError):
+        TableAccumulator('soi_agi_bins').distribution_table()
+
+
+@pytest.fixture(scope='module', name='calcs')
+def fixture_calcs(cps_subsample):
+    """
+    Return Calculator object containing all of cps_subsample and list of
+    Calculator objects each containing a chunk of cps_subsample.
+    """
+    weights = pd.read_csv(os.path.join(Records.CODE_PATH,
+                                       Records.CPS_WEIGHTS_FILENAME))
+    data = cps_subsample.reset_index(drop=True)
+    bounds = [0, 300, 600, len(data.index)]
+    calcs = list()
+    for first, last in [(0, len(data.index))] + list(zip(bounds[:-1],
+                                                         bounds[1:])):
+        rec = Records(data=data.iloc[first:last].reset_index(drop=True),
+                      start_year=Records.CPSCSV_YEAR,
+                      gfactors=GrowFactors(),
+                      weights=weights.iloc[first:last].reset_index(drop=True),
+                      adjust_ratios=Records.CPS_RATIOS_FILENAME)
+        calc = Calculator(policy=Policy(), records=rec)
+        calc.advance_to_year(2020)
+        calc.calc_all()
+        calcs.append(calc)
+    return calcs[0], calcs[1:]
+
+
+@pytest.mark.parametrize('groupby, pop_quantiles', [
+    ('weighted_deciles', False),
+    ('weighted_deciles', True),
+    ('standard_income_bins', False),
+    ('soi_agi_bins', False)
+])
+def test_distribution_table(calcs, groupby, pop_quantiles):
+    """
+    Test that accumulated distribution tables equal those returned by
+    the Calculator distribution_tables method.
+    """
+    calc, chunks = calcs
+    expect, _ = calc.distribution_tables(None, groupby,
+                                         pop_quantiles=pop_quantiles)
+    acc = TableAccumulator(groupby, pop_quantiles=pop_quantiles)
+    acc.add(calc)
+    pd.testing.assert_frame_equal(acc.distribution_table(), expect)
+    acc = TableAccumulator(groupby, pop_quantiles=pop_quantiles)
+    for chunk in chunks:
+        acc.add(chunk)
+    table = acc.distribution_table()
+    pd.testing.assert_index_equal(table.index, expect.index)
+    assert np.allclose(table.values.astype(float),
+                       expect.values.astype(float), rtol=1e-12, atol=0.)
+    # all filing units in a distribution table must be in the same year
+    next_year = copy.deepcopy(chunks[0])
+    next_year.increment_year()
+    with pytest.raises(ValueError):
+        acc.add(next_year)
+
+
+def test_diagnostic_table(calcs):
+    """
+    Test that accumulated diagnostic tables equal those returned by the
+    Calculator diagnostic_table method.
+    """
+    calc, chunks = calcs
+    expect = calc.diagnostic_table(1)
+    acc = TableAccumulator()
+    acc.add(calc)
+    pd.testing.assert_frame_equal(acc.diagnostic_table(), expect)
+    acc = TableAccumulator()
+    for chunk in chunks:
+        acc.add(chunk)
+    assert np.allclose(acc.diagnostic_table(), expect, rtol=0., atol=0.01)
@@ -8,11 +8,17 @@ Tests for Tax-Calculator TaxCalcIO class.
 # pylint: disable=too-many-lines
 
 import os
+import shutil
+import sqlite3
+import asyncio
+import importlib.util
 from io import StringIO
 import tempfile
 import pytest
+import numpy as np
 import pandas as pd
-from taxcalc import TaxCalcIO  # pylint: disable=import-error
+# pylint: disable=import-error
+from taxcalc import TaxCalcIO, CalcProfiler, Records
 
 
 RAWINPUT = (
@@ -516,6 +522,73 @@ def test_sqldb_option(reformfile1, assumpfile1):
         os.remove(dbfilepath)
 
 
+def test_sqldb_same_as_dump(reformfile1):
+    """
+    Test that the SQLite3 dump table written along with dump output has the
+    same contents and column types as the table written by Pandas to_sql.
+    """
+    idf = pd.read_csv(StringIO(RAWINPUT))
+    outdir = tempfile.mkdtemp()
+    tcio = TaxCalcIO(input_data=idf, tax_year=2020, baseline=None,
+                     reform=reformfile1.name, assump=None, outdir=outdir)
+    tcio.init(input_data=idf, tax_year=2020, baseline=None,
+              reform=reformfile1.name, assump=None,
+              aging_input_data=False, exact_calculations=False)
+    assert not tcio.errmsg
+    tcio.analyze(writing_output_file=True, output_dump=True,
+                 output_sqldb=True)
+    outfilepath = tcio.output_filepath()
+    csvdf = pd.read_csv(outfilepath)
+    dbcon = sqlite3.connect(outfilepath.replace('.csv', '.db'))
+    dbdf = pd.read_sql_query('SELECT * FROM dump', dbcon)
+    assert sorted(dbdf.columns) == list(csvdf.columns)
+    for var in csvdf.columns:
+        assert np.allclose(dbdf[var], csvdf[var], rtol=0., atol=0.005)
+    # compare with to_sql table, including appended rows
+    TaxCalcIO._write_sqldb_table(  # pylint: disable=protected-access
+        dbcon, 'dump', dbdf, append=True
+    )
+    dbdf.to_sql('expect', dbcon, index=False)
+    dbdf.to_sql('expect', dbcon, index=False, if_exists='append')
+    schema = 'SELECT name, type FROM pragma_table_info("{}")'
+    assert (dbcon.execute(schema.format('dump')).fetchall() ==
+            dbcon.execute(schema.format('expect')).fetchall())
+    pd.testing.assert_frame_equal(
+        pd.read_sql_query('SELECT * FROM dump', dbcon),
+        pd.read_sql_query('SELECT * FROM expect', dbcon)
+    )
+    dbcon.close()
+    shutil.rmtree(outdir, ignore_errors=True)
+
+
+def test_memprofile_file(reformfile1):
+    """
+    Test that the memory profile file lists each stage of the analysis.
+    """
+    idf = _weighted_input(100)
+    outdir = tempfile.mkdtemp()
+    tcio = TaxCalcIO(input_data=idf, tax_year=2020, baseline=None,
+                     reform=reformfile1.name, assump=None, outdir=outdir)
+    with CalcProfiler(memory=True) as profiler:
+        tcio.init(input_data=idf, tax_year=2020, baseline=None,
+                  reform=reformfile1.name, assump=None,
+                  aging_input_data=False, exact_calculations=False)
+        assert not tcio.errmsg
+        tcio.analyze(writing_output_file=True, output_tables=True,
+                     output_dump=True, output_sqldb=True)
+    tcio.write_memprofile_file(profiler)
+    with open(tcio.output_filepath().replace('.csv', '-mem.text')) as mfile:
+        lines = mfile.read().splitlines()
+    assert lines[0].startswith('Peak resident set size:')
+    assert lines[2].split() == ['stage', 'calls', 'seconds', 'alloc_MB',
+                                'rss_growth_MB']
+    stages = set(line.split()[0] for line in lines[3:])
+    assert stages == set(['load', 'aging', 'calc_all_reform',
+                          'calc_all_baseline', 'mtr', 'dump_build',
+                          'output_write', 'sqldb_write', 'tables_write'])
+    shutil.rmtree(outdir, ignore_errors=True)
+
+
 def test_no_tables_or_graphs(reformfile1):
     """
     Test TaxCalcIO with output_tables=True and output_graphs=True but
@@ -710,3 +783,268 @@ def fixture_reformfile9():
             os.remove(rfile.name)
         except OSError:
             pass  # sometimes we can't remove a generated temporary file
+
+
+def _weighted_input(nobs):
+    """
+    Return DataFrame containing nobs filing units with positive weights.
+    """
+    idict = dict()
+    idict['RECID'] = list(range(1, nobs + 1))
+    idict['MARS'] = [1 + (i % 2) for i in range(nobs)]
+    idict['s006'] = [10.0 + i for i in range(nobs)]
+    idict['e00200'] = [5000.0 * (nobs - i) for i in range(nobs)]
+    idict['e00200p'] = idict['e00200']
+    idict['e00300'] = [1000.0 * i for i in range(nobs)]
+    return pd.DataFrame(idict, columns=list(idict))
+
+
+@pytest.mark.parametrize('chunk_size', [30, 1000])
+def test_chunked_analyze(reformfile1, chunk_size):
+    """
+    Test that TaxCalcIO output is the same when the INPUT filing units are
+    analyzed one chunk at a time.
+    """
+    # pylint: disable=too-many-locals
+    nobs = 100
+    idf = _weighted_input(nobs)
+    dumpvars = set(['RECID', 'FLPDYR', 'iitax', 'payrolltax', 'combined',
+                    'expanded_income', 'mtr_inctax'])
+    results = list()
+    for csize in [None, chunk_size]:
+        outdir = tempfile.mkdtemp()
+        tcio = TaxCalcIO(input_data=idf, tax_year=2020, baseline=None,
+                         reform=reformfile1.name, assump=None, outdir=outdir)
+        assert not tcio.errmsg
+        tcio.init(input_data=idf, tax_year=2020, baseline=None,
+                  reform=reformfile1.name, assump=None,
+                  aging_input_data=False, exact_calculations=False,
+                  chunk_size=csize)
+        assert not tcio.errmsg
+        if csize is not None:
+            assert tcio.calc.array_len == min(chunk_size, nobs)
+            with pytest.raises(ValueError):
+                tcio.analyze(output_graphs=True)
+        tcio.analyze(writing_output_file=True, output_tables=True,
+                     dump_varset=dumpvars, output_dump=True,
+                     output_sqldb=True)
+        outfile = tcio.output_filepath()
+        output = pd.read_csv(outfile)
+        with open(outfile.replace('.csv', '-tab.text')) as tfile:
+            tables = tfile.read()
+        dbcon = sqlite3.connect(outfile.replace('.csv', '.db'))
+        dump = pd.read_sql('SELECT * FROM dump', dbcon)
+        dbcon.close()
+        results.append((output, tables, dump[sorted(dump.columns)]))
+        shutil.rmtree(outdir, ignore_errors=True)
+    assert len(results[1][0].index) == nobs
+    pd.testing.assert_frame_equal(results[1][0], results[0][0])
+    assert results[1][1] == results[0][1]
+    pd.testing.assert_frame_equal(results[1][2], results[0][2])
+
+
+def test_chunk_size_errors(reformfile1):
+    """
+    Test TaxCalcIO init method with invalid chunk_size values.
+    """
+    idf = pd.read_csv(StringIO(RAWINPUT))
+    for chunk_size in [0, 2.5]:
+        tcio = TaxCalcIO(input_data=idf, tax_year=2020, baseline=None,
+                         reform=reformfile1.name, assump=None)
+        tcio.init(input_data=idf, tax_year=2020, baseline=None,
+                  reform=reformfile1.name, assump=None,
+                  aging_input_data=False, exact_calculations=False,
+                  chunk_size=chunk_size)
+        assert tcio.errmsg
+
+
+def test_chunked_puf_subsample(reformfile1, monkeypatch, tmpdir):
+    """
+    Test that TaxCalcIO init method rejects a chunk_size for aged INPUT
+    that is a sub-sample of puf.csv, whose weights cannot be scaled up one
+    chunk at a time.
+    """
+    idf = pd.read_csv(StringIO(RAWINPUT))
+    input_path = str(tmpdir.join('puf.csv'))
+    idf.to_csv(input_path, index=False)
+    weights_path = str(tmpdir.join('puf_weights.csv'))
+    pd.DataFrame({'WT2011': np.full(len(idf.index) + 3, 100)}).to_csv(
+        weights_path, index=False
+    )
+    # an absolute file name is used as the weights path
+    monkeypatch.setattr(Records, 'PUF_WEIGHTS_FILENAME', weights_path)
+    tcio = TaxCalcIO(input_data=input_path, tax_year=2020, baseline=None,
+                     reform=reformfile1.name, assump=None,
+                     outdir=str(tmpdir))
+    assert not tcio.errmsg
+    tcio.init(input_data=input_path, tax_year=2020, baseline=None,
+              reform=reformfile1.name, assump=None,
+              aging_input_data=True, exact_calculations=False,
+              chunk_size=2)
+    assert 'sub-sample of puf.csv' in tcio.errmsg
+
+
+@pytest.mark.parametrize('output_format', ['parquet', 'feather', 'npz'])
+def test_output_formats(reformfile1, output_format):
+    """
+    Test that binary dump output contains the same values as CSV output,
+    which is deleted when the binary output TaxCalcIO object is created.
+    """
+    idf = pd.read_csv(StringIO(RAWINPUT))
+    packages = TaxCalcIO.OUTPUT_FORMATS[output_format]
+    if packages and not any(importlib.util.find_spec(pkg)
+                            for pkg in packages):
+        tcio = TaxCalcIO(input_data=idf, tax_year=2020, baseline=None,
+                         reform=reformfile1.name, assump=None,
+                         output_format=output_format)
+        assert tcio.errmsg
+        return
+    outdir = tempfile.mkdtemp()
+    outputs = dict()
+    for fmt in ['csv', output_format]:
+        tcio = TaxCalcIO(input_data=idf, tax_year=2020, baseline=None,
+                         reform=reformfile1.name, assump=None,
+                         outdir=outdir, output_format=fmt)
+        assert not tcio.errmsg
+        tcio.init(input_data=idf, tax_year=2020, baseline=None,
+                  reform=reformfile1.name, assump=None,
+                  aging_input_data=False, exact_calculations=False)
+        assert not tcio.errmsg
+        tcio.analyze(writing_output_file=True, output_dump=True)
+        fname = tcio.output_filepath().replace('.csv', '.' + fmt)
+        if fmt == 'csv':
+            outputs[fmt] = pd.read_csv(fname)
+        elif fmt == 'npz':
+            with np.load(fname) as npz:
+                outputs[fmt] = pd.DataFrame({var: npz[var]
+                                             for var in npz.files})
+        elif fmt == 'parquet':
+            outputs[fmt] = pd.read_parquet(fname)
+        else:
+            outputs[fmt] = pd.read_feather(fname)
+    expect = outputs['csv']
+    actual = outputs[output_format]
+    assert list(actual.columns) == list(expect.columns)
+    for var in expect.columns:
+        assert np.allclose(actual[var], expect[var], rtol=0., atol=1e-9)
+    # binary output cannot be appended in chunks
+    tcio = TaxCalcIO(input_data=idf, tax_year=2020, baseline=None,
+                     reform=reformfile1.name, assump=None,
+                     outdir=outdir, output_format='npz')
+    tcio.init(input_data=idf, tax_year=2020, baseline=None,
+              reform=reformfile1.name, assump=None,
+              aging_input_data=False, exact_calculations=False,
+              chunk_size=2)
+    assert tcio.errmsg
+    shutil.rmtree(outdir, ignore_errors=True)
+    tcio = TaxCalcIO(input_data=idf, tax_year=2020, baseline=None,
+                     reform=reformfile1.name, assump=None,
+                     output_format='xlsx')
+    assert tcio.errmsg
+
+
+def test_batch_analyze(reformfile0, reformfile1):
+    """
+    Test that the output files written for each reform analyzed by a
+    BatchRunner are the same as those written by the analyze method.
+    """
+    idf = _weighted_input(100)
+    reforms = [reformfile1.name,
+               '{}+{}'.format(reformfile0.name, reformfile1.name)]
+    expect = list()
+    for reform in reforms:
+        outdir = tempfile.mkdtemp()
+        tcio = TaxCalcIO(input_data=idf, tax_year=2020, baseline=None,
+                         reform=reform, assump=None, outdir=outdir)
+        tcio.init(input_data=idf, tax_year=2020, baseline=None,
+                  reform=reform, assump=None,
+                  aging_input_data=False, exact_calculations=False)
+        assert not tcio.errmsg
+        tcio.analyze(writing_output_file=True, output_tables=True)
+        expect.append(_output_files(tcio.output_filepath()))
+        shutil.rmtree(outdir, ignore_errors=True)
+    outdir = tempfile.mkdtemp()
+    tcios = [TaxCalcIO(input_data=idf, tax_year=2020, baseline=None,
+                       reform=reform, assump=None, outdir=outdir)
+             for reform in reforms]
+    runner = tcios[0].batch_runner(input_data=idf, tax_year=2020,
+                                   baseline=None, assump=None,
+                                   aging_input_data=False,
+                                   exact_calculations=False, num_workers=2)
+    assert not tcios[0].errmsg
+    outputs = runner.run(reforms)
+    for tcio, reform, output, files in zip(tcios, reforms, outputs, expect):
+        tcio.write_batch_files(runner, output, reform, None,
+                               output_tables=True)
+        assert _output_files(tcio.output_filepath()) == files
+    shutil.rmtree(outdir, ignore_errors=True)
+    # BatchRunner cannot analyze years after the last budget year
+    assert tcios[0].batch_runner(input_data=idf, tax_year=2100,
+                                 baseline=None, assump=None,
+                                 aging_input_data=False,
+                                 exact_calculations=False) is None
+    assert tcios[0].errmsg
+
+
+def test_analyze_async(reformfile1):
+    """
+    Test that analyze_async writes the same output files as analyze.
+    """
+    idf = _weighted_input(100)
+    results = list()
+    for use_async in [False, True]:
+        outdir = tempfile.mkdtemp()
+        tcio = TaxCalcIO(input_data=idf, tax_year=2020, baseline=None,
+                         reform=reformfile1.name, assump=None,
+                         outdir=outdir)
+        tcio.init(input_data=idf, tax_year=2020, baseline=None,
+                  reform=reformfile1.name, assump=None,
+                  aging_input_data=False, exact_calculations=False)
+        assert not tcio.errmsg
+        if use_async:
+            asyncio.run(tcio.analyze_async(writing_output_file=True,
+                                           output_tables=True))
+        else:
+            tcio.analyze(writing_output_file=True, output_tables=True)
+        results.append(_output_files(tcio.output_filepath()))
+        shutil.rmtree(outdir, ignore_errors=True)
+    assert results[1] == results[0]
+
+
+def test_tables_with_graphs(reformfile1):
+    """
+    Test that writing graphs, which are written concurrently with tables,
+    does not change the dump output and tables files.
+    """
+    idf = _weighted_input(100)
+    results = list()
+    for output_graphs in [False, True]:
+        outdir = tempfile.mkdtemp()
+        tcio = TaxCalcIO(input_data=idf, tax_year=2020, baseline=None,
+                         reform=reformfile1.name, assump=None,
+                         outdir=outdir)
+        tcio.init(input_data=idf, tax_year=2020, baseline=None,
+                  reform=reformfile1.name, assump=None,
+                  aging_input_data=False, exact_calculations=False)
+        assert not tcio.errmsg
+        tcio.analyze(writing_output_file=True, output_tables=True,
+                     output_graphs=output_graphs, output_dump=True)
+        results.append(_output_files(tcio.output_filepath()))
+        if output_graphs:
+            for suffix in ['-atr.html', '-mtr.html', '-pch.html']:
+                fname = tcio.output_filepath().replace('.csv', suffix)
+                assert os.path.isfile(fname)
+        shutil.rmtree(outdir, ignore_errors=True)
+    assert results[1] == results[0]
+
+
+def _output_files(outfile):
+    """
+    Return list containing contents of output, doc and tables files.
+    """
+    contents = list()
+    for fname in [outfile, outfile.replace('.csv', '-doc.text'),
+                  outfile.replace('.csv', '-tab.text')]:
+        with open(fname) as ofile:
+            contents.append(ofile.read())
+    return contents
@@ -0,0 +1,123 @@
+"""
+Tests for Tax-Calculator TaxCalcServer class used by tc --serve option.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle test_tcserver.py
+# pylint --disable=locally-disabled test_tcserver.py
+
+import os
+import json
+import shutil
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+import pytest
+# pylint: disable=import-error
+from taxcalc import TaxCalcIO
+from taxcalc.cli.tcserver import TaxCalcServer
+
+
+def _post(url, request):
+    """
+    Return status code and JSON content of response to POST request.
+    """
+    data = request if isinstance(request, bytes) else json.dumps(request)
+    if isinstance(data, str):
+        data = data.encode()
+    try:
+        with urllib.request.urlopen(url, data=data) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def _raise_runtime_error(request):
+    """
+    Replacement for the TaxCalcServer analyze method.
+    """
+    raise RuntimeError('unexpected {}'.format(request))
+
+
+def test_server(cps_subsample, tests_path, monkeypatch):
+    """
+    Test that TaxCalcServer responses contain the same output and tables
+    as the files written by TaxCalcIO for the same reform.
+    """
+    reform = os.path.join(tests_path, '..', 'reforms', '2017_law.json')
+    # write expected output and tables files
+    outdir = tempfile.mkdtemp()
+    tcio = TaxCalcIO(input_data=cps_subsample, tax_year=2020,
+                     baseline=None, reform=reform, assump=None,
+                     outdir=outdir)
+    tcio.init(input_data=cps_subsample, tax_year=2020, baseline=None,
+              reform=reform, assump=None,
+              aging_input_data=False, exact_calculations=False)
+    assert not tcio.errmsg
+    tcio.analyze(writing_output_file=True, output_tables=True)
+    expect = list()
+    for fname in [tcio.output_filepath(),
+                  tcio.output_filepath().replace('.csv', '-tab.text')]:
+        with open(fname) as efile:
+            expect.append(efile.read())
+    shutil.rmtree(outdir, ignore_errors=True)
+    # compare server responses with expected files
+    server = TaxCalcServer(('127.0.0.1', 0), input_data=cps_subsample,
+                           tax_year=2020, baseline=None,
+                           aging_input_data=False,
+                           exact_calculations=False, num_workers=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = 'http://{}:{}/'.format(*server.server_address)
+    try:
+        with urllib.request.urlopen(url) as response:
+            assert json.loads(response.read())['tax_year'] == 2020
+        request = {'reforms': [reform,
+                               {'policy': {'II_em': {'2020': 1000}}}],
+                   'tables': True}
+        status, content = _post(url, request)
+        assert status == 200
+        assert content['outputs'][0] == expect[0]
+        assert content['tables'][0] == expect[1]
+        assert content['outputs'][1] != expect[0]
+        assump = {'consumption': {}, 'growdiff_baseline': {},
+                  'growdiff_response': {}}
+        status, content = _post(url, {'reforms': [reform],
+                                      'assump': assump})
+        assert status == 200
+        assert content['outputs'] == [expect[0]]
+        assert 'tables' not in content
+        status, content = _post(url, {'reforms': []})
+        assert status == 200
+        assert content['outputs'] == list()
+        # invalid requests
+        for request in [b'{', [reform], {'reform': [reform]},
+                        {'reforms': reform}, {'reforms': [1]},
+                        {'reforms': [{'policy': {'II_em': {'2020': -1}}}]},
+                        {'reforms': [reform], 'assump': 1},
+                        {'reforms': [reform], 'assump': {'xxx': {}}},
+                        {'reforms': [{'policy': {'II_em': 5}}]},
+                        {'reforms': ['{"policy": 3}']},
+                        {'reforms': [reform + '+[1]']},
+                        {'reforms': [reform],
+                         'assump': {'consumption': 3}}]:
+            status, content = _post(url, request)
+            assert status == 400
+            assert content['error']
+        # unexpected errors get a response rather than a dropped connection
+        with monkeypatch.context() as mpatch:
+            mpatch.setattr(server, 'analyze', _raise_runtime_error)
+            status, content = _post(url, {'reforms': []})
+        assert status == 500
+        assert content['error']
+        status, content = _post(url, {'reforms': []})
+        assert status == 200
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+    # server cannot start with invalid arguments
+    with pytest.raises(ValueError):
+        TaxCalcServer(('127.0.0.1', 0), input_data=cps_subsample,
+                      tax_year=2020, baseline='no-exist.json',
+                      aging_input_data=False, exact_calculations=False)
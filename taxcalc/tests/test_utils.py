@@ -21,11 +21,13 @@ from taxcalc.utils import (DIST_VARIABLES,
                            DIFF_TABLE_COLUMNS, DIFF_TABLE_LABELS,
                            SOI_AGI_BINS,
                            create_difference_table,
-                           weighted_sum, weighted_mean,
+                           get_sums, weighted_sum, weighted_mean,
+                           table_row_sums,
                            wage_weighted, agi_weighted,
                            expanded_income_weighted,
                            add_income_table_row_variable,
                            add_quantile_table_row_variable,
+                           quantile_table_row, income_table_row,
                            mtr_graph_data, atr_graph_data,
                            xtr_graph_plot, write_graph_file,
                            read_egg_csv, read_egg_json, delete_file,
@@ -504,6 +506,32 @@ def test_weighted_sum():
     pd.testing.assert_series_equal(exp, diffs)
 
 
+def test_get_sums():
+    """
+    Test that column items are added in row order.
+    """
+    items = np.random.default_rng(2).normal(size=14) * 1e9
+    dfx = pd.DataFrame({'col': items, 'table_row': np.arange(14)})
+    sums = get_sums(dfx)
+    assert list(sums.index) == ['col']
+    expect = 0.
+    for item in items:
+        expect += item
+    assert sums['col'] == expect
+
+
+def test_table_row_sums():
+    dfx = pd.DataFrame(data=DATA, columns=['tax_diff', 's006', 'label'])
+    dfx['count'] = dfx['s006']
+    dfx['table_row'] = pd.Categorical(dfx['label'],
+                                      categories=['a', 'b', 'c'])
+    sums = table_row_sums(dfx, dfx['table_row'].cat.codes.values, 3,
+                          ['count'], ['tax_diff'])
+    exp = pd.DataFrame(data=[[12.0, 16.0], [10.0, 26.0], [0.0, 0.0]],
+                       columns=['count', 'tax_diff'])
+    pd.testing.assert_frame_equal(exp, sums)
+
+
 EPSILON = 1e-5
 
 
@@ -536,6 +564,38 @@ def test_add_quantile_trow_var():
                                               100, decile_details=True)
 
 
+def test_quantile_table_row():
+    income = np.array([5.0, -1.0, 3.0, 0.0, 2.0, 4.0, 1.0, 6.0, 8.0, 7.0])
+    weight = np.ones_like(income)
+    income_copy = income.copy()
+    trow = quantile_table_row(income, weight, 5)
+    assert np.array_equal(income, income_copy)
+    assert np.array_equal(trow, [3, 0, 2, 1, 2, 3, 1, 4, 4, 4])
+    dfx = pd.DataFrame({'expanded_income': income, 's006': weight})
+    dfx = add_quantile_table_row_variable(dfx, 'expanded_income', 5)
+    assert np.array_equal(dfx['expanded_income'], income)
+    assert np.array_equal(dfx['table_row'].astype(int), trow + 1)
+    trow = quantile_table_row(income, weight, 5, xtot=np.full(10, 4.0))
+    assert np.array_equal(trow, [3, 0, 2, 1, 2, 3, 1, 4, 4, 4])
+    with pytest.raises(ValueError):
+        quantile_table_row(income, weight, 5, decile_details=True)
+    # zero incomes of more than a decile of units make bins non-monotonic
+    income = np.array([0.0] * 3 + list(range(1, 11)))
+    with pytest.raises(ValueError):
+        quantile_table_row(income, np.ones_like(income), 10,
+                           decile_details=True)
+
+
+def test_income_table_row():
+    income = np.array([-5.0, 0.0, 1.0, 2.5, 3.0, 4.0])
+    trow = income_table_row(income, [0.0, 1.0, 3.0, 4.0])
+    assert np.array_equal(trow, [-1, 0, 1, 1, 2, -1])
+    with pytest.raises(ValueError):
+        income_table_row(income, [0.0, 3.0, 1.0, 4.0])
+    with pytest.raises(ValueError):
+        income_table_row(income, [0.0, 1.0, 1.0, 4.0])
+
+
 def test_dist_table_sum_row(cps_subsample):
     rec = Records.cps_constructor(data=cps_subsample)
     calc = Calculator(policy=Policy(), records=rec)
@@ -592,6 +652,15 @@ def test_diff_table_sum_row(cps_subsample):
                        dt3.loc['ALL'].values.astype('float'))
     # make sure population count is larger than filing-unit count
     assert dt4.at['ALL', 'count'] > dt1.at['ALL', 'count']
+    # make sure input DataFrames are unchanged
+    pd.testing.assert_frame_equal(dv1, calc1.dataframe(DIFF_VARIABLES))
+    pd.testing.assert_frame_equal(dv2, calc2.dataframe(DIFF_VARIABLES))
+    # make sure tax_cut and tax_inc counts agree with tax differences
+    tax_diff = dv2['iitax'] - dv1['iitax']
+    tax_cut = dv1['s006'][tax_diff < -0.001].sum() * 1e-6
+    tax_inc = dv1['s006'][tax_diff > 0.001].sum() * 1e-6
+    assert np.allclose(dt3.at['ALL', 'tax_cut'], tax_cut)
+    assert np.allclose(dt3.at['ALL', 'tax_inc'], tax_inc)
 
 
 def test_mtr_graph_data(cps_subsample):
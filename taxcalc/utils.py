@@ -10,7 +10,6 @@ PUBLIC low-level utility functions for Tax-Calculator.
 import os
 import math
 import json
-import copy
 import collections
 import pkg_resources
 import numpy as np
@@ -148,6 +147,149 @@ def weighted_sum(dframe, col_name):
     return (dframe[col_name] * dframe['s006']).sum()
 
 
+def table_row_sums(dframe, table_row, num_rows,
+                   unweighted_columns, weighted_columns):
+    """
+    Return Pandas DataFrame containing for each of the num_rows table rows
+    the unweighted sums of the unweighted_columns items and the
+    s006-weighted sums of the weighted_columns items of the Pandas
+    DataFrame (or dictionary of numpy arrays), dframe, whose rows are
+    assigned to table rows by the
+    table_row array of zero-based row indexes (such as an array returned
+    by the quantile_table_row or income_table_row function), where dframe
+    rows with a negative table_row value are not in the table and table
+    rows that contain no dframe rows have zero sums.  The returned
+    DataFrame has a default integer index and has the unweighted_columns
+    followed by the weighted_columns.
+    """
+    assert len(table_row) == len(dframe['s006'])
+    # order dframe rows by table row keeping their order within a table row,
+    # which excludes dframe rows not in the table
+    order = np.argsort(table_row, kind='stable')
+    bounds = np.searchsorted(table_row[order], np.arange(num_rows + 1))
+    order = order[bounds[0]:]
+    bounds -= bounds[0]
+    # build the weighted matrix once in column-major order so that each
+    # column sum is a contiguous (pairwise) numpy summation
+    columns = list(unweighted_columns) + list(weighted_columns)
+    matrix = np.empty((order.size, len(columns)), order='F')
+    weight = np.asarray(dframe['s006'])[order]
+    for idx, col in enumerate(columns):
+        matrix[:, idx] = np.asarray(dframe[col])[order]
+        if idx >= len(unweighted_columns):
+            matrix[:, idx] *= weight
+    sums = np.zeros((num_rows, matrix.shape[1]))
+    for row in range(num_rows):
+        sums[row] = matrix[bounds[row]:bounds[row + 1]].sum(axis=0)
+    return pd.DataFrame(sums, columns=columns)
+
+
+def quantile_table_row(income, weight, num_quantiles,
+                       xtot=None, decile_details=False,
+                       weight_by_income_measure=False, order=None):
+    """
+    Return integer array containing the zero-based quantile table row of
+    each filing unit whose income measure value is in the specified income
+    array and whose sample weight is in the specified weight array.
+    None of the function arguments are changed.
+
+    When weight_by_income_measure=False, the rows hold an equal number of
+    people if an xtot array containing the number of exemptions of each
+    filing unit is specified, or an equal number of filing units if xtot
+    is None.
+
+    When weight_by_income_measure=True, the rows hold an equal number
+    of income dollars.
+
+    When num_quantiles is 10 and decile_details is True,
+    the bottom decile is broken up into three subgroups
+    (neg, zero, and pos income) and the top decile is broken into three
+    subgroups (90-95, 95-99, and top 1%), so there are 14 table rows.
+
+    When order is not None, it must be the array of indexes that sort
+    the filing units by income (adjusted by the square root of xtot when
+    xtot is specified), which avoids sorting them again.
+    """
+    # pylint: disable=too-many-arguments,too-many-locals
+    income = np.asarray(income)
+    weight = np.asarray(weight)
+    if decile_details and num_quantiles != 10:
+        msg = 'decile_details is True when num_quantiles is {}'
+        raise ValueError(msg.format(num_quantiles))
+    if xtot is not None:
+        assert not weight_by_income_measure
+        xtot = np.asarray(xtot)
+    if order is None:
+        if xtot is not None:
+            # adjust income measure by square root of filing unit size
+            adj_income = np.divide(income,
+                                   np.sqrt(np.where(xtot == 0, 1, xtot)))
+        else:
+            adj_income = income
+        order = np.argsort(adj_income, kind='quicksort')
+    sorted_weight = weight[order]
+    if weight_by_income_measure:
+        cumsum = np.cumsum(np.multiply(income[order], sorted_weight))
+        min_cumsum = cumsum[0]
+    else:
+        if xtot is not None:
+            cumsum = np.cumsum(np.multiply(xtot[order], sorted_weight))
+        else:
+            cumsum = np.cumsum(sorted_weight)
+        min_cumsum = 0.  # because weight and xtot values are non-negative
+    max_cumsum = cumsum[-1]
+    cumsum_range = max_cumsum - min_cumsum
+    bin_width = cumsum_range / float(num_quantiles)
+    bin_edges = list(min_cumsum +
+                     np.arange(0, (num_quantiles + 1)) * bin_width)
+    bin_edges[-1] = 9e99  # raise top of last bin to include all observations
+    bin_edges[0] = -9e99  # lower bottom of 1st bin to include all observations
+    if decile_details:
+        assert bin_edges[1] > 1e-9  # bin_edges[1] is top of bottom decile
+        sorted_income = income[order]
+        neg_wght = sorted_weight[sorted_income <= -1e-9].sum()
+        zer_im = np.logical_and(sorted_income > -1e-9, sorted_income < 1e-9)
+        zer_wght = sorted_weight[zer_im].sum()
+        bin_edges.insert(1, neg_wght + zer_wght)  # top of zeros
+        bin_edges.insert(1, neg_wght)  # top of negatives
+        bin_edges.insert(-1, bin_edges[-2] + 0.5 * bin_width)  # top of 90-95
+        bin_edges.insert(-1, bin_edges[-2] + 0.4 * bin_width)  # top of 95-99
+    _check_bin_edges(bin_edges)
+    table_row = np.empty(income.size, dtype=np.int64)
+    table_row[order] = np.searchsorted(bin_edges, cumsum, side='right') - 1
+    return table_row
+
+
+def income_table_row(income, bin_edges):
+    """
+    Return integer array containing the zero-based table row of each
+    filing unit whose income measure value is in the specified income
+    array, where the rows are defined by the specified list of bin_edges
+    (and are LEFT INCLUSIVE as explained in the documentation of the
+    add_income_table_row_variable function).  Filing units whose income
+    is not in any row have a table row of -1.
+    Raises ValueError if bin_edges do not increase strictly monotonically.
+    """
+    _check_bin_edges(bin_edges)
+    income = np.asarray(income)
+    table_row = np.searchsorted(bin_edges, income, side='right') - 1
+    in_bins = np.logical_and(income >= bin_edges[0], income < bin_edges[-1])
+    return np.where(in_bins, table_row, -1)
+
+
+def _check_bin_edges(bin_edges):
+    """
+    Raise ValueError, with the same messages as the Pandas cut function,
+    if the specified bin_edges do not increase strictly monotonically,
+    because numpy searchsorted would silently misassign rows.
+    """
+    diffs = np.diff(np.asarray(bin_edges, dtype=np.float64))
+    if np.any(diffs < 0.):
+        raise ValueError('bins must increase monotonically.')
+    if np.any(diffs == 0.):
+        raise ValueError('Bin edges must be unique: {}'.format(bin_edges))
+
+
 def add_quantile_table_row_variable(dframe, income_measure, num_quantiles,
                                     pop_quantiles=False,
                                     decile_details=False,
@@ -172,64 +314,28 @@ def add_quantile_table_row_variable(dframe, income_measure, num_quantiles,
     (neg, zero, and pos income_measure)
     and the top decile is broken into three subgroups
     (90-95, 95-99, and top 1%).
+
+    The 'table_row' variable is categorical with labels starting at one
+    and is computed by the quantile_table_row function; the order of the
+    dframe rows is not changed.
     """
-    # pylint: disable=too-many-arguments,too-many-locals
+    # pylint: disable=too-many-arguments
     assert isinstance(dframe, pd.DataFrame)
     assert income_measure in dframe
     assert 's006' in dframe
-    if decile_details and num_quantiles != 10:
-        msg = 'decile_details is True when num_quantiles is {}'
-        raise ValueError(msg.format(num_quantiles))
     if pop_quantiles:
         assert not weight_by_income_measure
         assert 'XTOT' in dframe
-        # adjust income measure by square root of filing unit size
-        adj = np.sqrt(np.where(dframe['XTOT'] == 0, 1, dframe['XTOT']))
-        dframe['adj_income_measure'] = np.divide(dframe[income_measure], adj)
-    else:
-        dframe['adj_income_measure'] = dframe[income_measure]
-    dframe.sort_values(by='adj_income_measure', inplace=True)
-    if weight_by_income_measure:
-        dframe['cumsum_temp'] = np.cumsum(
-            np.multiply(dframe[income_measure].values, dframe['s006'].values)
-        )
-        min_cumsum = dframe['cumsum_temp'].values[0]
-    else:
-        if pop_quantiles:
-            dframe['cumsum_temp'] = np.cumsum(
-                np.multiply(dframe['XTOT'].values, dframe['s006'].values)
-            )
-        else:
-            dframe['cumsum_temp'] = np.cumsum(
-                dframe['s006'].values
-            )
-        min_cumsum = 0.  # because s006 and XTOT values are non-negative
-    max_cumsum = dframe['cumsum_temp'].values[-1]
-    cumsum_range = max_cumsum - min_cumsum
-    bin_width = cumsum_range / float(num_quantiles)
-    bin_edges = list(min_cumsum +
-                     np.arange(0, (num_quantiles + 1)) * bin_width)
-    bin_edges[-1] = 9e99  # raise top of last bin to include all observations
-    bin_edges[0] = -9e99  # lower bottom of 1st bin to include all observations
-    num_bins = num_quantiles
-    if decile_details:
-        assert bin_edges[1] > 1e-9  # bin_edges[1] is top of bottom decile
-        neg_im = np.less_equal(dframe[income_measure], -1e-9)
-        neg_wght = dframe['s006'][neg_im].sum()
-        zer_im = np.logical_and(
-            np.greater(dframe[income_measure], -1e-9),
-            np.less(dframe[income_measure], 1e-9)
-        )
-        zer_wght = dframe['s006'][zer_im].sum()
-        bin_edges.insert(1, neg_wght + zer_wght)  # top of zeros
-        bin_edges.insert(1, neg_wght)  # top of negatives
-        bin_edges.insert(-1, bin_edges[-2] + 0.5 * bin_width)  # top of 90-95
-        bin_edges.insert(-1, bin_edges[-2] + 0.4 * bin_width)  # top of 95-99
-        num_bins += 4
-    labels = range(1, (num_bins + 1))
-    dframe['table_row'] = pd.cut(dframe['cumsum_temp'], bin_edges,
-                                 right=False, labels=labels)
-    dframe.drop('cumsum_temp', axis=1, inplace=True)
+    table_row = quantile_table_row(
+        dframe[income_measure].values, dframe['s006'].values, num_quantiles,
+        xtot=dframe['XTOT'].values if pop_quantiles else None,
+        decile_details=decile_details,
+        weight_by_income_measure=weight_by_income_measure
+    )
+    num_bins = num_quantiles + (4 if decile_details else 0)
+    dframe['table_row'] = pd.Categorical.from_codes(
+        table_row, categories=range(1, (num_bins + 1)), ordered=True
+    )
     return dframe
 
 
@@ -267,6 +373,9 @@ def add_income_table_row_variable(dframe, income_measure, bin_edges):
 def get_sums(dframe):
     """
     Compute unweighted sum of items in each column of Pandas DataFrame, dframe.
+    The float64 items are added in row order by numpy cumsum (rather than
+    by the pairwise summation of numpy sum) so that the sums of table rows
+    are the same whatever the dtype of the table columns.
 
     Returns
     -------
@@ -275,12 +384,14 @@ def get_sums(dframe):
     sums = dict()
     for col in dframe.columns.values.tolist():
         if col != 'table_row':
-            sums[col] = dframe[col].sum()
+            items = dframe[col].to_numpy(dtype=np.float64)
+            sums[col] = np.cumsum(items)[-1] if items.size > 0 else 0.
     return pd.Series(sums, name='ALL')
 
 
 def create_distribution_table(vdf, groupby, income_measure,
-                              pop_quantiles=False, scaling=True):
+                              pop_quantiles=False, scaling=True,
+                              table_row=None):
     """
     Get results from vdf, sort them by expanded_income based on groupby,
     and return them as a table.
@@ -307,6 +418,11 @@ def create_distribution_table(vdf, groupby, income_measure,
     scaling : boolean
         specifies whether or not table entry values are scaled
 
+    table_row : numpy array or None
+        zero-based groupby table row of each vdf row, such as an array
+        returned by the GroupingIndex table_row method; if None, the
+        table rows are computed from vdf
+
     Returns
     -------
     distribution table as a Pandas DataFrame with DIST_TABLE_COLUMNS and
@@ -322,22 +438,20 @@ def create_distribution_table(vdf, groupby, income_measure,
           positive (denoted by a 0-10p row label) values of the
           specified income_measure.
     """
-    # pylint: disable=too-many-statements,too-many-branches
+    # pylint: disable=too-many-statements,too-many-branches,too-many-arguments
     # nested function that returns calculated column statistics as a DataFrame
-    def stat_dataframe(gdf):
+    def stat_dataframe(dframe, table_row, num_rows):
         """
         Returns calculated distribution table column statistics derived from
-        the specified grouped Dataframe object, gdf.
+        the specified Dataframe object, dframe, and table_row array.
         """
         unweighted_columns = ['count', 'count_StandardDed',
                               'count_ItemDed', 'count_AMT']
-        sdf = pd.DataFrame()
-        for col in DIST_TABLE_COLUMNS:
-            if col in unweighted_columns:
-                sdf[col] = gdf.apply(unweighted_sum, col).values[:, 1]
-            else:
-                sdf[col] = gdf.apply(weighted_sum, col).values[:, 1]
-        return sdf
+        weighted_columns = [col for col in DIST_TABLE_COLUMNS
+                            if col not in unweighted_columns]
+        sdf = table_row_sums(dframe, table_row, num_rows,
+                             unweighted_columns, weighted_columns)
+        return sdf[DIST_TABLE_COLUMNS]
     # main logic of create_distribution_table
     assert isinstance(vdf, pd.DataFrame)
     assert groupby in ('weighted_deciles',
@@ -348,21 +462,45 @@ def create_distribution_table(vdf, groupby, income_measure,
     assert 'table_row' not in vdf
     if pop_quantiles:
         assert groupby == 'weighted_deciles'
-    # sort the data given specified groupby and income_measure
+    # assign rows to table rows given specified groupby and income_measure
     if groupby == 'weighted_deciles':
-        dframe = add_quantile_table_row_variable(vdf, income_measure, 10,
-                                                 pop_quantiles=pop_quantiles,
-                                                 decile_details=True)
+        if table_row is None:
+            table_row = quantile_table_row(
+                vdf[income_measure].values, vdf['s006'].values, 10,
+                xtot=vdf['XTOT'].values if pop_quantiles else None,
+                decile_details=True
+            )
+        num_rows = 14
     elif groupby == 'standard_income_bins':
-        dframe = add_income_table_row_variable(vdf, income_measure,
-                                               STANDARD_INCOME_BINS)
+        if table_row is None:
+            table_row = income_table_row(vdf[income_measure].values,
+                                         STANDARD_INCOME_BINS)
+        num_rows = len(STANDARD_INCOME_BINS) - 1
     elif groupby == 'soi_agi_bins':
-        dframe = add_income_table_row_variable(vdf, income_measure,
-                                               SOI_AGI_BINS)
-    # construct grouped DataFrame
-    gdf = dframe.groupby('table_row', as_index=False)
-    dist_table = stat_dataframe(gdf)
-    del dframe['table_row']
+        if table_row is None:
+            table_row = income_table_row(vdf[income_measure].values,
+                                         SOI_AGI_BINS)
+        num_rows = len(SOI_AGI_BINS) - 1
+    # construct table of row statistics
+    dist_table = stat_dataframe(vdf, table_row, num_rows)
+    del table_row
+    return distribution_table_from_sums(dist_table, groupby, scaling)
+
+
+def distribution_table_from_sums(dist_table, groupby, scaling=True):
+    """
+    Return distribution table constructed from the specified Pandas
+    DataFrame, dist_table, which contains the DIST_TABLE_COLUMNS sums for
+    each of the groupby table rows (as computed by the table_row_sums
+    function), by adding the sum row (and for weighted_deciles the
+    top-decile row), adding row names and scaling the table entries.
+    This function is used by the create_distribution_table function
+    and by the TableAccumulator class; see the create_distribution_table
+    function documentation for a description of the returned table.
+    """
+    assert groupby in ('weighted_deciles',
+                       'standard_income_bins',
+                       'soi_agi_bins')
     # compute sum row
     sum_row = get_sums(dist_table)[dist_table.columns]
     # handle placement of sum_row in table
@@ -395,9 +533,6 @@ def create_distribution_table(vdf, groupby, income_measure,
         assert len(dist_table.index) == len(rownames)
         dist_table.index = rownames
         del rownames
-    # delete intermediate Pandas DataFrame objects
-    del gdf
-    del dframe
     # scale table elements
     if scaling:
         count_vars = ['count',
@@ -416,12 +551,11 @@ def create_distribution_table(vdf, groupby, income_measure,
                 dist_table[col] *= 1e-9
                 dist_table.round({col: 3})
     # return table as Pandas DataFrame
-    vdf.sort_index(inplace=True)
     return dist_table
 
 
 def create_difference_table(vdf1, vdf2, groupby, tax_to_diff,
-                            pop_quantiles=False):
+                            pop_quantiles=False, table_row=None):
     """
     Get results from two different vdf, construct tax difference results,
     and return the difference statistics as a table.
@@ -449,6 +583,11 @@ def create_difference_table(vdf1, vdf2, groupby, tax_to_diff,
         specifies whether or not weighted_deciles contain an equal number
         of people (True) or an equal number of filing units (False)
 
+    table_row : numpy array or None
+        zero-based groupby table row of each vdf1 row, such as an array
+        returned by the GroupingIndex table_row method; if None, the
+        table rows are computed from the vdf1 expanded_income
+
     Returns
     -------
     difference table as a Pandas DataFrame with DIFF_TABLE_COLUMNS and
@@ -465,39 +604,7 @@ def create_difference_table(vdf1, vdf2, groupby, tax_to_diff,
           specified income_measure.
     """
     # pylint: disable=too-many-statements,too-many-locals,too-many-branches
-    # nested function that creates dataframe containing additive statistics
-    def additive_stats_dataframe(gdf):
-        """
-        Nested function that returns additive stats DataFrame derived from gdf
-        """
-        def count_lt_zero(dframe, col_name, tolerance=-0.001):
-            """
-            Return count sum of negative Pandas DataFrame col_name items.
-            """
-            return dframe[dframe[col_name] < tolerance]['count'].sum()
-
-        def count_gt_zero(dframe, col_name, tolerance=0.001):
-            """
-            Return count sum of positive Pandas DataFrame col_name items.
-            """
-            return dframe[dframe[col_name] > tolerance]['count'].sum()
-        # start of additive_stats_dataframe code
-        sdf = pd.DataFrame()
-        sdf['count'] = gdf.apply(unweighted_sum, 'count').values[:, 1]
-        sdf['tax_cut'] = gdf.apply(count_lt_zero,
-                                   'tax_diff').values[:, 1]
-        sdf['tax_inc'] = gdf.apply(count_gt_zero,
-                                   'tax_diff').values[:, 1]
-        sdf['tot_change'] = gdf.apply(weighted_sum,
-                                      'tax_diff').values[:, 1]
-        sdf['ubi'] = gdf.apply(weighted_sum, 'ubi').values[:, 1]
-        sdf['benefit_cost_total'] = gdf.apply(
-            weighted_sum, 'benefit_cost_total').values[:, 1]
-        sdf['benefit_value_total'] = gdf.apply(
-            weighted_sum, 'benefit_value_total').values[:, 1]
-        sdf['atinc1'] = gdf.apply(weighted_sum, 'atinc1').values[:, 1]
-        sdf['atinc2'] = gdf.apply(weighted_sum, 'atinc2').values[:, 1]
-        return sdf
+    # pylint: disable=too-many-arguments
     # main logic of create_difference_table
     assert groupby in ('weighted_deciles',
                        'standard_income_bins',
@@ -512,37 +619,53 @@ def create_difference_table(vdf1, vdf2, groupby, tax_to_diff,
     assert isinstance(vdf2, pd.DataFrame)
     assert np.allclose(vdf1['XTOT'], vdf2['XTOT'])  # check rows are the same
     assert np.allclose(vdf1['s006'], vdf2['s006'])  # units and in same order
-    baseline_expanded_income = 'expanded_income_baseline'
-    df2 = copy.deepcopy(vdf2)
-    df2[baseline_expanded_income] = vdf1['expanded_income']
-    df2['tax_diff'] = df2[tax_to_diff] - vdf1[tax_to_diff]
-    for col in ['ubi', 'benefit_cost_total', 'benefit_value_total']:
-        df2[col] = df2[col] - vdf1[col]
-    df2['atinc1'] = vdf1['aftertax_income']
-    df2['atinc2'] = vdf2['aftertax_income']
-    # specify count variable in df2
+    # construct arrays whose (weighted) sums are the additive statistics
+    weight = vdf2['s006'].values
     if pop_quantiles:
-        df2['count'] = np.multiply(df2['s006'], df2['XTOT'])
-
+        count = np.multiply(weight, vdf2['XTOT'].values)
     else:
-        df2['count'] = df2['s006']
-    # add table_row column to df2 given specified groupby and income_measure
+        count = weight
+    tax_diff = vdf2[tax_to_diff].values - vdf1[tax_to_diff].values
+    sdf = pd.DataFrame({
+        's006': weight,
+        'count': count,
+        'tax_cut': np.where(tax_diff < -0.001, count, 0.),
+        'tax_inc': np.where(tax_diff > 0.001, count, 0.),
+        'tot_change': tax_diff,
+        'atinc1': vdf1['aftertax_income'].values,
+        'atinc2': vdf2['aftertax_income'].values
+    })
+    for col in ['ubi', 'benefit_cost_total', 'benefit_value_total']:
+        sdf[col] = vdf2[col].values - vdf1[col].values
+    del tax_diff
+    # assign rows to table rows given specified groupby and baseline income
+    baseline_income = vdf1['expanded_income'].values
     if groupby == 'weighted_deciles':
-        dframe = add_quantile_table_row_variable(
-            df2, baseline_expanded_income, 10,
-            pop_quantiles=pop_quantiles, decile_details=True)
+        if table_row is None:
+            table_row = quantile_table_row(
+                baseline_income, weight, 10,
+                xtot=vdf2['XTOT'].values if pop_quantiles else None,
+                decile_details=True
+            )
+        num_rows = 14
     elif groupby == 'standard_income_bins':
-        dframe = add_income_table_row_variable(
-            df2, baseline_expanded_income, STANDARD_INCOME_BINS)
+        if table_row is None:
+            table_row = income_table_row(baseline_income,
+                                         STANDARD_INCOME_BINS)
+        num_rows = len(STANDARD_INCOME_BINS) - 1
     elif groupby == 'soi_agi_bins':
-        dframe = add_income_table_row_variable(
-            df2, baseline_expanded_income, SOI_AGI_BINS)
-    del df2
-    # create grouped Pandas DataFrame
-    gdf = dframe.groupby('table_row', as_index=False)
-    del dframe['table_row']
-    # create additive difference table statistics from gdf
-    diff_table = additive_stats_dataframe(gdf)
+        if table_row is None:
+            table_row = income_table_row(baseline_income, SOI_AGI_BINS)
+        num_rows = len(SOI_AGI_BINS) - 1
+    # create additive difference table statistics in one pass
+    diff_table = table_row_sums(
+        sdf, table_row, num_rows,
+        ['count', 'tax_cut', 'tax_inc'],
+        ['tot_change', 'ubi', 'benefit_cost_total', 'benefit_value_total',
+         'atinc1', 'atinc2']
+    )
+    del sdf
+    del table_row
     # calculate additive statistics on sums row
     sum_row = get_sums(diff_table)[diff_table.columns]
     # handle placement of sum_row in table
@@ -561,9 +684,6 @@ def create_difference_table(vdf1, vdf2, groupby, tax_to_diff,
         del topdec_row
     else:
         diff_table = diff_table.append(sum_row)
-    # delete intermediate Pandas DataFrame objects
-    del gdf
-    del dframe
     # compute non-additive stats in each table cell
     count = diff_table['count'].values
     diff_table['perc_cut'] = np.divide(
@@ -639,119 +759,124 @@ def create_diagnostic_table(dframe_list, year_list):
     -------
     Pandas DataFrame object containing the diagnostic table
     """
-    # pylint: disable=too-many-statements
-    def diagnostic_table_odict(vdf):
-        """
-        Nested function that extracts diagnostic table dictionary from
-        the specified Pandas DataFrame object, vdf.
-
-        Parameters
-        ----------
-        vdf : Pandas DataFrame object containing the variables
-
-        Returns
-        -------
-        ordered dictionary of variable names and aggregate weighted values
-        """
-        # aggregate weighted values expressed in millions or billions
-        in_millions = 1.0e-6
-        in_billions = 1.0e-9
-        odict = collections.OrderedDict()
-        # total number of filing units
-        wghts = vdf['s006']
-        odict['Returns (#m)'] = round(wghts.sum() * in_millions, 2)
-        # adjusted gross income
-        agi = vdf['c00100']
-        odict['AGI ($b)'] = round((agi * wghts).sum() * in_billions, 3)
-        # number of itemizers
-        val = (wghts[vdf['c04470'] > 0.].sum())
-        odict['Itemizers (#m)'] = round(val * in_millions, 2)
-        # itemized deduction
-        ided1 = vdf['c04470'] * wghts
-        val = ided1[vdf['c04470'] > 0.].sum()
-        odict['Itemized Deduction ($b)'] = round(val * in_billions, 3)
-        # number of standard deductions
-        val = wghts[vdf['standard'] > 0.].sum()
-        odict['Standard Deduction Filers (#m)'] = round(val * in_millions, 2)
-        # standard deduction
-        sded1 = vdf['standard'] * wghts
-        val = sded1[vdf['standard'] > 0.].sum()
-        odict['Standard Deduction ($b)'] = round(val * in_billions, 3)
-        # personal exemption
-        val = (vdf['c04600'] * wghts).sum()
-        odict['Personal Exemption ($b)'] = round(val * in_billions, 3)
-        # taxable income
-        val = (vdf['c04800'] * wghts).sum()
-        odict['Taxable Income ($b)'] = round(val * in_billions, 3)
-        # regular tax liability
-        val = (vdf['taxbc'] * wghts).sum()
-        odict['Regular Tax ($b)'] = round(val * in_billions, 3)
-        # AMT taxable income
-        val = (vdf['c62100'] * wghts).sum()
-        odict['AMT Income ($b)'] = round(val * in_billions, 3)
-        # total AMT liability
-        val = (vdf['c09600'] * wghts).sum()
-        odict['AMT Liability ($b)'] = round(val * in_billions, 3)
-        # number of people paying AMT
-        val = wghts[vdf['c09600'] > 0.].sum()
-        odict['AMT Filers (#m)'] = round(val * in_millions, 2)
-        # tax before credits
-        val = (vdf['c05800'] * wghts).sum()
-        odict['Tax before Credits ($b)'] = round(val * in_billions, 3)
-        # refundable credits
-        val = (vdf['refund'] * wghts).sum()
-        odict['Refundable Credits ($b)'] = round(val * in_billions, 3)
-        # nonrefundable credits
-        val = (vdf['c07100'] * wghts).sum()
-        odict['Nonrefundable Credits ($b)'] = round(val * in_billions, 3)
-        # reform surtaxes (part of federal individual income tax liability)
-        val = (vdf['surtax'] * wghts).sum()
-        odict['Reform Surtaxes ($b)'] = round(val * in_billions, 3)
-        # other taxes on Form 1040
-        val = (vdf['othertaxes'] * wghts).sum()
-        odict['Other Taxes ($b)'] = round(val * in_billions, 3)
-        # federal individual income tax liability
-        val = (vdf['iitax'] * wghts).sum()
-        odict['Ind Income Tax ($b)'] = round(val * in_billions, 3)
-        # OASDI+HI payroll tax liability (including employer share)
-        val = (vdf['payrolltax'] * wghts).sum()
-        odict['Payroll Taxes ($b)'] = round(val * in_billions, 3)
-        # combined income and payroll tax liability
-        val = (vdf['combined'] * wghts).sum()
-        odict['Combined Liability ($b)'] = round(val * in_billions, 3)
-        # number of tax units with non-positive income tax liability
-        val = (wghts[vdf['iitax'] <= 0]).sum()
-        odict['With Income Tax <= 0 (#m)'] = round(val * in_millions, 2)
-        # number of tax units with non-positive combined tax liability
-        val = (wghts[vdf['combined'] <= 0]).sum()
-        odict['With Combined Tax <= 0 (#m)'] = round(val * in_millions, 2)
-        # UBI benefits
-        val = (vdf['ubi'] * wghts).sum()
-        odict['UBI Benefits ($b)'] = round(val * in_billions, 3)
-        # Total consumption value of benefits
-        val = (vdf['benefit_value_total'] * wghts).sum()
-        odict['Total Benefits, Consumption Value ($b)'] = round(
-            val * in_billions, 3)
-        # Total dollar cost of benefits
-        val = (vdf['benefit_cost_total'] * wghts).sum()
-        odict['Total Benefits Cost ($b)'] = round(val * in_billions, 3)
-        return odict
     # check function arguments
     assert isinstance(dframe_list, list)
     assert dframe_list
+    assert isinstance(dframe_list[0], pd.DataFrame)
+    # construct diagnostic table
+    sums_list = [diagnostic_table_sums(vardf) for vardf in dframe_list]
+    return diagnostic_table_from_sums(sums_list, year_list)
+
+
+def diagnostic_table_sums(vdf):
+    """
+    Return ordered dictionary of diagnostic table row labels and unscaled
+    aggregate weighted values computed from the DIST_VARIABLES in vdf,
+    which is a Pandas DataFrame or a dictionary of numpy arrays.  The
+    values for several groups of filing units can be added together
+    before the diagnostic_table_from_sums function scales them.
+    """
+    # pylint: disable=too-many-statements
+    odict = collections.OrderedDict()
+    # total number of filing units
+    wghts = np.asarray(vdf['s006'])
+    odict['Returns (#m)'] = wghts.sum()
+    # adjusted gross income
+    agi = np.asarray(vdf['c00100'])
+    odict['AGI ($b)'] = (agi * wghts).sum()
+    # number of itemizers
+    ided = np.asarray(vdf['c04470'])
+    odict['Itemizers (#m)'] = wghts[ided > 0.].sum()
+    # itemized deduction
+    ided1 = ided * wghts
+    odict['Itemized Deduction ($b)'] = ided1[ided > 0.].sum()
+    # number of standard deductions
+    sded = np.asarray(vdf['standard'])
+    odict['Standard Deduction Filers (#m)'] = wghts[sded > 0.].sum()
+    # standard deduction
+    sded1 = sded * wghts
+    odict['Standard Deduction ($b)'] = sded1[sded > 0.].sum()
+    # personal exemption
+    odict['Personal Exemption ($b)'] = (np.asarray(vdf['c04600']) *
+                                        wghts).sum()
+    # taxable income
+    odict['Taxable Income ($b)'] = (np.asarray(vdf['c04800']) * wghts).sum()
+    # regular tax liability
+    odict['Regular Tax ($b)'] = (np.asarray(vdf['taxbc']) * wghts).sum()
+    # AMT taxable income
+    odict['AMT Income ($b)'] = (np.asarray(vdf['c62100']) * wghts).sum()
+    # total AMT liability
+    amt = np.asarray(vdf['c09600'])
+    odict['AMT Liability ($b)'] = (amt * wghts).sum()
+    # number of people paying AMT
+    odict['AMT Filers (#m)'] = wghts[amt > 0.].sum()
+    # tax before credits
+    odict['Tax before Credits ($b)'] = (np.asarray(vdf['c05800']) *
+                                        wghts).sum()
+    # refundable credits
+    odict['Refundable Credits ($b)'] = (np.asarray(vdf['refund']) *
+                                        wghts).sum()
+    # nonrefundable credits
+    odict['Nonrefundable Credits ($b)'] = (np.asarray(vdf['c07100']) *
+                                           wghts).sum()
+    # reform surtaxes (part of federal individual income tax liability)
+    odict['Reform Surtaxes ($b)'] = (np.asarray(vdf['surtax']) *
+                                     wghts).sum()
+    # other taxes on Form 1040
+    odict['Other Taxes ($b)'] = (np.asarray(vdf['othertaxes']) *
+                                 wghts).sum()
+    # federal individual income tax liability
+    iitax = np.asarray(vdf['iitax'])
+    odict['Ind Income Tax ($b)'] = (iitax * wghts).sum()
+    # OASDI+HI payroll tax liability (including employer share)
+    odict['Payroll Taxes ($b)'] = (np.asarray(vdf['payrolltax']) *
+                                   wghts).sum()
+    # combined income and payroll tax liability
+    combined = np.asarray(vdf['combined'])
+    odict['Combined Liability ($b)'] = (combined * wghts).sum()
+    # number of tax units with non-positive income tax liability
+    odict['With Income Tax <= 0 (#m)'] = wghts[iitax <= 0].sum()
+    # number of tax units with non-positive combined tax liability
+    odict['With Combined Tax <= 0 (#m)'] = wghts[combined <= 0].sum()
+    # UBI benefits
+    odict['UBI Benefits ($b)'] = (np.asarray(vdf['ubi']) * wghts).sum()
+    # Total consumption value of benefits
+    odict['Total Benefits, Consumption Value ($b)'] = (
+        np.asarray(vdf['benefit_value_total']) * wghts).sum()
+    # Total dollar cost of benefits
+    odict['Total Benefits Cost ($b)'] = (
+        np.asarray(vdf['benefit_cost_total']) * wghts).sum()
+    return odict
+
+
+def diagnostic_table_from_sums(sums_list, year_list):
+    """
+    Return diagnostic table as a Pandas DataFrame object constructed from
+    the list of ordered dictionaries returned by the diagnostic_table_sums
+    function for each year in the specified list of years, where the
+    counts are expressed in millions and the amounts in billions of dollars.
+    """
+    # check function arguments
+    assert isinstance(sums_list, list)
+    assert sums_list
     assert isinstance(year_list, list)
     assert year_list
-    assert len(dframe_list) == len(year_list)
+    assert len(sums_list) == len(year_list)
     assert isinstance(year_list[0], int)
-    assert isinstance(dframe_list[0], pd.DataFrame)
     # construct diagnostic table
+    in_millions = 1.0e-6
+    in_billions = 1.0e-9
     tlist = list()
-    for year, vardf in zip(year_list, dframe_list):
-        odict = diagnostic_table_odict(vardf)
+    for year, sums in zip(year_list, sums_list):
+        odict = collections.OrderedDict()
+        for label, val in sums.items():
+            if label.endswith('(#m)'):
+                odict[label] = round(val * in_millions, 2)
+            else:
+                odict[label] = round(val * in_billions, 3)
         ddf = pd.DataFrame(data=odict, index=[year], columns=odict.keys())
         ddf = ddf.transpose()
         tlist.append(ddf)
-    del odict
     return pd.concat(tlist, axis=1)
 
 
@@ -763,7 +888,8 @@ def mtr_graph_data(vdf, year,
                    mtr_wrt_full_compen=False,
                    income_measure='expanded_income',
                    pop_quantiles=False,
-                   dollar_weighting=False):
+                   dollar_weighting=False,
+                   table_row=None):
     """
     Prepare marginal tax rate data needed by xtr_graph_plot utility function.
 
@@ -834,6 +960,11 @@ def mtr_graph_data(vdf, year,
         Specifying True produces a graph x axis that shows income_measure
         (not filing unit) percentiles.
 
+    table_row : numpy array or None
+        zero-based income percentile of each vdf row, such as an array
+        returned by the GroupingIndex table_row method; if None, the
+        percentiles are computed from vdf
+
     Returns
     -------
     dictionary object suitable for passing to xtr_graph_plot utility function
@@ -894,17 +1025,18 @@ def mtr_graph_data(vdf, year,
     # . . check pop_quantiles and dollar_weighting
     if pop_quantiles:
         assert not dollar_weighting
-    # create 'table_row' column given specified income_var and dollar_weighting
-    dfx = add_quantile_table_row_variable(
-        vdf, income_var, 100,
-        pop_quantiles=pop_quantiles,
-        weight_by_income_measure=dollar_weighting
-    )
-    # split dfx into groups specified by 'table_row' column
-    gdfx = dfx.groupby('table_row', as_index=False)
+    # assign vdf rows to percentiles given income_var and dollar_weighting
+    if table_row is None:
+        table_row = quantile_table_row(
+            vdf[income_var].values, vdf['s006'].values, 100,
+            xtot=vdf['XTOT'].values if pop_quantiles else None,
+            weight_by_income_measure=dollar_weighting
+        )
+    # split vdf into percentile groups
+    gdfx = vdf.groupby(pd.Categorical.from_codes(table_row, range(100)))
     # apply the weighting_function to percentile-grouped mtr values
-    mtr1_series = gdfx.apply(weighting_function, 'mtr1').values[:, 1]
-    mtr2_series = gdfx.apply(weighting_function, 'mtr2').values[:, 1]
+    mtr1_series = gdfx.apply(weighting_function, 'mtr1').values
+    mtr2_series = gdfx.apply(weighting_function, 'mtr2').values
     # construct DataFrame containing the two mtr?_series
     lines = pd.DataFrame()
     lines['base'] = mtr1_series
@@ -937,7 +1069,8 @@ def mtr_graph_data(vdf, year,
 def atr_graph_data(vdf, year,
                    mars='ALL',
                    atr_measure='combined',
-                   pop_quantiles=False):
+                   pop_quantiles=False,
+                   table_row=None):
     """
     Prepare average tax rate data needed by xtr_graph_plot utility function.
 
@@ -975,6 +1108,11 @@ def atr_graph_data(vdf, year,
         specifies whether or not quantiles contain an equal number
         of people (True) or an equal number of filing units (False)
 
+    table_row : numpy array or None
+        zero-based income percentile of each vdf row, such as an array
+        returned by the GroupingIndex table_row method; if None, the
+        percentiles are computed from vdf
+
     Returns
     -------
     dictionary object suitable for passing to xtr_graph_plot utility function
@@ -1011,18 +1149,21 @@ def atr_graph_data(vdf, year,
     nonpos = np.array(vdf['expanded_income'] <= 0, dtype=bool)
     nonpos_frac = weights[nonpos].sum() / weights.sum()
     num_bins_with_nonpos = int(math.ceil(100 * nonpos_frac))
-    # create 'table_row' column
-    dfx = add_quantile_table_row_variable(vdf, 'expanded_income', 100,
-                                          pop_quantiles=pop_quantiles)
-    # specify which 'table_row' are included
+    # assign vdf rows to percentiles
+    if table_row is None:
+        table_row = quantile_table_row(
+            vdf['expanded_income'].values, vdf['s006'].values, 100,
+            xtot=vdf['XTOT'].values if pop_quantiles else None
+        )
+    # specify which percentiles are included
     include = [0] * num_bins_with_nonpos + [1] * (100 - num_bins_with_nonpos)
     included = np.array(include, dtype=bool)
-    # split dfx into groups specified by 'table_row' column
-    gdfx = dfx.groupby('table_row', as_index=False)
+    # split vdf into percentile groups
+    gdfx = vdf.groupby(pd.Categorical.from_codes(table_row, range(100)))
     # apply weighted_mean function to percentile-grouped values
-    avginc_series = gdfx.apply(weighted_mean, 'expanded_income').values[:, 1]
-    avgtax1_series = gdfx.apply(weighted_mean, 'tax1').values[:, 1]
-    avgtax2_series = gdfx.apply(weighted_mean, 'tax2').values[:, 1]
+    avginc_series = gdfx.apply(weighted_mean, 'expanded_income').values
+    avgtax1_series = gdfx.apply(weighted_mean, 'tax1').values
+    avgtax2_series = gdfx.apply(weighted_mean, 'tax2').values
     # compute average tax rates for each included income percentile
     atr1_series = np.zeros(avginc_series.shape)
     atr1_series[included] = np.divide(
@@ -1156,7 +1297,7 @@ def xtr_graph_plot(data,
     return fig
 
 
-def pch_graph_data(vdf, year, pop_quantiles=False):
+def pch_graph_data(vdf, year, pop_quantiles=False, table_row=None):
     """
     Prepare percentage change in after-tax expanded income data needed by
     pch_graph_plot utility function.
@@ -1173,6 +1314,11 @@ def pch_graph_data(vdf, year, pop_quantiles=False):
         specifies whether or not quantiles contain an equal number
         of people (True) or an equal number of filing units (False)
 
+    table_row : numpy array or None
+        zero-based income percentile of each vdf row, such as an array
+        returned by the GroupingIndex table_row method; if None, the
+        percentiles are computed from vdf
+
     Returns
     -------
     dictionary object suitable for passing to pch_graph_plot utility function
@@ -1185,17 +1331,20 @@ def pch_graph_data(vdf, year, pop_quantiles=False):
     nonpos = np.array(vdf['expanded_income'] <= 0, dtype=bool)
     nonpos_frac = weights[nonpos].sum() / weights.sum()
     num_bins_with_nonpos = int(math.ceil(100 * nonpos_frac))
-    # create 'table_row' column
-    dfx = add_quantile_table_row_variable(vdf, 'expanded_income', 100,
-                                          pop_quantiles=pop_quantiles)
-    # specify which 'table_row' are included
+    # assign vdf rows to percentiles
+    if table_row is None:
+        table_row = quantile_table_row(
+            vdf['expanded_income'].values, vdf['s006'].values, 100,
+            xtot=vdf['XTOT'].values if pop_quantiles else None
+        )
+    # specify which percentiles are included
     include = [0] * num_bins_with_nonpos + [1] * (100 - num_bins_with_nonpos)
     included = np.array(include, dtype=bool)
-    # split dfx into groups specified by 'table_row' column
-    gdfx = dfx.groupby('table_row', as_index=False)
+    # split vdf into percentile groups
+    gdfx = vdf.groupby(pd.Categorical.from_codes(table_row, range(100)))
     # apply weighted_mean function to percentile-grouped values
-    avginc_series = gdfx.apply(weighted_mean, 'expanded_income').values[:, 1]
-    change_series = gdfx.apply(weighted_mean, 'chg_aftinc').values[:, 1]
+    avginc_series = gdfx.apply(weighted_mean, 'expanded_income').values
+    change_series = gdfx.apply(weighted_mean, 'chg_aftinc').values
     # compute percentage change statistic each included income percentile
     pch_series = np.zeros(avginc_series.shape)
     pch_series[included] = np.divide(